@@ -1,4 +1,4 @@
-from expr import Binary, Expr, Grouping, Literal, Unary, Visitor
+from expr import Array, Binary, Expr, Grouping, Literal, Unary, Visitor
 from peu_token import PeuToken
 from token_type import TokenType
 
@@ -6,6 +6,9 @@ from token_type import TokenType
 class AstPrinter(Visitor):
     def print(self, expr: Expr):
         return expr.accept(self)
+
+    def visit_array(self, expr: Array):
+        return self._parenthesize("array", *expr.elements)
     
     def visit_binary(self, expr: Binary):
         return self._parenthesize(expr.operator.lexeme, expr.left, expr.right)
@@ -29,9 +32,12 @@ class AstPrinter(Visitor):
 
 def main():
     expression = Binary(
-        Unary(PeuToken(TokenType.MINUS, "-", None, 1), Literal(123)),
+        Unary(
+            PeuToken(TokenType.MINUS, "-", None, 1),
+            Literal(PeuToken(TokenType.NUMBER, "123", 123, 1), 123),
+        ),
         PeuToken(TokenType.STAR, "*", None, 1),
-        Grouping(Literal(45.67))
+        Grouping(Literal(PeuToken(TokenType.NUMBER, "45.67", 45.67, 1), 45.67))
     )
     printer = AstPrinter()
     print(printer.print(expression))
@@ -0,0 +1,138 @@
+import contextlib
+import glob
+import io
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from output import StringSink
+from peu import ENGINES, ArgumentParser, Peu
+from program_cache import ProgramCache
+
+
+def run_script(path: str, engine: str, use_cache: bool) -> dict[str, object]:
+    """Runs one script in a fresh interpreter and returns its outcome.
+
+    Runs inside a pool worker: the Peu class state is reset first, so
+    scripts sharing a worker never see each other's globals or errors.
+    """
+    output = StringSink()
+    errors = io.StringIO()
+
+    Peu.had_error = False
+    Peu.had_runtime_error = False
+    Peu.interpreter = ENGINES[engine](output)
+    Peu.cache = ProgramCache() if use_cache else None
+
+    exit_code = 0
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output.buffer), contextlib.redirect_stderr(errors):
+        try:
+            Peu().run_file(path)
+        except SystemExit as exit:
+            exit_code = exit.code
+        except Exception:
+            # Uncaught Python errors, e.g. a division by zero, exit with 1
+            # like the standalone interpreter does.
+            traceback.print_exc()
+            exit_code = 1
+    elapsed = time.perf_counter() - start
+
+    return {
+        "script": path,
+        "exit_code": exit_code,
+        "wall_time": elapsed,
+        "stdout": output.getvalue(),
+        "stderr": errors.getvalue(),
+    }
+
+
+def find_scripts(patterns: list[str]) -> list[str]:
+    """Expands directories (recursively, *.peu) and globs, keeping order."""
+    scripts = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = sorted(str(path) for path in Path(pattern).rglob("*.peu"))
+        else:
+            matches = sorted(glob.glob(pattern, recursive=True))
+
+        for match in matches:
+            if match not in scripts:
+                scripts.append(match)
+
+    return scripts
+
+
+def summarize(results: list[dict[str, object]], elapsed: float) -> dict[str, object]:
+    exit_codes = [result["exit_code"] for result in results]
+    return {
+        "scripts": len(results),
+        "succeeded": exit_codes.count(0),
+        "syntax_errors": exit_codes.count(65),
+        "runtime_errors": exit_codes.count(70),
+        "crashed": len(exit_codes) - exit_codes.count(0)
+        - exit_codes.count(65) - exit_codes.count(70),
+        "wall_time": elapsed,
+        "script_time": sum(result["wall_time"] for result in results),
+    }
+
+
+def main(argv: list[str]) -> None:
+    parser = ArgumentParser(prog="peu batch")
+    parser.add_argument("scripts", nargs="+", metavar="dir|glob")
+    parser.add_argument("--engine", choices=ENGINES.keys(), default="tree")
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=os.cpu_count(),
+        help="number of worker processes (default: one per CPU)",
+    )
+    parser.add_argument(
+        "--report",
+        metavar="FILE",
+        help="write every script's exit code, time and output as JSON",
+    )
+    parser.add_argument("--no-cache", action="store_true")
+    args = parser.parse_args(argv)
+
+    scripts = find_scripts(args.scripts)
+    if not scripts:
+        sys.stderr.write("No scripts found.\n")
+        sys.exit(66)
+
+    start = time.perf_counter()
+    workers = max(1, args.workers)
+    # Many small scripts per task, so that workers are not starved by the
+    # round trips to the parent process.
+    chunksize = max(1, len(scripts) // (workers * 4))
+    with ProcessPoolExecutor(workers) as executor:
+        results = list(
+            executor.map(
+                run_script,
+                scripts,
+                [args.engine] * len(scripts),
+                [not args.no_cache] * len(scripts),
+                chunksize=chunksize,
+            )
+        )
+    summary = summarize(results, time.perf_counter() - start)
+
+    for result in results:
+        print(f"{result['exit_code']:>4}  {result['wall_time'] * 1000:>9.1f} ms  {result['script']}")
+    print(
+        f"{summary['scripts']} scripts in {summary['wall_time']:.2f}s: "
+        f"{summary['succeeded']} ok, {summary['syntax_errors']} syntax errors, "
+        f"{summary['runtime_errors']} runtime errors, {summary['crashed']} crashed"
+    )
+
+    if args.report is not None:
+        with open(args.report, "w") as file:
+            json.dump({"summary": summary, "results": results}, file, indent=2)
+
+    if summary["succeeded"] != summary["scripts"]:
+        sys.exit(1)
@@ -0,0 +1,113 @@
+"""Cost of forking interpreter state after a large prelude.
+
+A prelude defines `--variables` globals; each scenario then changes a few
+of them and prints a result. Three ways to give every scenario its own
+state are compared:
+
+    rerun     run the prelude again for each scenario
+    deepcopy  copy.deepcopy the prelude's global Environment
+    fork      Interpreter.fork, which shares the globals copy-on-write
+
+    python bench/fork.py --variables 10000 --scenarios 200
+"""
+
+import argparse
+import copy
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from output import ListSink
+from peu_interpreter import Interpreter
+from peu_parser import PeuParser
+from resolver import Resolver
+from scanner import RegexScanner
+
+
+def parse(source: str) -> list:
+    statements = PeuParser(RegexScanner(source).scan_tokens()).parse()
+    if None in statements:
+        raise ValueError("benchmark program has a syntax error")
+    return statements
+
+
+def prelude(variables: int) -> str:
+    return "\n".join(f"var rate{i} = {i % 97} / 100;" for i in range(variables)) + "\n"
+
+
+def scenario(variables: int, index: int) -> str:
+    changed = [(index * 7919 + k * 104729) % variables for k in range(5)]
+    lines = [f"rate{name} = rate{name} + 1;" for name in changed]
+    lines.append(" + ".join(f"rate{name}" for name in changed).join(("print ", ";")))
+    return "\n".join(lines) + "\n"
+
+
+def run(interpreter: Interpreter, statements: list) -> None:
+    Resolver(interpreter).resolve(statements)
+    interpreter.interpret(statements)
+    if interpreter.had_runtime_error:
+        raise ValueError("benchmark program failed")
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="bench/fork.py")
+    parser.add_argument("--variables", type=int, default=10_000)
+    parser.add_argument("--scenarios", type=int, default=200)
+    args = parser.parse_args()
+
+    base_statements = parse(prelude(args.variables))
+    scenarios = [parse(scenario(args.variables, i)) for i in range(args.scenarios)]
+
+    start = time.perf_counter()
+    base = Interpreter(ListSink())
+    run(base, base_statements)
+    print(f"prelude: {args.variables:,} globals in {time.perf_counter() - start:.3f}s")
+
+    def rerun() -> Interpreter:
+        interpreter = Interpreter(ListSink())
+        run(interpreter, base_statements)
+        return interpreter
+
+    def deepcopy() -> Interpreter:
+        interpreter = Interpreter(ListSink())
+        interpreter.use_globals(copy.deepcopy(base.globals))
+        return interpreter
+
+    def fork() -> Interpreter:
+        return base.fork(ListSink())
+
+    outputs = dict()
+    print(f"\n{'':<10} {'fork':>12} {'scenario':>12} {'memory/fork':>14}")
+    for name, make in (("rerun", rerun), ("deepcopy", deepcopy), ("fork", fork)):
+        forked = []
+        fork_time = run_time = 0.0
+        tracemalloc.start()
+        for statements in scenarios:
+            start = time.perf_counter()
+            interpreter = make()
+            middle = time.perf_counter()
+            run(interpreter, statements)
+            end = time.perf_counter()
+            fork_time += middle - start
+            run_time += end - middle
+            # Kept alive so that the memory of every fork is counted.
+            forked.append(interpreter)
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        outputs[name] = [line for interpreter in forked for line in interpreter.output.lines]
+        print(
+            f"{name:<10} {fork_time / len(scenarios) * 1e6:>9,.1f} us "
+            f"{run_time / len(scenarios) * 1e6:>9,.1f} us "
+            f"{memory / len(scenarios) / 1024:>10,.1f} KiB"
+        )
+
+    if not outputs["rerun"] == outputs["deepcopy"] == outputs["fork"]:
+        raise ValueError("the scenarios printed different results")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Generators of large synthetic Peulang programs.
+
+Each generator takes a size and returns the source of a program that runs
+without errors on every engine. They stress one dimension at a time:
+
+    python bench/generate.py deep_nesting 200 > deep.peu
+"""
+
+import sys
+from typing import Callable
+
+
+def deep_nesting(depth: int) -> str:
+    """Blocks nested `depth` levels deep, each reading its parents' locals."""
+    lines = ["var total = 0;"]
+    for level in range(depth):
+        indent = "  " * level
+        lines.append(f"{indent}{{")
+        lines.append(f"{indent}  var x{level} = {level};")
+        if level > 0:
+            lines.append(f"{indent}  total = total + x{level} - x{level - 1};")
+    for level in reversed(range(depth)):
+        lines.append("  " * level + "}")
+    lines.append("print total;")
+
+    return "\n".join(lines) + "\n"
+
+
+def expression_chains(lines: int, length: int = 40) -> str:
+    """`lines` statements, each an arithmetic chain of `length` operands."""
+    operators = ["+", "-", "*", "+", "/"]
+    source = ["var a = 1;", "var b = 2;", "var c = 3;", "var acc = 0;"]
+    for line in range(lines):
+        terms = ["acc"]
+        for i in range(1, length):
+            operand = "abc"[(line + i) % 3] if i % 2 else str(i % 9 + 1)
+            terms.append(operators[(line + i) % len(operators)])
+            terms.append(operand)
+        source.append(f"acc = ({' '.join(terms)}) / {length};")
+    source.append("print acc;")
+
+    return "\n".join(source) + "\n"
+
+
+def many_blocks(count: int) -> str:
+    """`count` sibling blocks with locals, arithmetic and branches."""
+    source = ["var total = 0;"]
+    for i in range(count):
+        source.append("{")
+        source.append(f"  var x = {i};")
+        source.append("  var y = x * 2 + 1;")
+        source.append("  if (y > 10 and x != 15) {")
+        source.append("    total = total + y;")
+        source.append("  } else {")
+        source.append("    total = total - x;")
+        source.append("  }")
+        source.append("}")
+    source.append("print total;")
+
+    return "\n".join(source) + "\n"
+
+
+def strings(count: int) -> str:
+    """`count` blocks concatenating, comparing and printing strings."""
+    source = ['var separator = ", ";', 'var line = "";']
+    for i in range(count):
+        source.append("{")
+        source.append(f'  var name = "item {i}";')
+        source.append(f'  var label = "label-" + name + separator + "{i % 7}";')
+        source.append('  if (label != line or name != "") {')
+        source.append('    line = label + " (" + name + ")";')
+        source.append("  }")
+        source.append("  print line;")
+        source.append("}")
+
+    return "\n".join(source) + "\n"
+
+
+GENERATORS: dict[str, Callable[[int], str]] = {
+    "deep_nesting": deep_nesting,
+    "expression_chains": expression_chains,
+    "many_blocks": many_blocks,
+    "strings": strings,
+}
+
+
+def main():
+    if len(sys.argv) != 3 or sys.argv[1] not in GENERATORS:
+        sys.stderr.write(
+            f"Usage: python generate.py <{'|'.join(GENERATORS)}> <size>"
+        )
+        sys.exit(64)
+
+    sys.stdout.write(GENERATORS[sys.argv[1]](int(sys.argv[2])))
+
+
+if __name__ == "__main__":
+    main()
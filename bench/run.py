@@ -0,0 +1,264 @@
+"""Benchmark runner for the scanner, the parser and the engines.
+
+For every generated program and workload it reports tokens/s for the
+scanners, AST nodes/s for the parser, statements/s for each engine and the
+peak memory allocated by each stage. An engine's statements are lowered
+(compiled to a Chunk, to closures...) once, then run: the lower stage
+times the former and the interpret stage the latter.
+
+    python bench/run.py                   # report, with changes since the baseline
+    python bench/run.py --compare         # also fail on regressions
+    python bench/run.py --save-baseline   # make these results the baseline
+    python bench/run.py --quick --output results.json
+
+The baseline, bench/baseline.json, is committed; it was run without
+--quick, and only runs with the same setting are compared with it.
+Timings are the best of `--repeat` runs; peak memory is measured in a
+separate run under tracemalloc. With --compare, a stage regresses when its
+rate drops, or its peak memory grows, by more than `--threshold` relative
+to the baseline, and the runner then exits with status 1.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from engine import ENGINES
+from generate import GENERATORS
+from output import OutputSink
+from peu_parser import PeuParser
+from resolver import Resolver
+from scanner import RegexScanner, Scanner
+from stmt import Stmt
+from tool.ast_memory import walk_nodes
+from workloads import WORKLOADS
+
+
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+# Size passed to each generator or workload; --quick divides them by 10.
+PROGRAMS = {
+    "deep_nesting": (GENERATORS["deep_nesting"], 120),
+    "expression_chains": (GENERATORS["expression_chains"], 2000),
+    "many_blocks": (GENERATORS["many_blocks"], 3000),
+    "strings": (GENERATORS["strings"], 3000),
+    "scopes": (WORKLOADS["scopes"], 1000),
+    "conditions": (WORKLOADS["conditions"], 1000),
+    "ledger": (WORKLOADS["ledger"], 1000),
+    # 16384 appends of 64 characters build a 1 MB string.
+    "appends": (WORKLOADS["appends"], 16384),
+    "counters": (WORKLOADS["counters"], 3000),
+    "series": (WORKLOADS["series"], 10000),
+    # Statements/s counts each statement once, however often a loop runs it.
+    "loops": (WORKLOADS["loops"], 20000),
+}
+
+class DiscardSink(OutputSink):
+    def print(self, text: str) -> None:
+        pass
+
+
+def measure(
+    setup: Callable[[], object],
+    action: Callable[[object], object],
+    repeat: int,
+) -> tuple[float, int]:
+    """Returns the best time of `action(setup())` and its peak memory."""
+    best = float("inf")
+    for _ in range(repeat):
+        argument = setup()
+        start = time.perf_counter()
+        action(argument)
+        best = min(best, time.perf_counter() - start)
+
+    argument = setup()
+    tracemalloc.start()
+    try:
+        action(argument)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return best, peak
+
+
+def bench_program(
+    source: str, engines: list[str], repeat: int
+) -> dict[str, dict[str, object]]:
+    results = dict()
+
+    def record(stage: str, count: int, unit: str, seconds: float, peak: int):
+        results[stage] = {
+            "count": count,
+            "unit": unit,
+            "seconds": seconds,
+            "rate": count / seconds if seconds else float("inf"),
+            "peak_bytes": peak,
+        }
+
+    tokens = Scanner(source).scan_tokens()
+    for stage, scanner in (("scan", Scanner), ("regex_scan", RegexScanner)):
+        seconds, peak = measure(
+            lambda: scanner(source), lambda s: s.scan_tokens(), repeat
+        )
+        record(stage, len(tokens), "tokens", seconds, peak)
+
+    statements = PeuParser(tokens).parse()
+    if None in statements:
+        raise ValueError("benchmark program has a syntax error")
+    nodes = list(walk_nodes(statements))
+    seconds, peak = measure(
+        lambda: PeuParser(tokens), lambda p: p.parse(), repeat
+    )
+    record("parse", len(nodes), "nodes", seconds, peak)
+
+    statement_count = sum(1 for node in nodes if isinstance(node, Stmt))
+    for name in engines:
+        def setup():
+            interpreter = ENGINES[name](DiscardSink())
+            Resolver(interpreter).resolve(statements)
+            return interpreter
+
+        seconds, peak = measure(setup, lambda i: i.lower(statements), repeat)
+        record(f"lower:{name}", statement_count, "statements", seconds, peak)
+
+        def setup_lowered():
+            interpreter = setup()
+            return interpreter, interpreter.lower(statements)
+
+        def run(argument):
+            interpreter, lowered = argument
+            interpreter.execute(lowered)
+            if interpreter.had_runtime_error:
+                raise ValueError(f"benchmark program failed on {name}")
+
+        seconds, peak = measure(setup_lowered, run, repeat)
+        record(f"interpret:{name}", statement_count, "statements", seconds, peak)
+
+    return results
+
+
+def compare(
+    results: dict[str, dict], baseline: dict[str, dict], threshold: float
+) -> list[str]:
+    regressions = []
+    for key, result in results.items():
+        before = baseline.get(key)
+        if before is None:
+            continue
+
+        if result["rate"] < before["rate"] * (1 - threshold):
+            regressions.append(
+                f"{key}: {result['rate']:,.0f} {result['unit']}/s, "
+                f"was {before['rate']:,.0f}"
+            )
+        if result["peak_bytes"] > before["peak_bytes"] * (1 + threshold):
+            regressions.append(
+                f"{key}: peak {result['peak_bytes']:,} bytes, "
+                f"was {before['peak_bytes']:,}"
+            )
+
+    return regressions
+
+
+def report(results: dict[str, dict], baseline: dict[str, dict]) -> None:
+    for key, result in results.items():
+        line = (
+            f"{key:<36} {result['rate']:>14,.0f} {result['unit'] + '/s':<12} "
+            f"{result['peak_bytes'] / 1024:>10,.0f} KiB"
+        )
+        before = baseline.get(key)
+        if before is not None:
+            change = result["rate"] / before["rate"] - 1
+            line = f"{line}  {change:+7.1%}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="bench")
+    parser.add_argument(
+        "--program", action="append", choices=PROGRAMS.keys(),
+        help="only run this program (repeatable)",
+    )
+    parser.add_argument(
+        "--engine", action="append", choices=ENGINES.keys(),
+        help="only run this engine (repeatable)",
+    )
+    parser.add_argument("--quick", action="store_true", help="run 10x smaller programs")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", default=str(BASELINE))
+    parser.add_argument(
+        "--compare", action="store_true",
+        help="exit with status 1 if a stage regressed since the baseline",
+    )
+    parser.add_argument(
+        "--save-baseline", action="store_true",
+        help="write the results to the baseline file instead of comparing",
+    )
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args()
+
+    results = dict()
+    for name in args.program or PROGRAMS:
+        generator, size = PROGRAMS[name]
+        if args.quick:
+            size = max(1, size // 10)
+        source = generator(size)
+
+        for stage, result in bench_program(
+            source, args.engine or list(ENGINES), args.repeat
+        ).items():
+            results[f"{name}/{stage}"] = result
+
+    document = {
+        "python": platform.python_version(),
+        "implementation": sys.implementation.cache_tag,
+        "quick": args.quick,
+        "results": results,
+    }
+
+    if args.output is not None:
+        with open(args.output, "w") as file:
+            json.dump(document, file, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(document, file, indent=2)
+        report(results, dict())
+        return
+
+    baseline = dict()
+    try:
+        with open(args.baseline) as file:
+            stored = json.load(file)
+        if stored.get("quick") == args.quick:
+            baseline = stored["results"]
+        else:
+            print("baseline was run with a different --quick setting; not comparing")
+    except FileNotFoundError:
+        print(f"no baseline at {args.baseline}; run with --save-baseline")
+
+    report(results, baseline)
+    if not args.compare:
+        return
+    if not baseline:
+        sys.exit(2)
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
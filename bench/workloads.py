@@ -0,0 +1,163 @@
+"""Realistic workloads, written in the style of the `exemples/` scripts and
+scaled up by repeating sections with varying data.
+"""
+
+from typing import Callable
+
+
+def scopes(sections: int) -> str:
+    """Shadowing of globals by nested blocks, as in exemples/scopes.peu."""
+    source = ['var a = "global a";', 'var b = "global b";', 'var c = "global c";']
+    for i in range(sections):
+        source.append(f"""{{
+  var a = "outer a {i}";
+  var b = "outer b {i}";
+  {{
+    var a = "inner a {i}";
+    print a;
+    print b;
+    print c;
+  }}
+  print a;
+  print b;
+  print c;
+}}""")
+    source.append("print a;\nprint b;\nprint c;")
+
+    return "\n".join(source) + "\n"
+
+
+def conditions(sections: int) -> str:
+    """Arithmetic checks and if/else chains, as in exemples/conditions.peu."""
+    source = ["var ok = 0;", "var failed = 0;"]
+    for i in range(sections):
+        source.append(f"""var a{i} = {i % 10};
+var b{i} = {i % 3 + 1};
+if (a{i} + b{i} == {i % 10 + i % 3 + 1}) {{
+    print "Ok";
+    ok = ok + 1;
+}} else {{
+    print "Not ok";
+    failed = failed + 1;
+}}
+if (a{i} * b{i} > 10 or a{i} - b{i} < 0) {{
+    print "Big or negative";
+}} else if (a{i} == 0) {{
+    print "Zero";
+}} else {{
+    print "Small";
+}}""")
+    source.append('print "ok: " + "done";\nprint ok;\nprint failed;')
+
+    return "\n".join(source) + "\n"
+
+
+def ledger(sections: int) -> str:
+    """A running account with string reports, mixing every statement kind."""
+    source = ['var balance = 100;', 'var report = "";', "var overdrawn = false;"]
+    for i in range(sections):
+        amount = (i * 37) % 250 - 100
+        source.append(f"""{{
+  var amount = {amount};
+  var fee = 0;
+  if (amount < 0) {{
+    fee = 1.5;
+  }}
+  balance = balance + amount - fee;
+  overdrawn = balance < 0;
+  if (overdrawn) {{
+    report = "entry {i}: overdrawn";
+  }} else {{
+    report = "entry {i}: ok";
+  }}
+  print report;
+  print balance;
+}}""")
+
+    return "\n".join(source) + "\n"
+
+
+def appends(sections: int) -> str:
+    """A document built by appending 64-character lines to a string, plus a
+    frame prepended and appended around a second one, then printed once.
+    """
+    line = "0123456789abcdef" * 4
+    source = ['var document = "";', 'var framed = "";']
+    for i in range(sections):
+        source.append(f'document = document + "{line}";')
+        if i % 4 == 0:
+            source.append(f'framed = "<{i}>" + framed + "</{i}>";')
+    source.append("print document;\nprint framed;")
+
+    return "\n".join(source) + "\n"
+
+
+def counters(sections: int) -> str:
+    """Integer counters, indexes and offsets: arithmetic and comparisons
+    that never leave the integers.
+    """
+    source = ["var count = 0;", "var index = 0;", "var total = 0;", "var skipped = 0;"]
+    for i in range(sections):
+        source.append(f"""{{
+  var step = {i % 7 + 1};
+  var offset = index * 4 + step;
+  count = count + 1;
+  index = index + step;
+  if (offset - total < {i % 50}) {{
+    skipped = skipped + 1;
+  }} else {{
+    total = total + offset - step * 2;
+  }}
+}}""")
+    source.append("print count;\nprint index;\nprint total;\nprint skipped;")
+
+    return "\n".join(source) + "\n"
+
+
+def loops(iterations: int) -> str:
+    """Counting loops whose bodies declare locals, nested once."""
+    return f"""var total = 0;
+var count = 0;
+for (var i = 0; i < {iterations}; i = i + 1) {{
+  var step = i * 2;
+  if (step > 10) {{
+    total = total + step - 10;
+  }} else {{
+    total = total + step;
+  }}
+}}
+while (count < {iterations // 10}) {{
+  var inner = 0;
+  for (var j = 0; j < 10; j = j + 1) inner = inner + j;
+  count = count + 1;
+  total = total + inner;
+}}
+print total;
+print count;
+"""
+
+
+def series(size: int) -> str:
+    """Numeric rules applied to a series of `size` values at once, with
+    array operations.
+    """
+    values = ", ".join(f"{i % 97}.5" for i in range(size))
+    return f"""var prices = [{values}];
+var fees = prices * 0.02 + 1;
+var net = prices - fees;
+var ratio = net / prices;
+print net;
+print ratio > 0.9;
+print -fees == 0 - fees;
+"""
+
+
+WORKLOADS: dict[str, Callable[[int], str]] = {
+    "scopes": scopes,
+    "conditions": conditions,
+    "ledger": ledger,
+    "appends": appends,
+    "counters": counters,
+    "series": series,
+    "loops": loops,
+}
@@ -0,0 +1,369 @@
+import gc
+import operator as op
+from typing import Callable
+
+from error import PeuRuntimeError
+from expr import Array, Assign, Binary, Expr, Grouping, Literal, Logical, Unary, Variable, Visitor as ExprVisitor
+from number import NUMBER_TYPES, add as add_numbers, multiply, negate as negate_number, subtract
+from peu_array import PeuArray, make_array
+from peu_interpreter import Interpreter
+from rope import STRING_TYPES, concat
+from stmt import Block, Expression, For, If, Print, Stmt, Var, While, Visitor as StmtVisitor
+from token_type import TokenType
+
+
+# A compiled node takes the flat array of slots and returns its value.
+Closure = Callable[[list], object]
+
+# Closures are built once per program and can run against any globals and
+# output, which each run passes in the first slots; the locals follow.
+GLOBALS_SLOT = 0
+PRINT_SLOT = 1
+FIRST_LOCAL_SLOT = 2
+
+NUMBER_OPERATORS = {
+    TokenType.MINUS: subtract,
+    TokenType.STAR: multiply,
+    TokenType.SLASH: op.truediv,
+    TokenType.GREATER: op.gt,
+    TokenType.GREATER_EQUAL: op.ge,
+    TokenType.LESS: op.lt,
+    TokenType.LESS_EQUAL: op.le,
+}
+
+
+class ClosureInterpreter(Interpreter):
+    """Interpreter that turns each AST node into a Python closure once and
+    then runs the closures, skipping the accept/visit dispatch entirely.
+    """
+
+    def interpret(self, statements: list[Stmt]) -> None:
+        if self.hooks_installed:
+            # Hooks are dispatched by the tree-walking interpreter.
+            self._walk(statements)
+            return
+
+        self.execute(self.lower(statements))
+
+    def lower(self, statements: list[Stmt]) -> tuple[tuple[Closure, ...], int]:
+        """Returns the closures of `statements` and the number of slots they
+        use.
+        """
+        compiler = ClosureCompiler(self)
+
+        # Compiling allocates one function object per node, which triggers a
+        # cyclic collection over the whole AST every few hundred nodes. None
+        # of these objects form cycles, so pause the collector meanwhile.
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            closures = tuple(compiler.compile_stmt(s) for s in statements)
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+        return closures, compiler.slot_count
+
+    def execute(self, program: tuple[tuple[Closure, ...], int]) -> None:
+        closures, slot_count = program
+        slots = [None] * slot_count
+        slots[GLOBALS_SLOT] = self.globals
+        slots[PRINT_SLOT] = self.output.print
+
+        try:
+            for closure in closures:
+                closure(slots)
+        except PeuRuntimeError as error:
+            self._runtime_error(error)
+
+
+class ClosureCompiler(ExprVisitor, StmtVisitor):
+    def __init__(self, interpreter: Interpreter) -> None:
+        super().__init__()
+
+        self._interpreter = interpreter
+        # (base, size) of each enclosing block, innermost last. Peulang has
+        # no closures, so all locals fit in one flat array.
+        self._scopes: list[tuple[int, int]] = [(FIRST_LOCAL_SLOT, 0)]
+        self.slot_count = FIRST_LOCAL_SLOT
+
+    def compile_stmt(self, stmt: Stmt) -> Closure:
+        return stmt.accept(self)
+
+    def compile_expr(self, expr: Expr) -> Closure:
+        return expr.accept(self)
+
+    def _slot(self, node: object) -> int:
+        location = self._interpreter._locals.get(node)
+        if location is None:
+            return -1
+
+        depth, slot = location
+        base, _ = self._scopes[-1 - depth]
+        return base + slot
+
+    def _begin_scope(self, stmt: Block | For) -> None:
+        base, size = self._scopes[-1]
+        block_base = base + size
+        block_size = self._interpreter._scope_sizes[stmt]
+
+        self._scopes.append((block_base, block_size))
+        self.slot_count = max(self.slot_count, block_base + block_size)
+
+    def visit_block(self, stmt: Block) -> Closure:
+        self._begin_scope(stmt)
+        statements = tuple(self.compile_stmt(s) for s in stmt.statements)
+        self._scopes.pop()
+
+        def block(slots):
+            for statement in statements:
+                statement(slots)
+
+        return block
+
+    def visit_expression(self, stmt: Expression) -> Closure:
+        return self.compile_expr(stmt.expression)
+
+    def visit_for(self, stmt: For) -> Closure:
+        self._begin_scope(stmt)
+        initializer = None
+        if stmt.initializer is not None:
+            initializer = self.compile_stmt(stmt.initializer)
+        loop = self._compile_loop(stmt.condition, stmt.body, stmt.increment)
+        self._scopes.pop()
+
+        if initializer is None:
+            return loop
+
+        def for_loop(slots):
+            initializer(slots)
+            loop(slots)
+
+        return for_loop
+
+    def visit_while(self, stmt: While) -> Closure:
+        return self._compile_loop(stmt.condition, stmt.body, None)
+
+    def _compile_loop(self, condition: Expr, body: Stmt, increment: Expr | None) -> Closure:
+        condition = self.compile_expr(condition)
+        body = self.compile_stmt(body)
+        is_truthy = self._interpreter._is_truthy
+
+        if increment is None:
+            def while_loop(slots):
+                while True:
+                    value = condition(slots)
+                    if value is not True and (
+                        value is False or value is None or not is_truthy(value)
+                    ):
+                        return
+                    body(slots)
+
+            return while_loop
+
+        increment = self.compile_expr(increment)
+
+        def loop(slots):
+            while True:
+                value = condition(slots)
+                if value is not True and (
+                    value is False or value is None or not is_truthy(value)
+                ):
+                    return
+                body(slots)
+                increment(slots)
+
+        return loop
+
+    def visit_if(self, stmt: If) -> Closure:
+        condition = self.compile_expr(stmt.condition)
+        then_branch = self.compile_stmt(stmt.then_branch)
+        is_truthy = self._interpreter._is_truthy
+
+        if stmt.else_branch is None:
+            def if_then(slots):
+                if is_truthy(condition(slots)):
+                    then_branch(slots)
+
+            return if_then
+
+        else_branch = self.compile_stmt(stmt.else_branch)
+
+        def if_then_else(slots):
+            if is_truthy(condition(slots)):
+                then_branch(slots)
+            else:
+                else_branch(slots)
+
+        return if_then_else
+
+    def visit_print(self, stmt: Print) -> Closure:
+        expression = self.compile_expr(stmt.expression)
+        stringify = self._interpreter._stringify
+
+        def print_(slots):
+            slots[PRINT_SLOT](stringify(expression(slots)))
+
+        return print_
+
+    def visit_var(self, stmt: Var) -> Closure:
+        if stmt.initializer is not None:
+            initializer = self.compile_expr(stmt.initializer)
+        else:
+            initializer = lambda slots: None
+
+        slot = self._slot(stmt)
+        if slot < 0:
+            name = stmt.name.lexeme
+
+            def define_global(slots):
+                slots[GLOBALS_SLOT].define(name, initializer(slots))
+
+            return define_global
+
+        def define_local(slots):
+            slots[slot] = initializer(slots)
+
+        return define_local
+
+    def visit_array(self, expr: Array) -> Closure:
+        elements = [self.compile_expr(element) for element in expr.elements]
+        bracket = expr.bracket
+
+        return lambda slots: make_array(
+            bracket, [element(slots) for element in elements]
+        )
+
+    def visit_assign(self, expr: Assign) -> Closure:
+        value = self.compile_expr(expr.value)
+
+        slot = self._slot(expr)
+        if slot < 0:
+            name = expr.name
+
+            def assign_global(slots):
+                result = value(slots)
+                slots[GLOBALS_SLOT].assign(name, result)
+                return result
+
+            return assign_global
+
+        def assign_local(slots):
+            result = slots[slot] = value(slots)
+            return result
+
+        return assign_local
+
+    def visit_binary(self, expr: Binary) -> Closure:
+        left = self.compile_expr(expr.left)
+        right = self.compile_expr(expr.right)
+        operator = expr.operator
+        check_number_operands = self._interpreter._check_number_operands
+
+        if operator.type == TokenType.PLUS:
+            def add(slots):
+                a = left(slots)
+                b = right(slots)
+                if type(a) in NUMBER_TYPES and type(b) in NUMBER_TYPES:
+                    return add_numbers(a, b)
+                if isinstance(a, STRING_TYPES) and isinstance(b, STRING_TYPES):
+                    return concat(a, b)
+                if type(a) is PeuArray or type(b) is PeuArray:
+                    check_number_operands(operator, a, b)
+                    return a + b
+
+                raise PeuRuntimeError(
+                    operator, "Operands must be two numbers or two strings."
+                )
+
+            return add
+
+        if operator.type == TokenType.BANG_EQUAL:
+            is_equal = self._interpreter._is_equal
+
+            def not_equal(slots):
+                a = left(slots)
+                return not is_equal(a, right(slots))
+
+            return not_equal
+
+        if operator.type == TokenType.EQUAL_EQUAL:
+            is_equal = self._interpreter._is_equal
+            check_equality_operands = self._interpreter._check_equality_operands
+
+            def equal(slots):
+                a = left(slots)
+                b = right(slots)
+                if type(a) not in NUMBER_TYPES or type(b) not in NUMBER_TYPES:
+                    check_equality_operands(operator, a, b)
+
+                return is_equal(a, b)
+
+            return equal
+
+        function = NUMBER_OPERATORS[operator.type]
+
+        def number_operation(slots):
+            a = left(slots)
+            b = right(slots)
+            if type(a) not in NUMBER_TYPES or type(b) not in NUMBER_TYPES:
+                check_number_operands(operator, a, b)
+
+            return function(a, b)
+
+        return number_operation
+
+    def visit_grouping(self, expr: Grouping) -> Closure:
+        return self.compile_expr(expr.expression)
+
+    def visit_literal(self, expr: Literal) -> Closure:
+        value = expr.value
+        return lambda slots: value
+
+    def visit_logical(self, expr: Logical) -> Closure:
+        left = self.compile_expr(expr.left)
+        right = self.compile_expr(expr.right)
+        is_truthy = self._interpreter._is_truthy
+
+        if expr.operator.type == TokenType.OR:
+            def logical_or(slots):
+                value = left(slots)
+                if is_truthy(value):
+                    return value
+                return right(slots)
+
+            return logical_or
+
+        def logical_and(slots):
+            value = left(slots)
+            if not is_truthy(value):
+                return value
+            return right(slots)
+
+        return logical_and
+
+    def visit_unary(self, expr: Unary) -> Closure:
+        right = self.compile_expr(expr.right)
+        operator = expr.operator
+
+        if operator.type == TokenType.MINUS:
+            check_number_operand = self._interpreter._check_number_operand
+
+            def negate(slots):
+                value = right(slots)
+                if type(value) not in NUMBER_TYPES:
+                    check_number_operand(operator, value)
+                return negate_number(value)
+
+            return negate
+
+        is_truthy = self._interpreter._is_truthy
+        return lambda slots: not is_truthy(right(slots))
+
+    def visit_variable(self, expr: Variable) -> Closure:
+        slot = self._slot(expr)
+        if slot < 0:
+            name = expr.name
+            return lambda slots: slots[GLOBALS_SLOT].get(name)
+
+        return lambda slots: slots[slot]
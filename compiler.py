@@ -0,0 +1,321 @@
+from array import array
+
+from expr import Array, Assign, Binary, Expr, Grouping, Literal, Logical, Unary, Variable, Visitor as ExprVisitor
+from peu_token import PeuToken
+from stmt import Block, Expression, For, If, Print, Stmt, Var, While, Visitor as StmtVisitor
+from token_type import TokenType
+
+
+class OpCode:
+    # Ordered roughly by how often the VM dispatches them.
+    GET_LOCAL = 0
+    CONSTANT = 1
+    GET_GLOBAL = 2
+    STORE_LOCAL = 3
+    POP_JUMP_IF_FALSE = 4
+    JUMP = 5
+    # Binary operations with a literal or local operand, in one instruction;
+    # the operand indexes a constant tuple, see Compiler.visit_binary.
+    BINARY_CONSTANT = 6
+    LOCAL_BINARY_CONSTANT = 7
+    BINARY_LOCAL = 8
+    STORE_GLOBAL = 9
+    # The binary operations, on the two values on top of the stack.
+    ADD = 10
+    SUBTRACT = 11
+    MULTIPLY = 12
+    DIVIDE = 13
+    LESS = 14
+    LESS_EQUAL = 15
+    GREATER = 16
+    GREATER_EQUAL = 17
+    EQUAL = 18
+    NOT_EQUAL = 19
+    SET_LOCAL = 20
+    SET_GLOBAL = 21
+    POP = 22
+    JUMP_IF_FALSE = 23
+    JUMP_IF_TRUE = 24
+    NOT = 25
+    NEGATE = 26
+    DEFINE_GLOBAL = 27
+    PRINT = 28
+    ARRAY = 29
+    RETURN = 30
+
+
+BINARY_OPCODES = {
+    TokenType.PLUS: OpCode.ADD,
+    TokenType.MINUS: OpCode.SUBTRACT,
+    TokenType.STAR: OpCode.MULTIPLY,
+    TokenType.SLASH: OpCode.DIVIDE,
+    TokenType.LESS: OpCode.LESS,
+    TokenType.LESS_EQUAL: OpCode.LESS_EQUAL,
+    TokenType.GREATER: OpCode.GREATER,
+    TokenType.GREATER_EQUAL: OpCode.GREATER_EQUAL,
+    TokenType.EQUAL_EQUAL: OpCode.EQUAL,
+    TokenType.BANG_EQUAL: OpCode.NOT_EQUAL,
+}
+
+
+class Chunk:
+    """A compiled program.
+
+    Every instruction is two ints wide: the opcode followed by its operand
+    (a constant index, a token index, a local slot or a jump target).
+
+    The Compiler writes the code to an array('i'), then freezes the Chunk:
+    its code, constants and tokens become tuples, which the VM indexes
+    faster. A frozen Chunk never refers to a global environment, so VMs
+    can run it any number of times, concurrently too.
+    """
+
+    def __init__(self) -> None:
+        self.code = array("i")
+        self.constants: list[object] = []
+        self.tokens: list[PeuToken] = []
+        self.local_count = 0
+
+    def write(self, opcode: int, operand: int = 0) -> int:
+        self.code.append(opcode)
+        self.code.append(operand)
+        return len(self.code) - 2
+
+    def add_constant(self, value: object) -> int:
+        self.constants.append(value)
+        return len(self.constants) - 1
+
+    def add_token(self, token: PeuToken) -> int:
+        self.tokens.append(token)
+        return len(self.tokens) - 1
+
+    def freeze(self) -> None:
+        self.code = tuple(self.code)
+        self.constants = tuple(self.constants)
+        self.tokens = tuple(self.tokens)
+
+
+class Compiler(ExprVisitor, StmtVisitor):
+    """Lowers a resolved statement list to a Chunk.
+
+    Peulang has no closures, so every local lives in a single flat array:
+    a block's slots start right after its parent's and sibling blocks share
+    the same range.
+    """
+
+    def __init__(
+        self,
+        locals: dict[object, tuple[int, int]],
+        scope_sizes: dict[Block | For, int],
+    ) -> None:
+        super().__init__()
+
+        self._locals = locals
+        self._scope_sizes = scope_sizes
+        self._chunk = Chunk()
+        # (base, size) of each enclosing block, innermost last.
+        self._scopes: list[tuple[int, int]] = [(0, 0)]
+
+    def compile(self, statements: list[Stmt]) -> Chunk:
+        for statement in statements:
+            self._compile_stmt(statement)
+
+        self._chunk.write(OpCode.RETURN)
+        self._chunk.freeze()
+        return self._chunk
+
+    def _compile_stmt(self, stmt: Stmt) -> None:
+        stmt.accept(self)
+
+    def _compile_expr(self, expr: Expr) -> None:
+        expr.accept(self)
+
+    def _slot(self, node: object) -> int:
+        location = self._locals.get(node)
+        if location is None:
+            return -1
+
+        depth, slot = location
+        base, _ = self._scopes[-1 - depth]
+        return base + slot
+
+    def _emit_jump(self, opcode: int) -> int:
+        return self._chunk.write(opcode, -1)
+
+    def _patch_jump(self, offset: int) -> None:
+        self._chunk.code[offset + 1] = len(self._chunk.code)
+
+    def _begin_scope(self, stmt: Block | For) -> None:
+        base, size = self._scopes[-1]
+        block_base = base + size
+        block_size = self._scope_sizes[stmt]
+
+        self._scopes.append((block_base, block_size))
+        self._chunk.local_count = max(
+            self._chunk.local_count, block_base + block_size
+        )
+
+    def visit_block(self, stmt: Block) -> None:
+        self._begin_scope(stmt)
+        for statement in stmt.statements:
+            self._compile_stmt(statement)
+        self._scopes.pop()
+
+    def visit_for(self, stmt: For) -> None:
+        self._begin_scope(stmt)
+        if stmt.initializer is not None:
+            self._compile_stmt(stmt.initializer)
+        self._compile_loop(stmt.condition, stmt.body, stmt.increment)
+        self._scopes.pop()
+
+    def visit_while(self, stmt: While) -> None:
+        self._compile_loop(stmt.condition, stmt.body, None)
+
+    def _compile_loop(self, condition: Expr, body: Stmt, increment: Expr | None) -> None:
+        # Locals live in the flat slot array, so iterations allocate nothing.
+        loop_start = len(self._chunk.code)
+
+        exit_jump = None
+        if not (isinstance(condition, Literal) and condition.value is True):
+            self._compile_expr(condition)
+            exit_jump = self._emit_jump(OpCode.POP_JUMP_IF_FALSE)
+
+        self._compile_stmt(body)
+        if increment is not None:
+            self._compile_effect(increment)
+
+        self._chunk.write(OpCode.JUMP, loop_start)
+        if exit_jump is not None:
+            self._patch_jump(exit_jump)
+
+    def _compile_effect(self, expr: Expr) -> None:
+        """Compiles `expr` for its side effects only, leaving the stack as
+        it was.
+        """
+        if not isinstance(expr, Assign):
+            self._compile_expr(expr)
+            self._chunk.write(OpCode.POP)
+            return
+
+        # An assignment statement stores and pops in one instruction.
+        self._compile_expr(expr.value)
+        slot = self._slot(expr)
+        if slot < 0:
+            self._chunk.write(OpCode.STORE_GLOBAL, self._chunk.add_token(expr.name))
+        else:
+            self._chunk.write(OpCode.STORE_LOCAL, slot)
+
+    def visit_expression(self, stmt: Expression) -> None:
+        self._compile_effect(stmt.expression)
+
+    def visit_if(self, stmt: If) -> None:
+        self._compile_expr(stmt.condition)
+
+        then_jump = self._emit_jump(OpCode.POP_JUMP_IF_FALSE)
+        self._compile_stmt(stmt.then_branch)
+
+        if stmt.else_branch is None:
+            self._patch_jump(then_jump)
+            return
+
+        else_jump = self._emit_jump(OpCode.JUMP)
+        self._patch_jump(then_jump)
+        self._compile_stmt(stmt.else_branch)
+        self._patch_jump(else_jump)
+
+    def visit_print(self, stmt: Print) -> None:
+        self._compile_expr(stmt.expression)
+        self._chunk.write(OpCode.PRINT)
+
+    def visit_var(self, stmt: Var) -> None:
+        if stmt.initializer is not None:
+            self._compile_expr(stmt.initializer)
+        else:
+            self._chunk.write(OpCode.CONSTANT, self._chunk.add_constant(None))
+
+        slot = self._slot(stmt)
+        if slot < 0:
+            self._chunk.write(
+                OpCode.DEFINE_GLOBAL, self._chunk.add_token(stmt.name)
+            )
+        else:
+            self._chunk.write(OpCode.STORE_LOCAL, slot)
+
+    def visit_array(self, expr: Array) -> None:
+        for element in expr.elements:
+            self._compile_expr(element)
+
+        # ARRAY pops the element count, then the elements.
+        self._chunk.write(
+            OpCode.CONSTANT, self._chunk.add_constant(len(expr.elements))
+        )
+        self._chunk.write(OpCode.ARRAY, self._chunk.add_token(expr.bracket))
+
+    def visit_assign(self, expr: Assign) -> None:
+        self._compile_expr(expr.value)
+
+        slot = self._slot(expr)
+        if slot < 0:
+            self._chunk.write(OpCode.SET_GLOBAL, self._chunk.add_token(expr.name))
+        else:
+            self._chunk.write(OpCode.SET_LOCAL, slot)
+
+    def visit_binary(self, expr: Binary) -> None:
+        # Reading a literal or a local has no effect and cannot fail, so
+        # operands of those kinds are read by the binary instruction itself
+        # instead of being pushed first. The constant tuple starts with the
+        # opcode of the operation.
+        opcode = BINARY_OPCODES[expr.operator.type]
+        left_slot = self._slot(expr.left) if isinstance(expr.left, Variable) else -1
+        right_slot = self._slot(expr.right) if isinstance(expr.right, Variable) else -1
+
+        if isinstance(expr.right, Literal) and left_slot >= 0:
+            operands = (opcode, left_slot, expr.right.value, expr.operator)
+            self._chunk.write(
+                OpCode.LOCAL_BINARY_CONSTANT, self._chunk.add_constant(operands)
+            )
+            return
+
+        self._compile_expr(expr.left)
+        if isinstance(expr.right, Literal):
+            operands = (opcode, expr.right.value, expr.operator)
+            self._chunk.write(OpCode.BINARY_CONSTANT, self._chunk.add_constant(operands))
+        elif right_slot >= 0:
+            operands = (opcode, right_slot, expr.operator)
+            self._chunk.write(OpCode.BINARY_LOCAL, self._chunk.add_constant(operands))
+        else:
+            self._compile_expr(expr.right)
+            self._chunk.write(opcode, self._chunk.add_token(expr.operator))
+
+    def visit_grouping(self, expr: Grouping) -> None:
+        self._compile_expr(expr.expression)
+
+    def visit_literal(self, expr: Literal) -> None:
+        self._chunk.write(OpCode.CONSTANT, self._chunk.add_constant(expr.value))
+
+    def visit_logical(self, expr: Logical) -> None:
+        self._compile_expr(expr.left)
+
+        if expr.operator.type == TokenType.OR:
+            end_jump = self._emit_jump(OpCode.JUMP_IF_TRUE)
+        else:
+            end_jump = self._emit_jump(OpCode.JUMP_IF_FALSE)
+
+        self._chunk.write(OpCode.POP)
+        self._compile_expr(expr.right)
+        self._patch_jump(end_jump)
+
+    def visit_unary(self, expr: Unary) -> None:
+        self._compile_expr(expr.right)
+
+        if expr.operator.type == TokenType.MINUS:
+            self._chunk.write(OpCode.NEGATE, self._chunk.add_token(expr.operator))
+        else:
+            self._chunk.write(OpCode.NOT)
+
+    def visit_variable(self, expr: Variable) -> None:
+        slot = self._slot(expr)
+        if slot < 0:
+            self._chunk.write(OpCode.GET_GLOBAL, self._chunk.add_token(expr.name))
+        else:
+            self._chunk.write(OpCode.GET_LOCAL, slot)
@@ -0,0 +1,214 @@
+"""Embedding API: compile a script once, then run it many times.
+
+    engine = PeuEngine()
+    program = engine.compile(source)
+    if program.errors:
+        ...
+    result = program.run(globals={"amount": 120, "country": "FR"})
+    result.output.lines, result.error
+
+Unlike the Peu command line class, nothing here writes to stderr or uses
+class-level state: compile errors and runtime errors are returned as data.
+A Program is immutable: compiling lowers the script once into the engine's
+executable form (bytecode, closures, nodes or Python code) and each run
+only binds a fresh interpreter, its globals and its output to it, so the
+same Program can run concurrently from several threads as long as they do
+not share an Environment. To run on top of a prelude without running it again,
+pass each run a fork of the prelude's globals:
+
+    prelude = engine.compile(prelude_source).run().globals
+    result = program.run(globals=prelude.fork())
+"""
+
+from closure_interpreter import ClosureInterpreter
+from environment import Environment
+from error import PeuRuntimeError
+from number import exact
+from optimizer import Optimizer
+from output import ListSink, OutputSink
+from peu_array import HOST_ARRAY_TYPES, PeuArray, from_host
+from peu_interpreter import Interpreter
+from peu_parser import ColumnarParser
+from peu_token import PeuToken
+from python_interpreter import PythonInterpreter
+from resolver import Resolution, Resolver
+from scanner import RegexScanner
+from specializing_interpreter import SpecializingInterpreter
+from stmt import Stmt
+from token_type import TokenType
+from vm import VM
+
+
+ENGINES = {
+    "tree": Interpreter,
+    "vm": VM,
+    "closure": ClosureInterpreter,
+    "python": PythonInterpreter,
+    "specialize": SpecializingInterpreter,
+}
+
+
+# Token of the runtime error reported for a division by zero; see Program.run.
+DIVISION_BY_ZERO = PeuToken(TokenType.SLASH, "/", None, 0)
+
+
+class CompileError:
+    """A syntax error, formatted like the ones peu prints on stderr."""
+
+    __slots__ = ("line", "lexeme", "message")
+
+    def __init__(self, line: int, lexeme: str | None, message: str) -> None:
+        self.line = line
+        # None when the error is at the end of the source.
+        self.lexeme = lexeme
+        self.message = message
+
+    def __str__(self) -> str:
+        where = " at end" if self.lexeme is None else f" at '{self.lexeme}'"
+        return f"[line {self.line}] Error{where}: {self.message}"
+
+    def __repr__(self) -> str:
+        return f"CompileError({self.line!r}, {self.lexeme!r}, {self.message!r})"
+
+
+class RunResult:
+    __slots__ = ("globals", "output", "error")
+
+    def __init__(
+        self,
+        globals: Environment,
+        output: OutputSink,
+        error: PeuRuntimeError | None,
+    ) -> None:
+        self.globals = globals
+        self.output = output
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class Program:
+    """A parsed, optimized, resolved and lowered script.
+
+    The statements, the resolver tables and the lowered form are only ever
+    read by the interpreters, so runs share them instead of copying them.
+    """
+
+    __slots__ = ("statements", "errors", "_resolution", "_engine", "_lowered")
+
+    def __init__(
+        self,
+        statements: tuple[Stmt, ...],
+        resolution: Resolution | None,
+        errors: tuple[CompileError, ...],
+        engine: type[Interpreter],
+        lowered: object = None,
+    ) -> None:
+        object.__setattr__(self, "statements", statements)
+        object.__setattr__(self, "errors", errors)
+        object.__setattr__(self, "_resolution", resolution)
+        object.__setattr__(self, "_engine", engine)
+        # What Interpreter.lower returned for the statements.
+        object.__setattr__(self, "_lowered", lowered)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Program is frozen")
+
+    def run(
+        self,
+        globals: dict[str, object] | Environment = None,
+        output: OutputSink = None,
+    ) -> RunResult:
+        """Runs the program against a fresh global environment holding
+        `globals`, or against `globals` itself when it is an Environment.
+
+        Python ints are converted to Peu numbers. Output goes to a new
+        ListSink unless `output` is given. The resulting globals hold str,
+        never the Ropes long concatenations build.
+
+        A division by zero, which the engines leave to Python, is returned
+        as a runtime error like the others. Its token has line 0, since no
+        engine tracks where Python raised it.
+        """
+        if self.errors:
+            raise ValueError(f"cannot run a program with errors: {self.errors[0]}")
+
+        if not isinstance(globals, Environment):
+            globals = make_environment(globals or dict())
+        if output is None:
+            output = ListSink()
+
+        interpreter = self._engine(output)
+        interpreter.use_globals(globals)
+        interpreter.use_resolution(self._resolution)
+        try:
+            interpreter.execute(self._lowered)
+            error = interpreter.runtime_error
+        except ZeroDivisionError:
+            error = PeuRuntimeError(DIVISION_BY_ZERO, "Division by zero.")
+        output.flush()
+        globals.flatten_ropes()
+
+        return RunResult(globals, output, error)
+
+
+def make_environment(values: dict[str, object]) -> Environment:
+    environment = Environment()
+    for name, value in values.items():
+        if isinstance(value, int) and not isinstance(value, bool):
+            value = exact(int(value))
+        elif isinstance(value, HOST_ARRAY_TYPES):
+            try:
+                value = from_host(value)
+            except TypeError as error:
+                raise TypeError(f"global '{name}': {error}") from None
+        elif value is not None and not isinstance(value, (bool, float, str, PeuArray)):
+            raise TypeError(
+                f"global '{name}' has type {type(value).__name__}; "
+                "expected None, bool, int, float, str or a sequence of numbers"
+            )
+        environment.define(name, value)
+
+    return environment
+
+
+class PeuEngine:
+    def __init__(self, engine: str = "tree", optimize: bool = True) -> None:
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}'.")
+
+        self._engine = ENGINES[engine]
+        self._optimize = optimize
+
+    def compile(self, source: str) -> Program:
+        tokens = RegexScanner(source).scan_columns()
+        parser = ColumnarParser(tokens)
+        statements = parser.parse()
+
+        if parser.errors:
+            errors = tuple(
+                CompileError(
+                    token.line,
+                    None if token.type == TokenType.EOF else token.lexeme,
+                    message,
+                )
+                for token, message in parser.errors
+            )
+            return Program((), None, errors, self._engine)
+
+        if self._optimize:
+            # Injected globals are only read by name at runtime, so the
+            # program's own constant globals can still be propagated.
+            statements = Optimizer(propagate_globals=True).optimize(statements)
+
+        statements = tuple(statements)
+        resolution = Resolution()
+        Resolver(resolution).resolve(statements)
+
+        interpreter = self._engine(ListSink())
+        interpreter.use_resolution(resolution)
+        lowered = interpreter.lower(statements)
+
+        return Program(statements, resolution, (), self._engine, lowered)
@@ -1,34 +1,100 @@
 from error import PeuRuntimeError
 from peu_token import PeuToken
+from rope import Rope
+
+
+# Frozen dicts an environment may stack before fork merges them into one.
+MAX_FROZEN = 8
 
 
 class Environment:
-    def __init__(self, enclosing = None) -> None:
+    def __init__(self, enclosing = None, size: int = 0) -> None:
         self._values = dict()
+        # Read-only dicts shared with forks, newest first; see fork.
+        self._frozen: tuple[dict[str, object], ...] = ()
+        self.slots = [None] * size
         self.enclosing = enclosing
 
     def define(self, name: str, value: object) -> None:
         self._values[name] = value
 
     def get(self, name: PeuToken) -> object:
-        value = self._values.get(name.lexeme)
-
-        if value is None:
-            if self.enclosing is None:
-                raise PeuRuntimeError(name, f"Undefined variable '{name.lexeme}'.")
-            
-            return self.enclosing.get(name)
-        
-        return value
-    
-    def assign(self, name: PeuToken, value: object) -> None:
-        current_value = self._values.get(name.lexeme)
+        if name.lexeme in self._values:
+            return self._values[name.lexeme]
+
+        for values in self._frozen:
+            if name.lexeme in values:
+                return values[name.lexeme]
+
+        if self.enclosing is None:
+            raise PeuRuntimeError(name, f"Undefined variable '{name.lexeme}'.")
 
-        if (current_value is None):
-            if self.enclosing is None:
-                raise PeuRuntimeError(name, f"Undefined variable '{name.lexeme}'.")
-            
-            self.enclosing.assign(name, value)
+        return self.enclosing.get(name)
+
+    def get_at(self, distance: int, slot: int) -> object:
+        environment = self
+        for _ in range(distance):
+            environment = environment.enclosing
+
+        return environment.slots[slot]
+
+    def assign(self, name: PeuToken, value: object) -> None:
+        if name.lexeme in self._values:
+            self._values[name.lexeme] = value
             return
-            
-        self._values[name.lexeme] = value
\ No newline at end of file
+
+        for values in self._frozen:
+            if name.lexeme in values:
+                # Copy on write: the frozen dict is shared with other forks.
+                self._values[name.lexeme] = value
+                return
+
+        if self.enclosing is None:
+            raise PeuRuntimeError(name, f"Undefined variable '{name.lexeme}'.")
+
+        self.enclosing.assign(name, value)
+
+    def assign_at(self, distance: int, slot: int, value: object) -> None:
+        environment = self
+        for _ in range(distance):
+            environment = environment.enclosing
+
+        environment.slots[slot] = value
+
+    def flatten_ropes(self) -> None:
+        """Replaces the Ropes among the variables defined or assigned since
+        the last fork with the plain strings they stand for.
+
+        Inherited variables are left alone: the embedding API flattens an
+        environment at the end of every run, before the host can fork it.
+        """
+        values = self._values
+        for name, value in values.items():
+            if type(value) is Rope:
+                values[name] = str(value)
+
+    def fork(self) -> "Environment":
+        """Returns an environment starting with the same variables, without
+        copying them.
+
+        Both environments then evolve independently. Their variables so far
+        move to a dict that neither modifies any more, and each only stores
+        the variables it defines or assigns from then on. Meant for the
+        global environment: slots are copied, not shared.
+        """
+        if self._values:
+            frozen = (self._values,) + self._frozen
+            if len(frozen) > MAX_FROZEN:
+                # Keeps lookups short. Only happens when an environment is
+                # forked again and again between changes.
+                merged = dict()
+                for values in reversed(frozen):
+                    merged.update(values)
+                frozen = (merged,)
+            self._frozen = frozen
+            self._values = dict()
+
+        forked = Environment(self.enclosing)
+        forked._frozen = self._frozen
+        forked.slots = list(self.slots)
+        return forked
@@ -1,25 +1,46 @@
 from peu_token import PeuToken
 
 class Expr:
+    __slots__ = ()
+
     def accept(self, visitor): pass
 
+class Array(Expr):
+    __slots__ = ("bracket", "elements")
+
+    def __init__(self, bracket: PeuToken, elements: list[Expr]) -> None:
+        self.bracket = bracket
+        self.elements = elements
+
+    def accept(self, visitor):
+        return visitor.visit_array(self)
+
+    def __reduce__(self):
+        return (Array, (self.bracket, self.elements))
+
+    def __repr__(self) -> str:
+        return f"Array({self.bracket}, {self.elements})"
+
 class Assign(Expr):
-    def __init__(self, name: PeuToken, value: Expr) -> None:
-        super().__init__()
+    __slots__ = ("name", "value")
 
+    def __init__(self, name: PeuToken, value: Expr) -> None:
         self.name = name
         self.value = value
 
     def accept(self, visitor):
         return visitor.visit_assign(self)
 
+    def __reduce__(self):
+        return (Assign, (self.name, self.value))
+
     def __repr__(self) -> str:
         return f"Assign({self.name}, {self.value})"
 
 class Binary(Expr):
-    def __init__(self, left: Expr, operator: PeuToken, right: Expr) -> None:
-        super().__init__()
+    __slots__ = ("left", "operator", "right")
 
+    def __init__(self, left: Expr, operator: PeuToken, right: Expr) -> None:
         self.left = left
         self.operator = operator
         self.right = right
@@ -27,37 +48,47 @@ class Binary(Expr):
     def accept(self, visitor):
         return visitor.visit_binary(self)
 
+    def __reduce__(self):
+        return (Binary, (self.left, self.operator, self.right))
+
     def __repr__(self) -> str:
         return f"Binary({self.left}, {self.operator}, {self.right})"
 
 class Grouping(Expr):
-    def __init__(self, expression: Expr) -> None:
-        super().__init__()
+    __slots__ = ("expression",)
 
+    def __init__(self, expression: Expr) -> None:
         self.expression = expression
 
     def accept(self, visitor):
         return visitor.visit_grouping(self)
 
+    def __reduce__(self):
+        return (Grouping, (self.expression,))
+
     def __repr__(self) -> str:
         return f"Grouping({self.expression})"
 
 class Literal(Expr):
-    def __init__(self, value: object) -> None:
-        super().__init__()
+    __slots__ = ("token", "value")
 
+    def __init__(self, token: PeuToken, value: object) -> None:
+        self.token = token
         self.value = value
 
     def accept(self, visitor):
         return visitor.visit_literal(self)
 
+    def __reduce__(self):
+        return (Literal, (self.token, self.value))
+
     def __repr__(self) -> str:
-        return f"Literal({self.value})"
+        return f"Literal({self.token}, {self.value})"
 
 class Logical(Expr):
-    def __init__(self, left: Expr, operator: PeuToken, right: Expr) -> None:
-        super().__init__()
+    __slots__ = ("left", "operator", "right")
 
+    def __init__(self, left: Expr, operator: PeuToken, right: Expr) -> None:
         self.left = left
         self.operator = operator
         self.right = right
@@ -65,35 +96,214 @@ class Logical(Expr):
     def accept(self, visitor):
         return visitor.visit_logical(self)
 
+    def __reduce__(self):
+        return (Logical, (self.left, self.operator, self.right))
+
     def __repr__(self) -> str:
         return f"Logical({self.left}, {self.operator}, {self.right})"
 
 class Unary(Expr):
-    def __init__(self, operator: PeuToken, right: Expr) -> None:
-        super().__init__()
+    __slots__ = ("operator", "right")
 
+    def __init__(self, operator: PeuToken, right: Expr) -> None:
         self.operator = operator
         self.right = right
 
     def accept(self, visitor):
         return visitor.visit_unary(self)
 
+    def __reduce__(self):
+        return (Unary, (self.operator, self.right))
+
     def __repr__(self) -> str:
         return f"Unary({self.operator}, {self.right})"
 
 class Variable(Expr):
-    def __init__(self, name: PeuToken) -> None:
-        super().__init__()
+    __slots__ = ("name",)
 
+    def __init__(self, name: PeuToken) -> None:
         self.name = name
 
     def accept(self, visitor):
         return visitor.visit_variable(self)
 
+    def __reduce__(self):
+        return (Variable, (self.name,))
+
     def __repr__(self) -> str:
         return f"Variable({self.name})"
 
+class Add(Binary):
+    __slots__ = ()
+
+    def accept(self, visitor):
+        return visitor.visit_add(self)
+
+    def __reduce__(self):
+        return (Add, (self.left, self.operator, self.right))
+
+    def __repr__(self) -> str:
+        return f"Add({self.left}, {self.operator}, {self.right})"
+
+class Subtract(Binary):
+    __slots__ = ()
+
+    def accept(self, visitor):
+        return visitor.visit_subtract(self)
+
+    def __reduce__(self):
+        return (Subtract, (self.left, self.operator, self.right))
+
+    def __repr__(self) -> str:
+        return f"Subtract({self.left}, {self.operator}, {self.right})"
+
+class Multiply(Binary):
+    __slots__ = ()
+
+    def accept(self, visitor):
+        return visitor.visit_multiply(self)
+
+    def __reduce__(self):
+        return (Multiply, (self.left, self.operator, self.right))
+
+    def __repr__(self) -> str:
+        return f"Multiply({self.left}, {self.operator}, {self.right})"
+
+class Divide(Binary):
+    __slots__ = ()
+
+    def accept(self, visitor):
+        return visitor.visit_divide(self)
+
+    def __reduce__(self):
+        return (Divide, (self.left, self.operator, self.right))
+
+    def __repr__(self) -> str:
+        return f"Divide({self.left}, {self.operator}, {self.right})"
+
+class Greater(Binary):
+    __slots__ = ()
+
+    def accept(self, visitor):
+        return visitor.visit_greater(self)
+
+    def __reduce__(self):
+        return (Greater, (self.left, self.operator, self.right))
+
+    def __repr__(self) -> str:
+        return f"Greater({self.left}, {self.operator}, {self.right})"
+
+class GreaterEqual(Binary):
+    __slots__ = ()
+
+    def accept(self, visitor):
+        return visitor.visit_greaterequal(self)
+
+    def __reduce__(self):
+        return (GreaterEqual, (self.left, self.operator, self.right))
+
+    def __repr__(self) -> str:
+        return f"GreaterEqual({self.left}, {self.operator}, {self.right})"
+
+class Less(Binary):
+    __slots__ = ()
+
+    def accept(self, visitor):
+        return visitor.visit_less(self)
+
+    def __reduce__(self):
+        return (Less, (self.left, self.operator, self.right))
+
+    def __repr__(self) -> str:
+        return f"Less({self.left}, {self.operator}, {self.right})"
+
+class LessEqual(Binary):
+    __slots__ = ()
+
+    def accept(self, visitor):
+        return visitor.visit_lessequal(self)
+
+    def __reduce__(self):
+        return (LessEqual, (self.left, self.operator, self.right))
+
+    def __repr__(self) -> str:
+        return f"LessEqual({self.left}, {self.operator}, {self.right})"
+
+class EqualEqual(Binary):
+    __slots__ = ()
+
+    def accept(self, visitor):
+        return visitor.visit_equalequal(self)
+
+    def __reduce__(self):
+        return (EqualEqual, (self.left, self.operator, self.right))
+
+    def __repr__(self) -> str:
+        return f"EqualEqual({self.left}, {self.operator}, {self.right})"
+
+class BangEqual(Binary):
+    __slots__ = ()
+
+    def accept(self, visitor):
+        return visitor.visit_bangequal(self)
+
+    def __reduce__(self):
+        return (BangEqual, (self.left, self.operator, self.right))
+
+    def __repr__(self) -> str:
+        return f"BangEqual({self.left}, {self.operator}, {self.right})"
+
+class And(Logical):
+    __slots__ = ()
+
+    def accept(self, visitor):
+        return visitor.visit_and(self)
+
+    def __reduce__(self):
+        return (And, (self.left, self.operator, self.right))
+
+    def __repr__(self) -> str:
+        return f"And({self.left}, {self.operator}, {self.right})"
+
+class Or(Logical):
+    __slots__ = ()
+
+    def accept(self, visitor):
+        return visitor.visit_or(self)
+
+    def __reduce__(self):
+        return (Or, (self.left, self.operator, self.right))
+
+    def __repr__(self) -> str:
+        return f"Or({self.left}, {self.operator}, {self.right})"
+
+class Negate(Unary):
+    __slots__ = ()
+
+    def accept(self, visitor):
+        return visitor.visit_negate(self)
+
+    def __reduce__(self):
+        return (Negate, (self.operator, self.right))
+
+    def __repr__(self) -> str:
+        return f"Negate({self.operator}, {self.right})"
+
+class Not(Unary):
+    __slots__ = ()
+
+    def accept(self, visitor):
+        return visitor.visit_not(self)
+
+    def __reduce__(self):
+        return (Not, (self.operator, self.right))
+
+    def __repr__(self) -> str:
+        return f"Not({self.operator}, {self.right})"
+
 class Visitor:
+    def visit_array(self, expr: Array): raise NotImplementedError
+
     def visit_assign(self, expr: Assign): raise NotImplementedError
 
     def visit_binary(self, expr: Binary): raise NotImplementedError
@@ -108,3 +318,31 @@ class Visitor:
 
     def visit_variable(self, expr: Variable): raise NotImplementedError
 
+    def visit_add(self, expr: Add): return self.visit_binary(expr)
+
+    def visit_subtract(self, expr: Subtract): return self.visit_binary(expr)
+
+    def visit_multiply(self, expr: Multiply): return self.visit_binary(expr)
+
+    def visit_divide(self, expr: Divide): return self.visit_binary(expr)
+
+    def visit_greater(self, expr: Greater): return self.visit_binary(expr)
+
+    def visit_greaterequal(self, expr: GreaterEqual): return self.visit_binary(expr)
+
+    def visit_less(self, expr: Less): return self.visit_binary(expr)
+
+    def visit_lessequal(self, expr: LessEqual): return self.visit_binary(expr)
+
+    def visit_equalequal(self, expr: EqualEqual): return self.visit_binary(expr)
+
+    def visit_bangequal(self, expr: BangEqual): return self.visit_binary(expr)
+
+    def visit_and(self, expr: And): return self.visit_logical(expr)
+
+    def visit_or(self, expr: Or): return self.visit_logical(expr)
+
+    def visit_negate(self, expr: Negate): return self.visit_unary(expr)
+
+    def visit_not(self, expr: Not): return self.visit_unary(expr)
+
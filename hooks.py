@@ -0,0 +1,79 @@
+"""Hooks let a host observe a running Interpreter without subclassing it.
+
+    interpreter.add_hook("statement_enter", callback, node_types=(Print,))
+    interpreter.add_hook("assign", callback, lines={12, 13})
+
+Events and the arguments their callbacks receive:
+
+    statement_enter   (stmt)                before a statement runs
+    statement_exit    (stmt)                after it completed normally
+    define            (stmt: Var, value)    a variable was declared
+    assign            (expr: Assign, value) a variable was assigned
+    runtime_error     (error)               a PeuRuntimeError stopped the run
+
+`node_types` keeps only nodes that are instances of one of the given
+classes and `lines` only nodes (or errors) on one of the given lines.
+Hooks are dispatched by the tree-walking interpreter: the other engines
+fall back to it while hooks are installed.
+"""
+
+from typing import Callable, Iterable
+
+from expr import Array, Assign, Binary, Grouping, Literal, Logical, Unary, Variable
+from peu_token import PeuToken
+from stmt import Block, Expression, For, If, Print, Var, While
+
+
+EVENTS = ("statement_enter", "statement_exit", "define", "assign", "runtime_error")
+
+
+class Hook:
+    def __init__(
+        self,
+        event: str,
+        callback: Callable[..., object],
+        node_types: tuple[type, ...] = None,
+        lines: Iterable[int] = None,
+    ) -> None:
+        if event not in EVENTS:
+            raise ValueError(f"Unknown hook event '{event}'.")
+
+        self.event = event
+        self.callback = callback
+        self.node_types = tuple(node_types) if node_types is not None else None
+        self.lines = frozenset(lines) if lines is not None else None
+
+    def matches(self, node: object) -> bool:
+        if self.node_types is not None and not isinstance(node, self.node_types):
+            return False
+
+        return self.lines is None or node_line(node) in self.lines
+
+
+def node_line(node: object) -> int:
+    """Source line of a node."""
+    return node_token(node).line
+
+
+def node_token(node: object) -> PeuToken:
+    """The first token found in a node; every node has one."""
+    if isinstance(node, (Var, Assign, Variable)):
+        return node.name
+    if isinstance(node, (Binary, Logical, Unary)):
+        return node.operator
+    if isinstance(node, Literal):
+        return node.token
+    if isinstance(node, Array):
+        return node.bracket
+    if isinstance(node, Block):
+        return node.brace
+    if isinstance(node, (If, While)):
+        return node_token(node.condition)
+    if isinstance(node, For):
+        if node.initializer is not None:
+            return node_token(node.initializer)
+        return node_token(node.condition)
+    if isinstance(node, (Expression, Print, Grouping)):
+        return node_token(node.expression)
+
+    raise TypeError(f"not an AST node: {node!r}")
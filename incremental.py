@@ -0,0 +1,246 @@
+"""Incremental front end for the REPL and editor integrations.
+
+    parser = IncrementalParser(source)
+    change = parser.edit(start, end, "new text")
+    parser.statements, parser.errors
+
+The source is kept as a list of top-level declarations, each with its own
+tokens. An edit re-scans from the start of the declaration it touches
+until the new tokens line up again with the first token of an unchanged
+declaration, and re-parses declarations until the parser reaches such a
+token. Later declarations are reused as they are: only their offsets and,
+when the edit added or removed lines, their line numbers move.
+
+Line numbers are shifted lazily: the tokens of a reused declaration are
+only updated when it is read again.
+"""
+
+from bisect import bisect_left, bisect_right
+
+from peu_parser import PeuParser
+from peu_token import PeuToken
+from scanner import RegexScanner
+from stmt import Stmt
+from token_type import TokenType
+
+
+class Declaration:
+    """A top-level declaration and the tokens it was parsed from.
+
+    `offsets` are relative to the first token. `statement` is None when the
+    declaration has a syntax error, and `errors` holds (token, message).
+    """
+
+    __slots__ = ("tokens", "offsets", "statement", "errors")
+
+    def __init__(
+        self,
+        tokens: list[PeuToken],
+        offsets: list[int],
+        statement: Stmt | None,
+        errors: list[tuple[PeuToken, str]],
+    ) -> None:
+        self.tokens = tokens
+        self.offsets = offsets
+        self.statement = statement
+        self.errors = errors
+
+
+class Change:
+    """Declarations [index, index + removed) were replaced by
+    `declarations`.
+    """
+
+    __slots__ = ("index", "removed", "declarations")
+
+    def __init__(self, index: int, removed: int, declarations: list[Declaration]) -> None:
+        self.index = index
+        self.removed = removed
+        self.declarations = declarations
+
+
+class DeclarationParser(PeuParser):
+    """PeuParser whose token list grows on demand: `more` appends the
+    tokens of the next reused declaration, or EOF, when the parser reads
+    past the end.
+    """
+
+    def __init__(self, tokens: list[PeuToken], more) -> None:
+        super().__init__(tokens)
+        self._more = more
+
+    def _peek(self) -> PeuToken:
+        try:
+            return self._tokens[self._current]
+        except IndexError:
+            while self._current >= len(self._tokens):
+                self._more()
+            return self._tokens[self._current]
+
+
+class IncrementalParser:
+    def __init__(self, source: str = "") -> None:
+        self.source = ""
+        self._declarations: list[Declaration] = []
+        # Current offset and line of the first token of each declaration.
+        self._starts: list[int] = []
+        self._lines: list[int] = []
+        self._eof_line = 1
+
+        if source:
+            self.edit(0, 0, source)
+
+    def __len__(self) -> int:
+        return len(self._declarations)
+
+    def declaration(self, index: int) -> Declaration:
+        return self._moved_to(index, self._lines[index])
+
+    def start(self, index: int) -> int:
+        """Offset of the first token of declaration `index`."""
+        return self._starts[index]
+
+    def _moved_to(self, index: int, line: int) -> Declaration:
+        """Returns declaration `index` after moving its tokens to `line`."""
+        declaration = self._declarations[index]
+
+        shift = line - declaration.tokens[0].line
+        if shift:
+            for token in declaration.tokens:
+                token.line += shift
+            # Errors at the end of the source hold the EOF token, which is
+            # not one of the declaration's tokens, possibly more than once.
+            eof = {token for token, _ in declaration.errors if token.type == TokenType.EOF}
+            for token in eof:
+                token.line += shift
+
+        return declaration
+
+    @property
+    def statements(self) -> list[Stmt | None]:
+        return [self.declaration(i).statement for i in range(len(self))]
+
+    @property
+    def errors(self) -> list[tuple[PeuToken, str]]:
+        errors = []
+        for i in range(len(self)):
+            errors.extend(self.declaration(i).errors)
+        return errors
+
+    @property
+    def tokens(self) -> list[PeuToken]:
+        tokens = []
+        for i in range(len(self)):
+            tokens.extend(self.declaration(i).tokens)
+        tokens.append(PeuToken(TokenType.EOF, "", None, self._eof_line))
+        return tokens
+
+    def edit(self, start: int, end: int, text: str) -> Change:
+        """Replaces source[start:end] with `text` and returns the
+        declarations that were re-parsed.
+        """
+        source = self.source[:start] + text + self.source[end:]
+        delta = len(text) - (end - start)
+        starts = self._starts
+        lines = self._lines
+        count = len(starts)
+
+        # Re-scan from the declaration holding `start`, or from the one
+        # before when the edit reaches its first token: that token is the
+        # lookahead the previous declaration was parsed with.
+        first = bisect_right(starts, start) - 1
+        if first >= 0:
+            head = self._declarations[first].tokens[0]
+            if start <= starts[first] + len(head.lexeme):
+                first -= 1
+        if first < 0:
+            first, position, line = 0, 0, 1
+        else:
+            head = self._declarations[first].tokens[0]
+            # A string token is on the line where it ends.
+            position, line = starts[first], lines[first] - head.lexeme.count("\n")
+
+        tokens = []
+        offsets = []
+        # Reused declarations start at old offsets beyond the edit.
+        reuse = max(bisect_left(starts, end), first + 1)
+        line_delta = 0
+        candidate = reuse
+        for offset, token in RegexScanner.scan_from(source, position, line):
+            while candidate < count and starts[candidate] + delta < offset:
+                candidate += 1
+            if candidate < count and starts[candidate] + delta == offset:
+                old = self._declarations[candidate].tokens[0]
+                if token.type == old.type and token.lexeme == old.lexeme:
+                    # Same token at the same place in unchanged text: the
+                    # rest of the scan would be identical.
+                    reuse = candidate
+                    line_delta = token.line - lines[candidate]
+                    break
+
+            tokens.append(token)
+            offsets.append(offset)
+        else:
+            reuse = count
+
+        # Parser index of the first token of each reused declaration.
+        boundaries = dict()
+        next_reused = reuse
+
+        def more() -> None:
+            nonlocal next_reused
+            if next_reused == count:
+                offsets.append(len(source))
+                tokens.append(PeuToken(TokenType.EOF, "", None, self._eof_line + line_delta))
+                next_reused += 1
+                return
+
+            declaration = self._moved_to(next_reused, lines[next_reused] + line_delta)
+            boundaries[len(tokens)] = next_reused
+            base = starts[next_reused] + delta
+            tokens.extend(declaration.tokens)
+            offsets.extend(base + offset for offset in declaration.offsets)
+            next_reused += 1
+
+        parser = DeclarationParser(tokens, more)
+        declarations = []
+        new_starts = []
+        new_lines = []
+        stop = count
+        while True:
+            parser._peek()
+            if parser._current in boundaries:
+                stop = boundaries[parser._current]
+                break
+            if parser._is_at_end():
+                break
+
+            begin = parser._current
+            statement = parser._declaration()
+            base = offsets[begin]
+            declarations.append(
+                Declaration(
+                    tokens[begin:parser._current],
+                    [offset - base for offset in offsets[begin:parser._current]],
+                    statement,
+                    parser.errors,
+                )
+            )
+            parser.errors = []
+            new_starts.append(base)
+            new_lines.append(tokens[begin].line)
+
+        self._declarations[first:stop] = declarations
+        starts[first:] = new_starts + [offset + delta for offset in starts[stop:]]
+        if line_delta:
+            lines[first:] = new_lines + [line + line_delta for line in lines[stop:]]
+        else:
+            lines[first:] = new_lines + lines[stop:]
+
+        self.source = source
+        if tokens and tokens[-1].type == TokenType.EOF:
+            self._eof_line = tokens[-1].line
+        else:
+            self._eof_line += line_delta
+
+        return Change(first, stop - first, declarations)
@@ -0,0 +1,68 @@
+"""Peu numbers.
+
+Peu has a single number type, with the semantics of a Python float. The
+numbers that are integers are kept as Python ints instead, which are
+cheaper to create and to operate on, as long as the float they stand for
+is exact: an int is always between -MAX_EXACT and MAX_EXACT. An integer
+result outside that range is turned into a float, and so is a product that
+should be -0.0, which no int can represent. Division always returns a
+float.
+
+Every operation therefore gives the value float arithmetic would have
+given, and ints print like the floats they stand for: 3 prints as 3.0.
+"""
+
+# Every int up to 2**53 is an exact float; the next one is not.
+MAX_EXACT = 2 ** 53
+MIN_EXACT = -MAX_EXACT
+
+# Test numbers with `type(value) in NUMBER_TYPES`: bool is an int subclass
+# but not a Peu number, so isinstance() does not do. A set takes as long to
+# search for either type.
+NUMBER_TYPES = frozenset((int, float))
+
+
+def parse_number(lexeme: str) -> int | float:
+    """Value of a NUMBER token."""
+    # MAX_EXACT has 16 digits; longer literals are never exact, and int()
+    # refuses very long ones.
+    if "." in lexeme or len(lexeme) > 16:
+        return float(lexeme)
+    return exact(int(lexeme))
+
+
+def exact(value: int) -> int | float:
+    """Returns `value`, or the float it rounds to when it is out of range."""
+    if MIN_EXACT <= value <= MAX_EXACT:
+        return value
+    return float(value)
+
+
+# The functions below expect two numbers.
+
+def add(left: int | float, right: int | float) -> int | float:
+    result = left + right
+    if type(result) is int and not MIN_EXACT <= result <= MAX_EXACT:
+        return float(result)
+    return result
+
+
+def subtract(left: int | float, right: int | float) -> int | float:
+    result = left - right
+    if type(result) is int and not MIN_EXACT <= result <= MAX_EXACT:
+        return float(result)
+    return result
+
+
+def multiply(left: int | float, right: int | float) -> int | float:
+    result = left * right
+    if type(result) is int and not (result and MIN_EXACT <= result <= MAX_EXACT):
+        # Zero times a negative number is -0.0.
+        return float(left) * float(right)
+    return result
+
+
+def negate(value: int | float) -> int | float:
+    if type(value) is int and not value:
+        return -0.0
+    return -value
@@ -0,0 +1,339 @@
+from error import PeuRuntimeError
+from expr import Array, Assign, Binary, Expr, Grouping, Literal, Logical, Unary, Variable, Visitor as ExprVisitor
+from hooks import node_token
+from peu_interpreter import Interpreter
+from peu_token import PeuToken
+from rope import Rope
+from stmt import Block, Expression, For, If, Print, Stmt, Var, While, Visitor as StmtVisitor
+from token_type import TokenType
+
+
+class Optimizer(ExprVisitor, StmtVisitor):
+    """AST pass run between parsing and resolution.
+
+    - folds Binary/Unary/Logical nodes whose operands are Literals,
+      arrays excepted,
+    - strips Grouping wrappers,
+    - propagates the value of variables declared with a constant and never
+      reassigned,
+    - drops If branches and loops whose condition folds to a constant.
+
+    Folding evaluates the node with the Interpreter itself, so the result is
+    exactly what would have been computed at runtime; a fold that raises is
+    left in place so the error still happens at runtime.
+
+    When `propagate_globals` is false, globals are never treated as
+    constants: the REPL and the streaming mode cannot know whether a later
+    declaration reassigns them.
+    """
+
+    def __init__(self, propagate_globals: bool = True) -> None:
+        super().__init__()
+
+        self._interpreter = Interpreter()
+        self._propagate_globals = propagate_globals
+        # Innermost last; the first scope holds the globals.
+        self._scopes: list[dict[str, Var]] = [dict()]
+        self._constants: dict[Var, object] = dict()
+        self._reassigned: set[Var] = set()
+        self._assigned_globals: set[str] = set()
+
+    def optimize(self, statements: list[Stmt]) -> list[Stmt]:
+        analysis = AssignmentAnalysis()
+        analysis.analyze(statements)
+        self._reassigned = analysis.reassigned
+        self._assigned_globals = analysis.assigned_globals
+
+        return self._optimize_statements(statements)
+
+    def _optimize_statements(self, statements: list[Stmt]) -> list[Stmt]:
+        optimized = []
+        for statement in statements:
+            statement = statement.accept(self)
+            if statement is not None:
+                optimized.append(statement)
+
+        return optimized
+
+    def _optimize_expr(self, expr: Expr) -> Expr:
+        return expr.accept(self)
+
+    def _fold(self, expr: Expr, token: PeuToken) -> Expr:
+        try:
+            value = self._interpreter._evaluate(expr)
+        except (PeuRuntimeError, ArithmeticError):
+            return expr
+
+        if isinstance(value, Rope):
+            # Literals hold plain strings, e.g. for the transpiler.
+            value = str(value)
+        # `token` gives the literal the line of the expression it replaces.
+        return Literal(token, value)
+
+    def _lookup(self, name: str) -> Var | None:
+        for scope in reversed(self._scopes):
+            declaration = scope.get(name)
+            if declaration is not None:
+                return declaration
+
+        return None
+
+    def visit_block(self, stmt: Block) -> Stmt:
+        self._scopes.append(dict())
+        statements = self._optimize_statements(stmt.statements)
+        self._scopes.pop()
+
+        return Block(stmt.brace, statements)
+
+    def visit_expression(self, stmt: Expression) -> Stmt | None:
+        expression = self._optimize_expr(stmt.expression)
+        if isinstance(expression, Literal):
+            return None
+
+        return Expression(expression)
+
+    def visit_if(self, stmt: If) -> Stmt | None:
+        condition = self._optimize_expr(stmt.condition)
+
+        if isinstance(condition, Literal):
+            if self._interpreter._is_truthy(condition.value):
+                return stmt.then_branch.accept(self)
+            if stmt.else_branch is not None:
+                return stmt.else_branch.accept(self)
+            return None
+
+        then_branch = self._optimize_body(stmt.then_branch, condition)
+
+        else_branch = None
+        if stmt.else_branch is not None:
+            else_branch = stmt.else_branch.accept(self)
+
+        return If(condition, then_branch, else_branch)
+
+    def visit_for(self, stmt: For) -> Stmt | None:
+        self._scopes.append(dict())
+        try:
+            initializer = None
+            if stmt.initializer is not None:
+                initializer = stmt.initializer.accept(self)
+
+            condition = self._optimize_expr(stmt.condition)
+            if isinstance(condition, Literal) and not self._interpreter._is_truthy(
+                condition.value
+            ):
+                # The initializer still runs, in a scope of its own.
+                if initializer is None:
+                    return None
+                return Block(node_token(initializer), [initializer])
+
+            increment = None
+            if stmt.increment is not None:
+                increment = self._optimize_expr(stmt.increment)
+
+            body = self._optimize_body(stmt.body, condition)
+            return For(initializer, condition, increment, body)
+        finally:
+            self._scopes.pop()
+
+    def visit_while(self, stmt: While) -> Stmt | None:
+        condition = self._optimize_expr(stmt.condition)
+        if isinstance(condition, Literal) and not self._interpreter._is_truthy(
+            condition.value
+        ):
+            return None
+
+        return While(condition, self._optimize_body(stmt.body, condition))
+
+    def _optimize_body(self, body: Stmt, condition: Expr) -> Stmt:
+        """Optimizes a branch or loop body, which cannot be left out; one
+        that optimizes away becomes an empty block on the condition's line.
+        """
+        body = body.accept(self)
+        if body is None:
+            return Block(node_token(condition), [])
+
+        return body
+
+    def visit_print(self, stmt: Print) -> Stmt:
+        return Print(self._optimize_expr(stmt.expression))
+
+    def visit_var(self, stmt: Var) -> Stmt:
+        initializer = stmt.initializer
+        if initializer is not None:
+            initializer = self._optimize_expr(initializer)
+
+        declaration = Var(stmt.name, initializer)
+        self._scopes[-1][stmt.name.lexeme] = stmt
+
+        is_global = len(self._scopes) == 1
+        if stmt in self._reassigned:
+            return declaration
+        if is_global and (
+            not self._propagate_globals
+            or stmt.name.lexeme in self._assigned_globals
+        ):
+            return declaration
+
+        if initializer is None:
+            self._constants[stmt] = None
+        elif isinstance(initializer, Literal):
+            self._constants[stmt] = initializer.value
+
+        return declaration
+
+    def visit_array(self, expr: Array) -> Expr:
+        # Never folded: Literals only hold immutable Python values.
+        return Array(
+            expr.bracket, [self._optimize_expr(element) for element in expr.elements]
+        )
+
+    def visit_assign(self, expr: Assign) -> Expr:
+        return Assign(expr.name, self._optimize_expr(expr.value))
+
+    def visit_binary(self, expr: Binary) -> Expr:
+        left = self._optimize_expr(expr.left)
+        right = self._optimize_expr(expr.right)
+        binary = type(expr)(left, expr.operator, right)
+
+        if isinstance(left, Literal) and isinstance(right, Literal):
+            return self._fold(binary, expr.operator)
+
+        return binary
+
+    def visit_grouping(self, expr: Grouping) -> Expr:
+        return self._optimize_expr(expr.expression)
+
+    def visit_literal(self, expr: Literal) -> Expr:
+        return expr
+
+    def visit_logical(self, expr: Logical) -> Expr:
+        left = self._optimize_expr(expr.left)
+        right = self._optimize_expr(expr.right)
+
+        if isinstance(left, Literal):
+            is_truthy = self._interpreter._is_truthy(left.value)
+            if expr.operator.type == TokenType.OR:
+                return left if is_truthy else right
+            return right if is_truthy else left
+
+        return type(expr)(left, expr.operator, right)
+
+    def visit_unary(self, expr: Unary) -> Expr:
+        right = self._optimize_expr(expr.right)
+        unary = type(expr)(expr.operator, right)
+
+        if isinstance(right, Literal):
+            return self._fold(unary, expr.operator)
+
+        return unary
+
+    def visit_variable(self, expr: Variable) -> Expr:
+        declaration = self._lookup(expr.name.lexeme)
+        if declaration is not None and declaration in self._constants:
+            return Literal(expr.name, self._constants[declaration])
+
+        return expr
+
+
+class AssignmentAnalysis(ExprVisitor, StmtVisitor):
+    """Finds the declarations that are assigned or redeclared anywhere.
+
+    Scoping follows the Resolver, so an assignment is attributed to the
+    declaration it updates at runtime. Assignments to a global that is not
+    declared yet are recorded by name.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+
+        self._scopes: list[dict[str, Var]] = [dict()]
+        self.reassigned: set[Var] = set()
+        self.assigned_globals: set[str] = set()
+
+    def analyze(self, statements: list[Stmt]) -> None:
+        for statement in statements:
+            statement.accept(self)
+
+    def _lookup(self, name: str) -> Var | None:
+        for scope in reversed(self._scopes):
+            declaration = scope.get(name)
+            if declaration is not None:
+                return declaration
+
+        return None
+
+    def visit_block(self, stmt: Block) -> None:
+        self._scopes.append(dict())
+        self.analyze(stmt.statements)
+        self._scopes.pop()
+
+    def visit_expression(self, stmt: Expression) -> None:
+        stmt.expression.accept(self)
+
+    def visit_if(self, stmt: If) -> None:
+        stmt.condition.accept(self)
+        stmt.then_branch.accept(self)
+        if stmt.else_branch is not None:
+            stmt.else_branch.accept(self)
+
+    def visit_for(self, stmt: For) -> None:
+        self._scopes.append(dict())
+        if stmt.initializer is not None:
+            stmt.initializer.accept(self)
+        stmt.condition.accept(self)
+        if stmt.increment is not None:
+            stmt.increment.accept(self)
+        stmt.body.accept(self)
+        self._scopes.pop()
+
+    def visit_while(self, stmt: While) -> None:
+        stmt.condition.accept(self)
+        stmt.body.accept(self)
+
+    def visit_print(self, stmt: Print) -> None:
+        stmt.expression.accept(self)
+
+    def visit_var(self, stmt: Var) -> None:
+        if stmt.initializer is not None:
+            stmt.initializer.accept(self)
+
+        scope = self._scopes[-1]
+        previous = scope.get(stmt.name.lexeme)
+        if previous is not None:
+            # Redeclaring in the same scope updates the same variable.
+            self.reassigned.add(previous)
+            self.reassigned.add(stmt)
+        scope[stmt.name.lexeme] = stmt
+
+    def visit_array(self, expr: Array) -> None:
+        for element in expr.elements:
+            element.accept(self)
+
+    def visit_assign(self, expr: Assign) -> None:
+        expr.value.accept(self)
+
+        declaration = self._lookup(expr.name.lexeme)
+        if declaration is None:
+            self.assigned_globals.add(expr.name.lexeme)
+        else:
+            self.reassigned.add(declaration)
+
+    def visit_binary(self, expr: Binary) -> None:
+        expr.left.accept(self)
+        expr.right.accept(self)
+
+    def visit_grouping(self, expr: Grouping) -> None:
+        expr.expression.accept(self)
+
+    def visit_literal(self, expr: Literal) -> None:
+        pass
+
+    def visit_logical(self, expr: Logical) -> None:
+        expr.left.accept(self)
+        expr.right.accept(self)
+
+    def visit_unary(self, expr: Unary) -> None:
+        expr.right.accept(self)
+
+    def visit_variable(self, expr: Variable) -> None:
+        pass
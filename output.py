@@ -0,0 +1,92 @@
+import io
+import sys
+from typing import TextIO
+
+
+class OutputSink:
+    """Destination of the lines written by print statements.
+
+    `print` receives the stringified value without its trailing newline.
+    Sinks that hold output back must write it out on `flush`.
+    """
+
+    def print(self, text: str) -> None:
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        pass
+
+
+class StdoutSink(OutputSink):
+    """Writes every line straight to the stream (sys.stdout by default),
+    flushing it after each line when `unbuffered` is set.
+    """
+
+    def __init__(self, stream: TextIO = None, unbuffered: bool = False) -> None:
+        self._stream = stream
+        self._unbuffered = unbuffered
+
+    def print(self, text: str) -> None:
+        stream = self._stream or sys.stdout
+        stream.write(text + "\n")
+        if self._unbuffered:
+            stream.flush()
+
+    def flush(self) -> None:
+        (self._stream or sys.stdout).flush()
+
+
+class BufferedSink(OutputSink):
+    """Batches lines in memory and writes them to the stream in chunks of
+    about `buffer_size` characters, so that output-heavy scripts do one
+    write per chunk instead of one per print.
+    """
+
+    def __init__(self, stream: TextIO = None, buffer_size: int = 1 << 16) -> None:
+        self._stream = stream
+        self._buffer_size = buffer_size
+        self._lines: list[str] = []
+        self._size = 0
+
+    def print(self, text: str) -> None:
+        self._lines.append(text)
+        self._size += len(text) + 1
+        if self._size >= self._buffer_size:
+            self._write()
+
+    def flush(self) -> None:
+        self._write()
+        (self._stream or sys.stdout).flush()
+
+    def _write(self) -> None:
+        if not self._lines:
+            return
+
+        lines = self._lines
+        self._lines = []
+        self._size = 0
+        lines.append("")
+        (self._stream or sys.stdout).write("\n".join(lines))
+
+
+class ListSink(OutputSink):
+    """Captures the printed lines, without newlines, in `lines`."""
+
+    def __init__(self) -> None:
+        self.lines: list[str] = []
+        self.print = self.lines.append
+
+
+class StringSink(OutputSink):
+    """Captures the output in an io.StringIO, exactly as it would have been
+    written to stdout.
+    """
+
+    def __init__(self) -> None:
+        self.buffer = io.StringIO()
+
+    def print(self, text: str) -> None:
+        self.buffer.write(text + "\n")
+
+    def getvalue(self) -> str:
+        return self.buffer.getvalue()
@@ -1,34 +1,157 @@
+import argparse
 import sys
+from engine import ENGINES
+from incremental import IncrementalParser
+from optimizer import Optimizer
+from output import BufferedSink, StdoutSink
 from peu_interpreter import Interpreter
-from peu_parser import PeuParser
+from peu_parser import ColumnarParser, StreamingParser
 from peu_token import PeuToken
-from scanner import Scanner
+from profiler import ProfilingInterpreter
+from program_cache import ProgramCache
+from resolver import Resolution, Resolver
+from scanner import RegexScanner
+from stmt import Stmt
 from ast_printer import AstPrinter
 from token_type import TokenType
 
+
 class Peu:
     had_error = False
     had_runtime_error = False
     interpreter = Interpreter()
+    dump_python = False
+    optimize = True
+    cache: ProgramCache = None
         
-    def run(self, source: str) -> None:
-        scanner = Scanner(source)
-        tokens = scanner.scan_tokens()
+    def run(self, source: str, whole_program: bool = False) -> None:
+        statements = self._parse(source)
+        if statements is None:
+            return
+
+        self._run_statements(statements, whole_program)
+
+    def _run_statements(self, statements: list[Stmt], whole_program: bool) -> None:
+        statements = self._optimize(statements, whole_program)
+
+        resolver = Resolver(Peu.interpreter)
+        resolver.resolve(statements)
+
+        self._execute(statements)
+        if not whole_program:
+            # Later REPL input shares no locals with these statements, as
+            # in run_stream; keeping their tables would keep their ASTs.
+            Peu.interpreter.forget_resolutions()
+
+    def run_file(self, path: str) -> None:
+        with open(path) as file:
+            source = file.read()
+
+        if Peu.cache is None:
+            self.run(source, whole_program=True)
+        else:
+            self._run_cached(path, source)
+
+        self._exit_on_error()
+
+    def _run_cached(self, path: str, source: str) -> None:
+        program = Peu.cache.load(path, source)
+        if program is None:
+            statements = self._parse(source)
+            if statements is None:
+                return
 
-        parser = PeuParser(tokens)
+            statements = self._optimize(statements, whole_program=True)
+            resolution = Resolution()
+            Resolver(resolution).resolve(statements)
+            program = (statements, resolution)
+            Peu.cache.store(path, source, program)
+
+        statements, resolution = program
+        Peu.interpreter.load_resolution(resolution)
+        self._execute(statements)
+
+    def _parse(self, source: str) -> list[Stmt] | None:
+        scanner = RegexScanner(source)
+        tokens = scanner.scan_columns()
+
+        parser = ColumnarParser(tokens)
         statements = parser.parse()
+        for token, message in parser.errors:
+            Peu.error(token, message)
 
         # Stop si il y a eu une erreur de syntaxe
-        if self.had_error:
+        if self.had_error or None in statements:
+            Peu.had_error = True
+            return None
+
+        return statements
+
+    def _optimize(
+        self, statements: list[Stmt], whole_program: bool
+    ) -> list[Stmt]:
+        # Globals may only be propagated when no later input can reassign
+        # them, i.e. when the whole program is known.
+        if not Peu.optimize:
+            return statements
+
+        return Optimizer(propagate_globals=whole_program).optimize(statements)
+
+    def _execute(self, statements: list[Stmt]) -> None:
+        if Peu.dump_python:
+            print(Peu.interpreter.transpile(statements), end="")
             return
 
         # print(AstPrinter().print(expr))
         Peu.interpreter.interpret(statements)
+        self._report_runtime_error()
 
-    def run_file(self, path: str) -> None:
+    def _report_runtime_error(self) -> bool:
+        """Writes the runtime error of the last run, if any, on stderr in
+        the format of peu serve, and returns whether there was one.
+        """
+        interpreter = Peu.interpreter
+        if not interpreter.had_runtime_error:
+            return False
+
+        error = interpreter.runtime_error
+        sys.stderr.write(f"[line {error.token.line}] {error.message}\n")
+        Peu.had_runtime_error = True
+        # The REPL keeps the interpreter: report each error only once.
+        interpreter.had_runtime_error = False
+        return True
+
+    def run_stream(self, path: str) -> None:
+        """Scans, parses and executes the file one top-level declaration at
+        a time, so memory stays bounded and output starts immediately.
+
+        Unlike run_file, which runs nothing if any declaration has a syntax
+        error, declarations preceding a syntax error have already run and
+        their side effects stand. Execution stops at the first declaration
+        that fails to parse (exit 65) or raises a runtime error (exit 70).
+        """
         with open(path) as file:
-            self.run(file.read())
+            parser = StreamingParser(RegexScanner.stream_tokens(file))
+            resolver = Resolver(Peu.interpreter)
+
+            for statement in parser.declarations():
+                if parser.errors:
+                    for token, message in parser.errors:
+                        Peu.error(token, message)
+                    break
+
+                statements = self._optimize([statement], whole_program=False)
+                resolver.resolve(statements)
+                Peu.interpreter.interpret(statements)
+                # Top-level declarations share no locals.
+                Peu.interpreter.forget_resolutions()
 
+                if self._report_runtime_error():
+                    break
+
+        self._exit_on_error()
+
+    def _exit_on_error(self) -> None:
         if Peu.had_error:
             sys.exit(65)
 
@@ -38,11 +161,52 @@ class Peu:
     def run_prompt(
         self,
     ) -> None:
+        """Runs declarations as soon as they are complete.
+
+        A declaration left open at the end of a line (an unclosed block, a
+        missing ';') continues on the next one; an empty line gives up on it.
+        Input that has not run yet is kept in an IncrementalParser, so each
+        line only re-parses the declaration it continues.
+        """
+        pending = IncrementalParser()
         while True:
-            line = input("> ")
-            self.run(line)
+            try:
+                line = input("... " if len(pending) else "> ")
+            except EOFError:
+                break
+
+            end = len(pending.source)
+            pending.edit(end, end, line + "\n")
+            self._run_pending(pending, give_up=not line.strip())
+            Peu.interpreter.output.flush()
             Peu.had_error = False
 
+    def _run_pending(self, pending: IncrementalParser, give_up: bool) -> None:
+        complete = len(pending)
+        if complete and not give_up:
+            errors = pending.declaration(complete - 1).errors
+            if errors and all(token.type == TokenType.EOF for token, _ in errors):
+                complete -= 1
+
+        statements = []
+        for index in range(complete):
+            declaration = pending.declaration(index)
+            for token, message in declaration.errors:
+                Peu.error(token, message)
+            statements.append(declaration.statement)
+
+        if Peu.had_error:
+            # Like a script with a syntax error, nothing runs.
+            pending.edit(0, len(pending.source), "")
+            return
+
+        if complete < len(pending):
+            pending.edit(0, pending.start(complete), "")
+        else:
+            pending.edit(0, len(pending.source), "")
+        if statements:
+            self._run_statements(statements, whole_program=False)
+
     @staticmethod
     def error(token: PeuToken, message: str) -> None:
         if token.type == TokenType.EOF:
@@ -52,19 +216,126 @@ class Peu:
 
     @staticmethod
     def report(line: int, where: str, message: str) -> None:
-        sys.stderr.write(f"[line {line}] Error {where}: {message}")
+        sys.stderr.write(f"[line {line}] Error{where}: {message}\n")
         Peu.had_error = True
 
 
+class ArgumentParser(argparse.ArgumentParser):
+    def error(self, message: str) -> None:
+        self.print_usage(sys.stderr)
+        sys.exit(64)
+
+
 def main():
+    if sys.argv[1:2] == ["batch"]:
+        # Imported here because batch itself imports this module.
+        import batch
+        batch.main(sys.argv[2:])
+        return
+    if sys.argv[1:2] == ["serve"]:
+        import serve
+        serve.main(sys.argv[2:])
+        return
+
+    parser = ArgumentParser(prog="peu")
+    parser.add_argument("script", nargs="?")
+    parser.add_argument("--engine", choices=ENGINES.keys(), default="tree")
+    parser.add_argument(
+        "--dump-python",
+        action="store_true",
+        help="print the Python source generated for the script and exit",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="execute each top-level declaration as soon as it is parsed",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="run on the tree-walking interpreter and report the time spent "
+        "per node type and per line on stderr",
+    )
+    parser.add_argument(
+        "--profile-output",
+        metavar="FILE",
+        help="also write the profile to FILE (implies --profile)",
+    )
+    parser.add_argument(
+        "--profile-format",
+        choices=("json", "callgrind"),
+        default="json",
+    )
+    parser.add_argument(
+        "--buffer-size",
+        type=int,
+        default=1 << 16,
+        help="write printed output in chunks of about this many characters",
+    )
+    parser.add_argument(
+        "-u",
+        "--unbuffered",
+        action="store_true",
+        help="write and flush each printed line immediately",
+    )
+    parser.add_argument(
+        "--no-optimize",
+        action="store_true",
+        help="run the script without folding constants (implies --no-cache)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="do not read or write compiled programs in __peucache__",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="keep compiled programs in this directory instead",
+    )
+    args = parser.parse_args()
+
+    if args.no_optimize:
+        Peu.optimize = False
+    elif not args.no_cache:
+        Peu.cache = ProgramCache(args.cache_dir)
+
+    if args.unbuffered:
+        output = StdoutSink(unbuffered=True)
+    else:
+        output = BufferedSink(buffer_size=args.buffer_size)
+
+    profile = args.profile or args.profile_output is not None
+    if args.dump_python:
+        Peu.interpreter = ENGINES["python"](output)
+        Peu.dump_python = True
+    elif profile:
+        Peu.interpreter = ProfilingInterpreter(output)
+    else:
+        Peu.interpreter = ENGINES[args.engine](output)
+
     peu = Peu()
-    if len(sys.argv) > 2:
-        print("Usage: peu [script]")
-        sys.exit(64)
-    elif len(sys.argv) == 2:
-        peu.run_file(sys.argv[1])
+    try:
+        if args.script is not None and args.stream:
+            peu.run_stream(args.script)
+        elif args.script is not None:
+            peu.run_file(args.script)
+        else:
+            peu.run_prompt()
+    finally:
+        output.flush()
+        if profile:
+            write_profile(Peu.interpreter.profile, args)
+
+
+def write_profile(profile, args) -> None:
+    profile.report(sys.stderr)
+
+    if args.profile_output is None:
+        return
+    if args.profile_format == "callgrind":
+        profile.write_callgrind(args.profile_output, args.script or "<stdin>")
     else:
-        peu.run_prompt()
+        profile.write_json(args.profile_output)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,206 @@
+"""Numeric arrays.
+
+`[1, 2, 3]` evaluates to a PeuArray, a fixed-length array of numbers kept
+in a float64 NumPy ndarray, or in an array('d') when NumPy is not
+installed. Arithmetic and the comparisons <, <=, > and >= apply
+elementwise, either to two arrays of the same length or to an array and a
+number, which is used against every element. Comparisons give arrays of
+booleans: they print and compare, but are not numbers.
+
+== and != compare whole arrays, of any length and of booleans too, and
+give a single boolean; an array never equals a number. Like numbers,
+elements print as floats: [1.0, 2.5]. Division by zero in an array gives
+inf or nan, as in NumPy, rather than an error.
+
+The interpreters check the operands with check_operands(), or
+check_equality_operands() for ==, and then apply the plain Python
+operators, which PeuArray implements.
+"""
+
+from array import array
+from itertools import repeat
+import math
+import operator as op
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from error import PeuRuntimeError
+from number import NUMBER_TYPES
+from peu_token import PeuToken
+
+
+class PeuArray:
+    """An immutable array of numbers or of booleans."""
+
+    __slots__ = ("data",)
+
+    def __init__(self, data) -> None:
+        self.data = data
+
+    @property
+    def is_boolean(self) -> bool:
+        if numpy is not None:
+            return self.data.dtype == numpy.bool_
+        return self.data.typecode == "b"
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __str__(self) -> str:
+        if self.is_boolean:
+            items = ["true" if value else "false" for value in self.data.tolist()]
+        else:
+            items = [str(value) for value in self.data.tolist()]
+        return f"[{', '.join(items)}]"
+
+    def __repr__(self) -> str:
+        return f"PeuArray({str(self)})"
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is not PeuArray:
+            return NotImplemented
+        if self.is_boolean != other.is_boolean or len(self) != len(other):
+            return False
+        if numpy is not None:
+            return bool(numpy.array_equal(self.data, other.data))
+        return self.data == other.data
+
+    # Arrays are values that compare by content, like strings, but are not
+    # worth hashing.
+    __hash__ = None
+
+    def __add__(self, other): return _apply(_ADD, self, other)
+    def __radd__(self, other): return _apply(_ADD, other, self)
+    def __sub__(self, other): return _apply(_SUBTRACT, self, other)
+    def __rsub__(self, other): return _apply(_SUBTRACT, other, self)
+    def __mul__(self, other): return _apply(_MULTIPLY, self, other)
+    def __rmul__(self, other): return _apply(_MULTIPLY, other, self)
+    def __truediv__(self, other): return _apply(_DIVIDE, self, other)
+    def __rtruediv__(self, other): return _apply(_DIVIDE, other, self)
+
+    # Python reflects a comparison whose left operand is a number: 1 < a
+    # calls a.__gt__(1).
+    def __lt__(self, other): return _apply(_LESS, self, other)
+    def __le__(self, other): return _apply(_LESS_EQUAL, self, other)
+    def __gt__(self, other): return _apply(_GREATER, self, other)
+    def __ge__(self, other): return _apply(_GREATER_EQUAL, self, other)
+
+    def __neg__(self) -> "PeuArray":
+        if numpy is not None:
+            return PeuArray(numpy.negative(self.data))
+        return PeuArray(array("d", [-value for value in self.data]))
+
+
+def _divide(left: float, right: float) -> float:
+    """IEEE division, like NumPy's."""
+    if right:
+        return left / right
+    if left == 0 or math.isnan(left):
+        return math.nan
+    return math.copysign(math.inf, left) * math.copysign(1.0, right)
+
+
+# (NumPy ufunc name, fallback function, fallback typecode) of each operation.
+_ADD = ("add", op.add, "d")
+_SUBTRACT = ("subtract", op.sub, "d")
+_MULTIPLY = ("multiply", op.mul, "d")
+_DIVIDE = ("divide", _divide, "d")
+_LESS = ("less", op.lt, "b")
+_LESS_EQUAL = ("less_equal", op.le, "b")
+_GREATER = ("greater", op.gt, "b")
+_GREATER_EQUAL = ("greater_equal", op.ge, "b")
+
+
+def _apply(operation: tuple, left: object, right: object) -> PeuArray:
+    ufunc, function, typecode = operation
+    if numpy is not None:
+        with numpy.errstate(all="ignore"):
+            return PeuArray(
+                getattr(numpy, ufunc)(
+                    left.data if type(left) is PeuArray else left,
+                    right.data if type(right) is PeuArray else right,
+                )
+            )
+
+    if type(left) is not PeuArray:
+        values = map(function, repeat(left), right.data)
+    elif type(right) is not PeuArray:
+        values = map(function, left.data, repeat(right))
+    else:
+        values = map(function, left.data, right.data)
+    return PeuArray(array(typecode, values))
+
+
+def make_array(bracket: PeuToken, values: list) -> PeuArray:
+    """Value of an array literal whose elements evaluated to `values`."""
+    for value in values:
+        if type(value) not in NUMBER_TYPES:
+            raise PeuRuntimeError(bracket, "Array elements must be numbers.")
+
+    return from_numbers(values)
+
+
+def from_numbers(values) -> PeuArray:
+    """Array of `values`, an iterable of numbers; it is always copied."""
+    if numpy is not None:
+        return PeuArray(numpy.array(values, dtype=numpy.float64))
+    return PeuArray(array("d", values))
+
+
+# Host values that make_environment turns into arrays.
+HOST_ARRAY_TYPES = (list, tuple, array) + (() if numpy is None else (numpy.ndarray,))
+
+
+def from_host(value: list | tuple | array) -> PeuArray:
+    """Array of the numbers in a list, tuple, array.array or 1-D NumPy array
+    given by the host; raises TypeError for anything else.
+    """
+    if numpy is not None and isinstance(value, numpy.ndarray):
+        if value.ndim != 1 or value.dtype.kind not in "iuf":
+            raise TypeError("expected a 1-D array of numbers")
+    elif isinstance(value, array):
+        if value.typecode in ("u", "w"):
+            raise TypeError("expected an array of numbers")
+    elif any(type(item) not in NUMBER_TYPES for item in value):
+        raise TypeError("expected a sequence of numbers")
+
+    return from_numbers(value)
+
+
+def check_operands(operator: PeuToken, left: object, right: object) -> None:
+    """Raises unless `left operator right` is an array operation, i.e. one
+    operand is a number array and the other a number or a number array of
+    the same length.
+    """
+    if not (_is_numeric(left) and _is_numeric(right)):
+        raise PeuRuntimeError(operator, "Operands must be numbers or number arrays.")
+    if (
+        type(left) is PeuArray
+        and type(right) is PeuArray
+        and len(left) != len(right)
+    ):
+        raise PeuRuntimeError(operator, "Arrays must have the same length.")
+
+
+def check_equality_operands(operator: PeuToken, left: object, right: object) -> None:
+    """Raises unless each operand of `left == right` is a number or an
+    array. Unlike the elementwise operators, == takes arrays of different
+    lengths and boolean arrays.
+    """
+    for operand in (left, right):
+        if type(operand) is not PeuArray and type(operand) not in NUMBER_TYPES:
+            raise PeuRuntimeError(operator, "Operands must be numbers or arrays.")
+
+
+def check_operand(operator: PeuToken, operand: object) -> None:
+    if not _is_numeric(operand):
+        raise PeuRuntimeError(operator, "Operand must be a number or a number array.")
+
+
+def _is_numeric(value: object) -> bool:
+    if type(value) is PeuArray:
+        return not value.is_boolean
+    return type(value) in NUMBER_TYPES
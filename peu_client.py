@@ -0,0 +1,99 @@
+"""Thin client for `peu serve`.
+
+    python peu.py serve &
+    python peu_client.py script.peu --global amount=120
+
+Runs a script on a running server instead of starting an interpreter. It
+only imports a few standard library modules, so it starts much faster than
+peu itself. The exit codes are the ones peu uses: 65 for a syntax error, 70
+for a runtime error, plus 75 when the server timed out or was busy and 69
+when no server is listening.
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+
+
+DEFAULT_SOCKET = os.path.join(
+    os.environ.get("XDG_RUNTIME_DIR") or "/tmp", f"peu-{os.getuid()}.sock"
+)
+
+EXIT_CODES = {
+    "ok": 0,
+    "syntax_error": 65,
+    "runtime_error": 70,
+    "timeout": 75,
+    "busy": 75,
+}
+
+
+def call(request: dict[str, object], path: str = DEFAULT_SOCKET) -> dict[str, object]:
+    """Sends one request to the server listening on `path` and returns its
+    response.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(path)
+        connection.sendall(json.dumps(request).encode() + b"\n")
+        connection.shutdown(socket.SHUT_WR)
+
+        with connection.makefile("rb") as file:
+            line = file.readline()
+
+    if not line:
+        raise ConnectionError("the server closed the connection")
+    return json.loads(line)
+
+
+def parse_binding(binding: str) -> tuple[str, object]:
+    name, separator, text = binding.partition("=")
+    if not separator:
+        raise argparse.ArgumentTypeError(f"expected NAME=VALUE, got '{binding}'")
+
+    try:
+        value = json.loads(text)
+    except ValueError:
+        # Bare words are strings, so that `name=Bob` needs no quoting.
+        value = text
+    return name, value
+
+
+def main(argv: list[str] = None) -> None:
+    parser = argparse.ArgumentParser(prog="peu_client")
+    parser.add_argument("script")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET)
+    parser.add_argument(
+        "--global",
+        dest="globals",
+        action="append",
+        type=parse_binding,
+        default=[],
+        metavar="NAME=VALUE",
+        help="define a global before the script runs; VALUE is JSON or a string",
+    )
+    parser.add_argument("--timeout", type=float, help="seconds, capped by the server")
+    args = parser.parse_args(argv)
+
+    with open(args.script) as file:
+        request = {"source": file.read(), "globals": dict(args.globals)}
+    if args.timeout is not None:
+        request["timeout"] = args.timeout
+
+    try:
+        response = call(request, args.socket)
+    except OSError as error:
+        sys.stderr.write(f"Cannot reach the peu server at {args.socket}: {error}\n")
+        sys.exit(69)
+
+    sys.stdout.write(response.get("output", ""))
+    sys.stdout.flush()
+    for error in response.get("errors", []):
+        sys.stderr.write(f"{error}\n")
+
+    sys.exit(EXIT_CODES.get(response["status"], 1))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,197 @@
 from environment import Environment
 from error import PeuRuntimeError
-from expr import Assign, Binary, Expr, Grouping, Literal, Logical, Unary, Variable, Visitor as ExprVisitor
+from expr import (
+    Add,
+    And,
+    Array,
+    Assign,
+    BangEqual,
+    Binary,
+    Divide,
+    EqualEqual,
+    Expr,
+    Greater,
+    GreaterEqual,
+    Grouping,
+    Less,
+    LessEqual,
+    Literal,
+    Logical,
+    Multiply,
+    Negate,
+    Not,
+    Or,
+    Subtract,
+    Unary,
+    Variable,
+    Visitor as ExprVisitor,
+)
+from hooks import EVENTS, Hook
+from number import MAX_EXACT, MIN_EXACT, NUMBER_TYPES, add, multiply, negate, subtract
+from output import OutputSink, StdoutSink
+from peu_array import (
+    PeuArray,
+    check_equality_operands as check_array_equality_operands,
+    check_operand as check_array_operand,
+    check_operands as check_array_operands,
+    make_array,
+)
 from peu_token import PeuToken
-from stmt import Block, Expression, If, Print, Stmt, Var, Visitor as StmtVisitor
+from rope import STRING_TYPES, Rope, concat
+from stmt import Block, Expression, For, If, Print, Stmt, Var, While, Visitor as StmtVisitor
 from token_type import TokenType
 
 
 class Interpreter(ExprVisitor, StmtVisitor):
-    def __init__(self) -> None:
+    def __init__(self, output: OutputSink = None) -> None:
         super().__init__()
 
-        self._environment = Environment()
+        self.globals = Environment()
+        self._environment = self.globals
+        self._locals: dict[object, tuple[int, int]] = dict()
+        self._scope_sizes: dict[Block | For, int] = dict()
+        self.had_runtime_error = False
+        self.runtime_error: PeuRuntimeError | None = None
+        # Where print statements write; see the output module.
+        self.output = output if output is not None else StdoutSink()
+        self._hooks: dict[str, list[Hook]] = {event: [] for event in EVENTS}
+        self.hooks_installed = False
 
     def interpret(self, statements: list[Stmt]) -> None:
+        self.execute(self.lower(statements))
+
+    def lower(self, statements: list[Stmt]) -> object:
+        """Translates resolved `statements` into the form execute() runs:
+        a Chunk for the VM, for instance.
+
+        The result only depends on the statements and the resolver tables,
+        never on the globals or the output, so it can be kept and executed
+        any number of times. The tree-walker runs the statements themselves.
+        """
+        return tuple(statements)
+
+    def execute(self, program: object) -> None:
+        """Runs the result of lower() against the current globals. Only
+        the tree-walker dispatches hooks from here; other engines fall back
+        to it in interpret() when hooks are installed.
+        """
+        self._walk(program)
+
+    def _walk(self, statements: list[Stmt]) -> None:
         try:
             for statement in statements:
                 self._execute(statement)
-        except PeuRuntimeError:
-            pass
+        except PeuRuntimeError as error:
+            self._runtime_error(error)
+
+    def _runtime_error(self, error: PeuRuntimeError) -> None:
+        self.had_runtime_error = True
+        self.runtime_error = error
+        # Output printed before the error must not be lost if the host
+        # exits right away.
+        self.output.flush()
+
+    def add_hook(
+        self,
+        event: str,
+        callback,
+        node_types: tuple[type, ...] = None,
+        lines=None,
+    ) -> Hook:
+        """Calls `callback` on `event`, optionally only for the given node
+        types or lines; see the hooks module for the events. Returns the
+        Hook to pass to remove_hook.
+        """
+        hook = Hook(event, callback, node_types, lines)
+        self._hooks[event].append(hook)
+        self._swap_dispatch()
+        return hook
+
+    def remove_hook(self, hook: Hook) -> None:
+        self._hooks[hook.event].remove(hook)
+        self._swap_dispatch()
+
+    def _swap_dispatch(self) -> None:
+        # The hooked methods shadow the class ones on this instance only
+        # while a hook is installed, so unhooked runs execute unchanged code.
+        installed = any(self._hooks.values())
+        for name in ("_execute", "visit_var", "visit_assign", "_runtime_error"):
+            if installed:
+                hooked = getattr(self, f"_hooked_{name.lstrip('_')}")
+                setattr(self, name, hooked)
+            elif name in self.__dict__:
+                delattr(self, name)
+
+        self.hooks_installed = installed
+
+    def _call_hooks(self, event: str, node: object, *args: object) -> None:
+        for hook in self._hooks[event]:
+            if hook.matches(node):
+                hook.callback(node, *args)
+
+    def _hooked_execute(self, statement: Stmt):
+        self._call_hooks("statement_enter", statement)
+        type(self)._execute(self, statement)
+        self._call_hooks("statement_exit", statement)
+
+    def _hooked_visit_var(self, stmt: Var):
+        type(self).visit_var(self, stmt)
+
+        location = self._locals.get(stmt)
+        if location is None:
+            value = self.globals.get(stmt.name)
+        else:
+            value = self._environment.slots[location[1]]
+        self._call_hooks("define", stmt, value)
+
+    def _hooked_visit_assign(self, expr: Assign) -> object:
+        value = type(self).visit_assign(self, expr)
+        self._call_hooks("assign", expr, value)
+        return value
+
+    def _hooked_runtime_error(self, error: PeuRuntimeError) -> None:
+        for hook in self._hooks["runtime_error"]:
+            if hook.lines is None or error.token.line in hook.lines:
+                hook.callback(error)
+
+        type(self)._runtime_error(self, error)
+
+    def resolve(self, node: object, depth: int, slot: int) -> None:
+        self._locals[node] = (depth, slot)
+
+    def resolve_scope(self, block: Block | For, size: int) -> None:
+        self._scope_sizes[block] = size
+
+    def load_resolution(self, resolution) -> None:
+        self._locals.update(resolution.locals)
+        self._scope_sizes.update(resolution.scope_sizes)
+
+    def use_resolution(self, resolution) -> None:
+        """Reads the resolver's tables from `resolution` without copying
+        them; the interpreter never writes to them while running.
+        """
+        self._locals = resolution.locals
+        self._scope_sizes = resolution.scope_sizes
+
+    def use_globals(self, environment: Environment) -> None:
+        self.globals = environment
+        self._environment = environment
+
+    def fork(self, output: OutputSink = None) -> "Interpreter":
+        """Returns an interpreter of the same class whose globals start as
+        a copy-on-write fork of this one's, so that a prelude can run once
+        and scenarios run on top of it without seeing each other's changes.
+        The resolver tables and hooks are not carried over.
+        """
+        forked = type(self)(output if output is not None else self.output)
+        forked.use_globals(self.globals.fork())
+        return forked
+
+    def forget_resolutions(self) -> None:
+        """Drops the resolver's tables once their statements have run."""
+        # New tables rather than clear(): they may belong to a Resolution.
+        self._locals = dict()
+        self._scope_sizes = dict()
 
     def _execute(self, statement: Stmt):
         statement.accept(self)
@@ -42,14 +216,66 @@ class Interpreter(ExprVisitor, StmtVisitor):
                 return "true"
             return "false"
 
+        if type(value) is int:
+            # Printed like the float it stands for.
+            return str(float(value))
+
         return str(value)
     
     def visit_block(self, stmt: Block) -> None:
-        self._execute_block(stmt.statements, Environment(self._environment))
+        self._execute_block(
+            stmt.statements,
+            Environment(self._environment, self._scope_sizes[stmt])
+        )
 
     def visit_expression(self, stmt: Expression):
         self._evaluate(stmt.expression)
 
+    def visit_for(self, stmt: For) -> None:
+        previous = self._environment
+
+        try:
+            self._environment = Environment(previous, self._scope_sizes[stmt])
+            if stmt.initializer is not None:
+                self._execute(stmt.initializer)
+            self._loop(stmt.condition, stmt.body, stmt.increment)
+        finally:
+            self._environment = previous
+
+    def visit_while(self, stmt: While) -> None:
+        self._loop(stmt.condition, stmt.body, None)
+
+    def _loop(self, condition: Expr, body: Stmt, increment: Expr | None) -> None:
+        evaluate = self._evaluate
+        is_truthy = self._is_truthy
+
+        if type(body) is Block and not self.hooks_installed:
+            # Nothing can keep a reference to the body's environment, as
+            # peulang has no closures, so one is allocated per loop rather
+            # than per iteration. Reusing it cannot expose the previous
+            # iteration's values: the resolver only lets a block read its
+            # own variables once it has declared them again.
+            statements = body.statements
+            environment = Environment(self._environment, self._scope_sizes[body])
+            execute_block = self._execute_block
+
+            def execute_body():
+                execute_block(statements, environment)
+        else:
+            def execute_body():
+                self._execute(body)
+
+        while True:
+            value = evaluate(condition)
+            if value is not True and (
+                value is False or value is None or not is_truthy(value)
+            ):
+                return
+
+            execute_body()
+            if increment is not None:
+                evaluate(increment)
+
     def visit_if(self, stmt: If) -> None:
         if self._is_truthy(self._evaluate(stmt.condition)):
             self._execute(stmt.then_branch)
@@ -58,19 +284,28 @@ class Interpreter(ExprVisitor, StmtVisitor):
 
     def visit_print(self, stmt: Print):
         value = self._evaluate(stmt.expression)
-        print(self._stringify(value))
+        self.output.print(self._stringify(value))
 
     def visit_var(self, stmt: Var):
         value = None
         if (stmt.initializer != None):
             value = self._evaluate(stmt.initializer)
 
-        self._environment.define(stmt.name.lexeme, value)
+        location = self._locals.get(stmt)
+        if location is None:
+            self.globals.define(stmt.name.lexeme, value)
+        else:
+            self._environment.slots[location[1]] = value
         return None
     
     def visit_assign(self, expr: Assign) -> object:
         value = self._evaluate(expr.value)
-        self._environment.assign(expr.name, value)
+
+        location = self._locals.get(expr)
+        if location is None:
+            self.globals.assign(expr.name, value)
+        else:
+            self._environment.assign_at(location[0], location[1], value)
 
         return value
 
@@ -80,42 +315,141 @@ class Interpreter(ExprVisitor, StmtVisitor):
 
         if expr.operator.type == TokenType.GREATER:
             self._check_number_operands(expr.operator, left, right)
-            return float(left) > float(right)
+            return left > right
         elif expr.operator.type == TokenType.GREATER_EQUAL:
             self._check_number_operands(expr.operator, left, right)
-            return float(left) >= float(right)
+            return left >= right
         elif expr.operator.type == TokenType.LESS:
             self._check_number_operands(expr.operator, left, right)
-            return float(left) < float(right)
+            return left < right
         elif expr.operator.type == TokenType.LESS_EQUAL:
             self._check_number_operands(expr.operator, left, right)
-            return float(left) <= float(right)
+            return left <= right
         elif expr.operator.type == TokenType.EQUAL_EQUAL:
-            self._check_number_operands(expr.operator, left, right)
+            self._check_equality_operands(expr.operator, left, right)
             return self._is_equal(left, right)
         elif expr.operator.type == TokenType.BANG_EQUAL:
             return not self._is_equal(left, right)
         elif expr.operator.type == TokenType.MINUS:
             self._check_number_operands(expr.operator, left, right)
-            return float(left) - float(right)
+            return subtract(left, right)
         elif expr.operator.type == TokenType.PLUS:
-            if isinstance(left, float) and isinstance(right, float):
-                return float(left) + float(right)
-            elif isinstance(left, str) and isinstance(right, str):
-                return str(left) + str(right)
+            if type(left) in NUMBER_TYPES and type(right) in NUMBER_TYPES:
+                return add(left, right)
+            elif isinstance(left, STRING_TYPES) and isinstance(right, STRING_TYPES):
+                return concat(left, right)
+            elif type(left) is PeuArray or type(right) is PeuArray:
+                check_array_operands(expr.operator, left, right)
+                return left + right
 
             raise PeuRuntimeError(
                 expr.operator, "Operands must be two numbers or two strings."
             )
         elif expr.operator.type == TokenType.SLASH:
             self._check_number_operands(expr.operator, left, right)
-            return float(left) / float(right)
+            return left / right
         elif expr.operator.type == TokenType.STAR:
             self._check_number_operands(expr.operator, left, right)
-            return float(left) * float(right)
+            return multiply(left, right)
 
         return None
 
+    # The parser emits one Binary subclass per operator, so the visitors
+    # below run without comparing the operator; visit_binary remains for
+    # plain Binary nodes built by hand. The int cases of +, - and * are
+    # number.add, subtract and multiply inlined.
+
+    def visit_add(self, expr: Add) -> object:
+        left = self._evaluate(expr.left)
+        right = self._evaluate(expr.right)
+
+        if type(left) is int and type(right) is int:
+            result = left + right
+            if MIN_EXACT <= result <= MAX_EXACT:
+                return result
+            return float(result)
+        elif type(left) in NUMBER_TYPES and type(right) in NUMBER_TYPES:
+            return left + right
+        elif isinstance(left, STRING_TYPES) and isinstance(right, STRING_TYPES):
+            return concat(left, right)
+        elif type(left) is PeuArray or type(right) is PeuArray:
+            check_array_operands(expr.operator, left, right)
+            return left + right
+
+        raise PeuRuntimeError(
+            expr.operator, "Operands must be two numbers or two strings."
+        )
+
+    def visit_subtract(self, expr: Subtract) -> object:
+        left = self._evaluate(expr.left)
+        right = self._evaluate(expr.right)
+        if type(left) is int and type(right) is int:
+            result = left - right
+            if MIN_EXACT <= result <= MAX_EXACT:
+                return result
+            return float(result)
+
+        self._check_number_operands(expr.operator, left, right)
+        return left - right
+
+    def visit_multiply(self, expr: Multiply) -> object:
+        left = self._evaluate(expr.left)
+        right = self._evaluate(expr.right)
+        if type(left) is int and type(right) is int:
+            result = left * right
+            if result and MIN_EXACT <= result <= MAX_EXACT:
+                return result
+            return float(left) * float(right)
+
+        self._check_number_operands(expr.operator, left, right)
+        return left * right
+
+    def visit_divide(self, expr: Divide) -> object:
+        left = self._evaluate(expr.left)
+        right = self._evaluate(expr.right)
+        self._check_number_operands(expr.operator, left, right)
+        return left / right
+
+    def visit_greater(self, expr: Greater) -> object:
+        left = self._evaluate(expr.left)
+        right = self._evaluate(expr.right)
+        self._check_number_operands(expr.operator, left, right)
+        return left > right
+
+    def visit_greaterequal(self, expr: GreaterEqual) -> object:
+        left = self._evaluate(expr.left)
+        right = self._evaluate(expr.right)
+        self._check_number_operands(expr.operator, left, right)
+        return left >= right
+
+    def visit_less(self, expr: Less) -> object:
+        left = self._evaluate(expr.left)
+        right = self._evaluate(expr.right)
+        self._check_number_operands(expr.operator, left, right)
+        return left < right
+
+    def visit_lessequal(self, expr: LessEqual) -> object:
+        left = self._evaluate(expr.left)
+        right = self._evaluate(expr.right)
+        self._check_number_operands(expr.operator, left, right)
+        return left <= right
+
+    def visit_equalequal(self, expr: EqualEqual) -> object:
+        left = self._evaluate(expr.left)
+        right = self._evaluate(expr.right)
+        self._check_equality_operands(expr.operator, left, right)
+        return self._is_equal(left, right)
+
+    def visit_bangequal(self, expr: BangEqual) -> object:
+        left = self._evaluate(expr.left)
+        right = self._evaluate(expr.right)
+        return not self._is_equal(left, right)
+
+    def visit_array(self, expr: Array) -> object:
+        return make_array(
+            expr.bracket, [self._evaluate(element) for element in expr.elements]
+        )
+
     def visit_grouping(self, expr: Grouping) -> object:
         return self._evaluate(expr.expression)
 
@@ -134,20 +468,45 @@ class Interpreter(ExprVisitor, StmtVisitor):
             
         return self._evaluate(expr.right)
 
+    def visit_and(self, expr: And) -> object:
+        left = self._evaluate(expr.left)
+        if not self._is_truthy(left):
+            return left
+
+        return self._evaluate(expr.right)
+
+    def visit_or(self, expr: Or) -> object:
+        left = self._evaluate(expr.left)
+        if self._is_truthy(left):
+            return left
+
+        return self._evaluate(expr.right)
 
     def visit_unary(self, expr: Unary) -> object:
         right = self._evaluate(expr.right)
 
         if expr.operator.type == TokenType.MINUS:
             self._check_number_operand(expr.operator, right)
-            return -float(right)
+            return negate(right)
         elif expr.operator.type == TokenType.BANG:
             return not self._is_truthy(right)
 
         return None
+
+    def visit_negate(self, expr: Negate) -> object:
+        right = self._evaluate(expr.right)
+        self._check_number_operand(expr.operator, right)
+        return negate(right)
+
+    def visit_not(self, expr: Not) -> object:
+        return not self._is_truthy(self._evaluate(expr.right))
     
     def visit_variable(self, expr: Variable) -> object:
-        return self._environment.get(expr.name)
+        location = self._locals.get(expr)
+        if location is None:
+            return self.globals.get(expr.name)
+
+        return self._environment.get_at(location[0], location[1])
 
     def _evaluate(self, expr: Expr) -> object:
         return expr.accept(self)
@@ -157,26 +516,48 @@ class Interpreter(ExprVisitor, StmtVisitor):
             return False
         elif isinstance(value, bool):
             return bool(value)
-        elif isinstance(value, float):
-            return float(value) == 0
+        elif type(value) in NUMBER_TYPES:
+            return value == 0
         elif isinstance(value, str):
             return str(value) == ""
+        elif isinstance(value, Rope):
+            return len(value) == 0
+        elif type(value) is PeuArray:
+            return len(value) == 0
 
         return True
 
     def _is_equal(self, left: object, right: object) -> bool:
+        # Arrays are equal when they have the same elements.
         return left == right
 
     def _check_number_operand(
         self, operator: PeuToken, operand: object
     ) -> bool:
-        if isinstance(operand, float):
+        if type(operand) in NUMBER_TYPES:
+            return
+        if type(operand) is PeuArray:
+            check_array_operand(operator, operand)
             return
         raise PeuRuntimeError(operator, "Operand must be a number.")
 
     def _check_number_operands(
         self, operator: PeuToken, left: object, right: object
     ) -> bool:
-        if isinstance(left, float) and isinstance(right, float):
+        if type(left) in NUMBER_TYPES and type(right) in NUMBER_TYPES:
+            return
+        if type(left) is PeuArray or type(right) is PeuArray:
+            check_array_operands(operator, left, right)
+            return
+        raise PeuRuntimeError(operator, "Operands must be a number.")
+
+    def _check_equality_operands(
+        self, operator: PeuToken, left: object, right: object
+    ) -> bool:
+        if type(left) in NUMBER_TYPES and type(right) in NUMBER_TYPES:
+            return
+        if type(left) is PeuArray or type(right) is PeuArray:
+            # Arrays compare as a whole, see _is_equal.
+            check_array_equality_operands(operator, left, right)
             return
         raise PeuRuntimeError(operator, "Operands must be a number.")
\ No newline at end of file
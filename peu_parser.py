@@ -1,14 +1,57 @@
+from typing import Iterator
+
 from ast_printer import AstPrinter
-from expr import Assign, Binary, Expr, Grouping, Literal, Logical, Unary, Variable
-from peu_token import PeuToken
-from stmt import Block, Expression, If, Print, Stmt, Var
+from expr import (
+    Add,
+    And,
+    Array,
+    Assign,
+    BangEqual,
+    Divide,
+    EqualEqual,
+    Expr,
+    Greater,
+    GreaterEqual,
+    Grouping,
+    Less,
+    LessEqual,
+    Literal,
+    Multiply,
+    Negate,
+    Not,
+    Or,
+    Subtract,
+    Variable,
+)
+from peu_token import PeuToken, TokenColumns
+from stmt import Block, Expression, For, If, Print, Stmt, Var, While
 from token_type import TokenType
 
 
+# Each operator gets its own node class, so that the interpreters dispatch
+# on the node instead of comparing the operator at every evaluation.
+BINARY_NODES = {
+    TokenType.PLUS: Add,
+    TokenType.MINUS: Subtract,
+    TokenType.STAR: Multiply,
+    TokenType.SLASH: Divide,
+    TokenType.GREATER: Greater,
+    TokenType.GREATER_EQUAL: GreaterEqual,
+    TokenType.LESS: Less,
+    TokenType.LESS_EQUAL: LessEqual,
+    TokenType.EQUAL_EQUAL: EqualEqual,
+    TokenType.BANG_EQUAL: BangEqual,
+}
+LOGICAL_NODES = {TokenType.AND: And, TokenType.OR: Or}
+UNARY_NODES = {TokenType.MINUS: Negate, TokenType.BANG: Not}
+
+
 class PeuParser:
     def __init__(self, tokens: list[PeuToken]) -> None:
         self._tokens = tokens
         self._current = 0
+        # (token, message) of every syntax error, in order.
+        self.errors: list[tuple[PeuToken, str]] = []
 
     def parse(self) -> list[Stmt]:
         statements = []
@@ -17,6 +60,11 @@ class PeuParser:
 
         return statements
 
+    def declarations(self) -> Iterator[Stmt]:
+        """Yields top-level declarations one at a time, as they are parsed."""
+        while not self._is_at_end():
+            yield self._declaration()
+
     def _declaration(self):
         try:
             if self._match(TokenType.VAR):
@@ -34,20 +82,27 @@ class PeuParser:
         if self._match(TokenType.EQUAL):
             initializer = self._expression()
 
-        self._consume(
+        self._skip(
             TokenType.SEMICOLON, "Expect ';' after variable declaration."
         )
         return Var(name, initializer)
 
     def _statement(self) -> Stmt:
+        if self._match(TokenType.FOR):
+            return self._for_statement()
+
         if self._match(TokenType.IF):
             return self._if_statement()
         
         if self._match(TokenType.PRINT):
             return self._print_statement()
+
+        if self._match(TokenType.WHILE):
+            return self._while_statement()
         
         if self._match(TokenType.LEFT_BRACE):
-            return Block(self._block())
+            brace = self._previous()
+            return Block(brace, self._block())
 
         return self._expression_statement()
     
@@ -57,13 +112,37 @@ class PeuParser:
         while not self._check(TokenType.RIGHT_BRACE) and not self._is_at_end():
             statemements.append(self._declaration())
 
-        self._consume(TokenType.RIGHT_BRACE, "Expect '}' after block.")
+        self._skip(TokenType.RIGHT_BRACE, "Expect '}' after block.")
         return statemements
 
+    def _for_statement(self) -> Stmt:
+        keyword = self._previous()
+        self._skip(TokenType.LEFT_PAREN, "Expect '(' after 'for'.")
+
+        if self._match(TokenType.SEMICOLON):
+            initializer = None
+        elif self._match(TokenType.VAR):
+            initializer = self._var_declare()
+        else:
+            initializer = self._expression_statement()
+
+        # A missing condition loops forever.
+        condition = Literal(keyword, True)
+        if not self._check(TokenType.SEMICOLON):
+            condition = self._expression()
+        self._skip(TokenType.SEMICOLON, "Expect ';' after loop condition.")
+
+        increment = None
+        if not self._check(TokenType.RIGHT_PAREN):
+            increment = self._expression()
+        self._skip(TokenType.RIGHT_PAREN, "Expect ')' after for clauses.")
+
+        return For(initializer, condition, increment, self._statement())
+
     def _if_statement(self) -> Stmt:
-        self._consume(TokenType.LEFT_PAREN, "Expect '(' after 'if'.")
+        self._skip(TokenType.LEFT_PAREN, "Expect '(' after 'if'.")
         condition = self._expression()
-        self._consume(TokenType.RIGHT_PAREN, "Expect ')' after if condition.")
+        self._skip(TokenType.RIGHT_PAREN, "Expect ')' after if condition.")
 
         then_branch = self._statement()
         else_branch = None
@@ -72,15 +151,22 @@ class PeuParser:
 
         return If(condition, then_branch, else_branch)
 
+    def _while_statement(self) -> Stmt:
+        self._skip(TokenType.LEFT_PAREN, "Expect '(' after 'while'.")
+        condition = self._expression()
+        self._skip(TokenType.RIGHT_PAREN, "Expect ')' after condition.")
+
+        return While(condition, self._statement())
+
     def _print_statement(self) -> Stmt:
         value = self._expression()
-        self._consume(TokenType.SEMICOLON, "Expect ';' after value.")
+        self._skip(TokenType.SEMICOLON, "Expect ';' after value.")
 
         return Print(value)
 
     def _expression_statement(self) -> Stmt:
         value = self._expression()
-        self._consume(TokenType.SEMICOLON, "Expect ';' after value.")
+        self._skip(TokenType.SEMICOLON, "Expect ';' after value.")
 
         return Expression(value)
     
@@ -105,7 +191,7 @@ class PeuParser:
         while (self._match(TokenType.OR)):
             operator = self._previous()
             right = self._and()
-            expr = Logical(expr, operator, right)
+            expr = LOGICAL_NODES[operator.type](expr, operator, right)
 
         return expr
     
@@ -115,7 +201,7 @@ class PeuParser:
         while (self._match(TokenType.AND)):
             operator = self._previous()
             right = self._equality()
-            expr = Logical(expr, operator, right)
+            expr = LOGICAL_NODES[operator.type](expr, operator, right)
 
         return expr
 
@@ -129,7 +215,7 @@ class PeuParser:
         while self._match(TokenType.BANG_EQUAL, TokenType.EQUAL_EQUAL):
             operator = self._previous()
             right = self._comparison()
-            expr = Binary(expr, operator, right)
+            expr = BINARY_NODES[operator.type](expr, operator, right)
 
         return expr
 
@@ -145,7 +231,7 @@ class PeuParser:
         ):
             operator = self._previous()
             right = self._term()
-            expr = Binary(expr, operator, right)
+            expr = BINARY_NODES[operator.type](expr, operator, right)
 
         return expr
 
@@ -156,7 +242,7 @@ class PeuParser:
         while self._match(TokenType.MINUS, TokenType.PLUS):
             operator = self._previous()
             right = self._factor()
-            expr = Binary(expr, operator, right)
+            expr = BINARY_NODES[operator.type](expr, operator, right)
 
         return expr
 
@@ -167,7 +253,7 @@ class PeuParser:
         while self._match(TokenType.SLASH, TokenType.STAR):
             operator = self._previous()
             right = self._unary()
-            expr = Binary(expr, operator, right)
+            expr = BINARY_NODES[operator.type](expr, operator, right)
 
         return expr
 
@@ -177,45 +263,64 @@ class PeuParser:
         if self._match(TokenType.BANG, TokenType.MINUS):
             operator = self._previous()
             right = self._unary()
-            return Unary(operator, right)
+            return UNARY_NODES[operator.type](operator, right)
 
         return self._primary()
 
     def _primary(self) -> Expr:
-        """primary        → NUMBER | STRING | "true" | "false" | "null" | "(" expression ")" ;"""
+        """primary        → NUMBER | STRING | "true" | "false" | "null" | "(" expression ")" | array ;"""
         if self._match(TokenType.FALSE):
-            return Literal(False)
+            return Literal(self._previous(), False)
 
         if self._match(TokenType.TRUE):
-            return Literal(True)
+            return Literal(self._previous(), True)
 
         if self._match(TokenType.NULL):
-            return Literal(None)
+            return Literal(self._previous(), None)
 
         if self._match(TokenType.NUMBER, TokenType.STRING):
             literalToken = self._previous()
-            return Literal(literalToken.literal)
+            return Literal(literalToken, literalToken.literal)
 
         if self._match(TokenType.IDENTIFIER):
             return Variable(self._previous())
 
         if self._match(TokenType.LEFT_PAREN):
             expr = self._expression()
-            self._consume(
+            self._skip(
                 TokenType.RIGHT_PAREN, "Expect ')' after expression."
             )
             return Grouping(expr)
 
+        if self._match(TokenType.LEFT_BRACKET):
+            return self._array()
+
         raise self._error(self._peek(), "Expect expression.")
 
+    def _array(self) -> Expr:
+        """array          → "[" ( expression ( "," expression )* )? "]" ;"""
+        bracket = self._previous()
+        elements = []
+        if not self._check(TokenType.RIGHT_BRACKET):
+            elements.append(self._expression())
+            while self._match(TokenType.COMMA):
+                elements.append(self._expression())
+
+        self._skip(TokenType.RIGHT_BRACKET, "Expect ']' after array elements.")
+        return Array(bracket, elements)
+
     def _consume(self, type: TokenType, message: str) -> PeuToken:
         if self._check(type):
             return self._advance()
 
         raise self._error(self._peek(), message)
 
+    def _skip(self, type: TokenType, message: str) -> None:
+        """Like _consume, for punctuation the AST does not keep."""
+        self._consume(type, message)
+
     def _error(self, token, message: str) -> None:
-        # Peu.error(token, message)
+        self.errors.append((token, message))
         return ParseError()
 
     def _synchronize(self) -> None:
@@ -225,14 +330,14 @@ class PeuParser:
             if self._previous().type == TokenType.SEMICOLON:
                 return
             elif (
-                self._peek().type == TokenType.CLASS
-                or self._peek().type == TokenType.FUN
-                or self._peek().type == TokenType.VAR
-                or self._peek().type == TokenType.FOR
-                or self._peek().type == TokenType.IF
-                or self._peek().type == TokenType.WHILE
-                or self._peek().type == TokenType.PRINT
-                or self._peek().type == TokenType.RETURN
+                self._check(TokenType.CLASS)
+                or self._check(TokenType.FUN)
+                or self._check(TokenType.VAR)
+                or self._check(TokenType.FOR)
+                or self._check(TokenType.IF)
+                or self._check(TokenType.WHILE)
+                or self._check(TokenType.PRINT)
+                or self._check(TokenType.RETURN)
             ):
                 return
 
@@ -268,6 +373,89 @@ class PeuParser:
         return self._tokens[self._current - 1]
 
 
+class StreamingParser(PeuParser):
+    """Parser pulling its tokens from an iterator.
+
+    Only the current and previous tokens are kept, so memory stays bounded
+    however long the token stream is.
+    """
+
+    def __init__(self, tokens: Iterator[PeuToken]) -> None:
+        self._token_stream = tokens
+        self._previous_token = None
+        self._current_token = next(tokens)
+        self.errors = []
+
+    def _advance(self) -> PeuToken:
+        if not self._is_at_end():
+            self._previous_token = self._current_token
+            self._current_token = next(self._token_stream)
+
+        return self._previous_token
+
+    def _peek(self) -> PeuToken:
+        return self._current_token
+
+    def _previous(self) -> PeuToken:
+        return self._previous_token
+
+
+class ColumnarParser(PeuParser):
+    """Parser reading a TokenColumns.
+
+    Matching and skipping compare type codes in place; a PeuToken is only
+    materialized by _previous and _consume, when the parser keeps it in the
+    AST, or to report an error.
+    """
+
+    _EOF = TokenType.EOF.value
+
+    def __init__(self, tokens: TokenColumns) -> None:
+        self._columns = tokens
+        self._types = tokens.types
+        self._current = 0
+        self.errors = []
+
+    def _match(self, *types: TokenType) -> bool:
+        code = self._types[self._current]
+        if code == ColumnarParser._EOF:
+            return False
+
+        for type in types:
+            if code == type._value_:
+                self._current += 1
+                return True
+
+        return False
+
+    def _consume(self, type: TokenType, message: str) -> PeuToken:
+        if self._check(type):
+            self._current += 1
+            return self._previous()
+
+        raise self._error(self._peek(), message)
+
+    def _skip(self, type: TokenType, message: str) -> None:
+        if self._check(type):
+            self._current += 1
+            return
+
+        raise self._error(self._peek(), message)
+
+    def _check(self, type: TokenType) -> bool:
+        code = self._types[self._current]
+        return code != ColumnarParser._EOF and code == type._value_
+
+    def _is_at_end(self) -> bool:
+        return self._types[self._current] == ColumnarParser._EOF
+
+    def _peek(self) -> PeuToken:
+        return self._columns.token(self._current)
+
+    def _previous(self) -> PeuToken:
+        return self._columns.token(self._current - 1)
+
+
 class ParseError(RuntimeError):
     pass
 
@@ -1,6 +1,12 @@
+from array import array
+
+from number import parse_number
 from token_type import TokenType
 
+
 class PeuToken:
+    __slots__ = ("type", "lexeme", "literal", "line")
+
     def __init__(
         self, 
         type: TokenType, 
@@ -13,5 +19,59 @@ class PeuToken:
         self.literal = literal
         self.line = line
 
+    def __reduce__(self):
+        return (PeuToken, (self.type, self.lexeme, self.literal, self.line))
+
     def __repr__(self) -> str:
-        return f"PeuToken({self.type}, '{self.lexeme}', {self.literal}, {self.line})"
\ No newline at end of file
+        return f"PeuToken({self.type}, '{self.lexeme}', {self.literal}, {self.line})"
+
+
+# TokenType members indexed by their value.
+TOKEN_TYPES = [None] * (max(type.value for type in TokenType) + 1)
+for type in TokenType:
+    TOKEN_TYPES[type.value] = type
+
+
+class TokenColumns:
+    """A token stream stored column by column.
+
+    Token types are kept as their TokenType value and lexemes as offsets
+    into the source, so scanning allocates no object per token. PeuTokens
+    are only materialized on demand.
+    """
+
+    def __init__(self, source: str) -> None:
+        self.source = source
+        self.types = array("B")
+        self.starts = array("I")
+        self.ends = array("I")
+        self.lines = array("I")
+        # One int object per line, shared by the tokens materialized on it
+        # like the tokens of a list share the scanner's line counter.
+        self._line_numbers: dict[int, int] = dict()
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def append(self, type: int, start: int, end: int, line: int) -> None:
+        self.types.append(type)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.lines.append(line)
+
+    def lexeme(self, index: int) -> str:
+        return self.source[self.starts[index]:self.ends[index]]
+
+    def token(self, index: int) -> PeuToken:
+        type = TOKEN_TYPES[self.types[index]]
+        lexeme = self.lexeme(index)
+
+        literal = None
+        if type == TokenType.NUMBER:
+            literal = parse_number(lexeme)
+        elif type == TokenType.STRING:
+            literal = lexeme[1:-1]
+
+        line = self.lines[index]
+        line = self._line_numbers.setdefault(line, line)
+        return PeuToken(type, lexeme, literal, line)
@@ -0,0 +1,160 @@
+import json
+from time import perf_counter_ns
+from typing import TextIO
+
+from hooks import node_line
+from output import OutputSink
+from peu_interpreter import Interpreter
+from stmt import Stmt
+
+
+class ProfileEntry:
+    __slots__ = ("calls", "cumulative", "self_time")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        # Nanoseconds.
+        self.cumulative = 0
+        self.self_time = 0
+
+    def to_json(self) -> dict[str, int]:
+        return {
+            "calls": self.calls,
+            "cumulative_ns": self.cumulative,
+            "self_ns": self.self_time,
+        }
+
+
+class Profile:
+    """Call counts and times per AST node type, per source line and per
+    (node type, line) pair.
+
+    Cumulative time is only counted for the outermost active call of a key,
+    so that recursive nodes (a Binary inside a Binary) are not counted
+    twice.
+    """
+
+    def __init__(self) -> None:
+        self.by_type: dict[str, ProfileEntry] = dict()
+        self.by_line: dict[int, ProfileEntry] = dict()
+        self.by_type_line: dict[tuple[str, int], ProfileEntry] = dict()
+        self._active: dict[object, int] = dict()
+
+    def enter(self, node_type: str, line: int) -> None:
+        for key in (node_type, line, (node_type, line)):
+            self._active[key] = self._active.get(key, 0) + 1
+
+    def exit(self, node_type: str, line: int, elapsed: int, self_time: int) -> None:
+        for table, key in (
+            (self.by_type, node_type),
+            (self.by_line, line),
+            (self.by_type_line, (node_type, line)),
+        ):
+            entry = table.get(key)
+            if entry is None:
+                entry = table[key] = ProfileEntry()
+
+            entry.calls += 1
+            entry.self_time += self_time
+            self._active[key] -= 1
+            if self._active[key] == 0:
+                entry.cumulative += elapsed
+
+    def total(self) -> int:
+        return sum(entry.self_time for entry in self.by_type.values())
+
+    def report(self, file: TextIO, limit: int = 20) -> None:
+        """Writes the hot spots, sorted by self time."""
+        total = self.total() or 1
+
+        for title, table in (("node type", self.by_type), ("line", self.by_line)):
+            file.write(
+                f"\n{'By ' + title:<16} {'calls':>10} {'self ms':>10} "
+                f"{'self %':>7} {'cumul. ms':>10}\n"
+            )
+            entries = sorted(
+                table.items(), key=lambda item: item[1].self_time, reverse=True
+            )
+            for key, entry in entries[:limit]:
+                label = key if title == "node type" else f"line {key}"
+                file.write(
+                    f"{label:<16} {entry.calls:>10,} "
+                    f"{entry.self_time / 1e6:>10.3f} "
+                    f"{entry.self_time / total:>7.1%} "
+                    f"{entry.cumulative / 1e6:>10.3f}\n"
+                )
+
+    def to_json(self) -> dict[str, object]:
+        return {
+            "total_ns": self.total(),
+            "node_types": {
+                key: entry.to_json() for key, entry in self.by_type.items()
+            },
+            "lines": {
+                str(key): entry.to_json() for key, entry in self.by_line.items()
+            },
+        }
+
+    def write_json(self, path: str) -> None:
+        with open(path, "w") as file:
+            json.dump(self.to_json(), file, indent=2)
+
+    def write_callgrind(self, path: str, script: str) -> None:
+        """Writes the self times in the callgrind format, one function per
+        node type, so that the profile opens in KCachegrind and similar.
+        """
+        with open(path, "w") as file:
+            file.write("# callgrind format\nversion: 1\ncreator: peu\n")
+            file.write("positions: line\nevents: Nanoseconds Calls\n")
+            file.write(f"\nfl={script}\n")
+
+            node_type = None
+            for (entry_type, line), entry in sorted(self.by_type_line.items()):
+                if entry_type != node_type:
+                    node_type = entry_type
+                    file.write(f"fn={node_type}\n")
+                file.write(f"{line} {entry.self_time} {entry.calls}\n")
+
+
+class ProfilingInterpreter(Interpreter):
+    """Tree-walking Interpreter timing every statement and expression.
+
+    Only swapped in when profiling is requested, so the regular engines pay
+    nothing for it. Every node is attributed to the line of its first token;
+    see hooks.node_line.
+    """
+
+    def __init__(self, output: OutputSink = None) -> None:
+        super().__init__(output)
+
+        self.profile = Profile()
+        self._node_lines: dict[object, int] = dict()
+        # Time spent in the children of each active node.
+        self._children: list[int] = [0]
+
+    def _execute(self, statement: Stmt):
+        return self._profiled(statement, super()._execute)
+
+    def _evaluate(self, expr):
+        return self._profiled(expr, super()._evaluate)
+
+    def _profiled(self, node, run):
+        line = self._node_lines.get(node)
+        if line is None:
+            line = self._node_lines[node] = node_line(node)
+
+        node_type = type(node).__name__
+        profile = self.profile
+        children = self._children
+
+        profile.enter(node_type, line)
+        children.append(0)
+        start = perf_counter_ns()
+        try:
+            return run(node)
+        finally:
+            elapsed = perf_counter_ns() - start
+            self_time = elapsed - children.pop()
+            children[-1] += elapsed
+            profile.exit(node_type, line, elapsed, self_time)
+
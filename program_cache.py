@@ -0,0 +1,95 @@
+import gc
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+
+from resolver import Resolution
+from stmt import Stmt
+
+
+# Bump whenever the AST classes, the tokens, the optimizer or the resolver
+# output change.
+CACHE_VERSION = 7
+HEADER = f"PEUC{CACHE_VERSION}:{sys.implementation.cache_tag}\n".encode()
+
+
+class ProgramCache:
+    """On-disk cache of parsed and resolved programs, similar to .pyc files.
+
+    Entries live in a `__peucache__` directory next to the script, or under
+    `directory` when given. An entry is only used when it was written by
+    the same cache version and Python implementation for a source with the
+    same SHA-256 digest; anything else is ignored and overwritten.
+    """
+
+    def __init__(self, directory: str = None) -> None:
+        self._directory = directory
+
+    def path_for(self, script: str) -> str:
+        script = os.path.abspath(script)
+        if self._directory is None:
+            directory, name = os.path.split(script)
+            return os.path.join(directory, "__peucache__", f"{name}.peuc")
+
+        name = hashlib.sha256(script.encode()).hexdigest()[:32]
+        return os.path.join(self._directory, f"{name}.peuc")
+
+    def load(
+        self, script: str, source: str
+    ) -> tuple[list[Stmt], Resolution] | None:
+        try:
+            with open(self.path_for(script), "rb") as file:
+                data = file.read()
+        except OSError:
+            return None
+
+        digest = hashlib.sha256(source.encode()).digest()
+        if data[:len(HEADER)] != HEADER:
+            return None
+        if data[len(HEADER):len(HEADER) + len(digest)] != digest:
+            return None
+
+        # Unpickling allocates a node per AST node; cyclic collections over
+        # them would dominate the load time.
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return pickle.loads(data[len(HEADER) + len(digest):])
+        except Exception:
+            return None
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    def store(
+        self, script: str, source: str, program: tuple[list[Stmt], Resolution]
+    ) -> None:
+        try:
+            payload = pickle.dumps(program, protocol=pickle.HIGHEST_PROTOCOL)
+        except RecursionError:
+            # Too deeply nested to pickle; simply not cached.
+            return
+
+        digest = hashlib.sha256(source.encode()).digest()
+        path = self.path_for(script)
+        directory = os.path.dirname(path)
+
+        try:
+            os.makedirs(directory, exist_ok=True)
+            # Write to a temporary file and rename it so that concurrent
+            # runs never see a partial entry.
+            fd, temporary = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as file:
+                    file.write(HEADER)
+                    file.write(digest)
+                    file.write(payload)
+                os.replace(temporary, path)
+            except BaseException:
+                os.unlink(temporary)
+                raise
+        except OSError:
+            # A read-only tree just runs without a cache.
+            pass
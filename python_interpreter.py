@@ -0,0 +1,476 @@
+import math
+import operator as op
+from collections.abc import Mapping
+from types import CodeType, MappingProxyType
+
+from error import PeuRuntimeError
+from expr import Array, Assign, Binary, Expr, Grouping, Literal, Logical, Unary, Variable, Visitor as ExprVisitor
+from number import MAX_EXACT, MIN_EXACT, NUMBER_TYPES, multiply, negate
+from peu_array import PeuArray, make_array
+from peu_interpreter import Interpreter
+from peu_token import PeuToken
+from rope import STRING_TYPES, concat
+from stmt import Block, Expression, For, If, Print, Stmt, Var, While, Visitor as StmtVisitor
+from token_type import TokenType
+
+
+PYTHON_OPERATORS = {
+    TokenType.MINUS: "-",
+    TokenType.STAR: "*",
+    TokenType.SLASH: "/",
+    TokenType.GREATER: ">",
+    TokenType.GREATER_EQUAL: ">=",
+    TokenType.LESS: "<",
+    TokenType.LESS_EQUAL: "<=",
+    TokenType.EQUAL_EQUAL: "==",
+    TokenType.PLUS: "+",
+}
+
+# What the slow path applies once the operands are checked, i.e. when one
+# of them is an array.
+ARRAY_OPERATORS = {
+    TokenType.MINUS: op.sub,
+    TokenType.STAR: op.mul,
+    TokenType.SLASH: op.truediv,
+    TokenType.GREATER: op.gt,
+    TokenType.GREATER_EQUAL: op.ge,
+    TokenType.LESS: op.lt,
+    TokenType.LESS_EQUAL: op.le,
+}
+
+# Operators whose int results are range checked, see number.py.
+EXACT_OPERATORS = {TokenType.PLUS, TokenType.MINUS, TokenType.STAR}
+
+# Operators giving a number, and a boolean, when their operands are numbers
+# rather than arrays.
+NUMBER_RESULT_OPERATORS = {TokenType.MINUS, TokenType.STAR, TokenType.SLASH}
+COMPARISON_OPERATORS = {
+    TokenType.GREATER,
+    TokenType.GREATER_EQUAL,
+    TokenType.LESS,
+    TokenType.LESS_EQUAL,
+}
+BOOL_RESULT_OPERATORS = {TokenType.EQUAL_EQUAL, TokenType.BANG_EQUAL}
+
+# Number of generated lines after which a new top-level function starts.
+FUNCTION_SIZE = 200
+
+
+class PythonInterpreter(Interpreter):
+    """Interpreter that transpiles programs to Python source and runs them
+    through compile()/exec, so hot scripts execute as CPython bytecode.
+    """
+
+    def transpile(self, statements: list[Stmt]) -> str:
+        transpiler = Transpiler(self._locals, self._scope_sizes)
+        return transpiler.transpile(statements)
+
+    def interpret(self, statements: list[Stmt]) -> None:
+        if self.hooks_installed:
+            # Hooks are dispatched by the tree-walking interpreter.
+            self._walk(statements)
+            return
+
+        self.execute(self.lower(statements))
+
+    def lower(self, statements: list[Stmt]) -> "TranspiledProgram | tuple[Stmt, ...]":
+        """Returns the compiled Python code of `statements`, or the
+        statements themselves when they cannot be compiled.
+        """
+        transpiler = Transpiler(self._locals, self._scope_sizes)
+        source = transpiler.transpile(statements)
+
+        try:
+            code = compile(source, "<peu>", "exec")
+        except (SyntaxError, RecursionError, MemoryError):
+            # Very deep expressions exceed CPython's parser limits.
+            return tuple(statements)
+
+        return TranspiledProgram(code, transpiler.constants)
+
+    def execute(self, program: "TranspiledProgram | tuple[Stmt, ...]") -> None:
+        if type(program) is tuple:
+            self._walk(program)
+            return
+
+        namespace = self._namespace(program.constants)
+        exec(program.code, namespace)
+
+        try:
+            namespace["_peu_main"]()
+        except PeuRuntimeError as error:
+            self._runtime_error(error)
+
+    def _namespace(self, constants: Mapping[str, object]) -> dict[str, object]:
+        environment = self.globals
+
+        def assign(name: PeuToken, value: object) -> object:
+            environment.assign(name, value)
+            return value
+
+        def add(left: object, right: object, operator: PeuToken) -> object:
+            if isinstance(left, STRING_TYPES) and isinstance(right, STRING_TYPES):
+                return concat(left, right)
+            if type(left) is PeuArray or type(right) is PeuArray:
+                self._check_number_operands(operator, left, right)
+                return left + right
+
+            raise PeuRuntimeError(
+                operator, "Operands must be two numbers or two strings."
+            )
+
+        def equal(operator: PeuToken, left: object, right: object) -> bool:
+            self._check_equality_operands(operator, left, right)
+            return self._is_equal(left, right)
+
+        def operate(operator: PeuToken, left: object, right: object) -> object:
+            self._check_number_operands(operator, left, right)
+            return ARRAY_OPERATORS[operator.type](left, right)
+
+        def negate_checked(value: object, operator: PeuToken) -> object:
+            self._check_number_operand(operator, value)
+            return negate(value)
+
+        namespace = {
+            "_get": environment.get,
+            "_define": environment.define,
+            "_assign": assign,
+            "_add": add,
+            "_equal": equal,
+            "_operate": operate,
+            "_array": make_array,
+            "_negate": negate_checked,
+            "_mul": multiply,
+            "_numbers": NUMBER_TYPES,
+            "_truthy": self._is_truthy,
+            "_stringify": self._stringify,
+            "_print": self.output.print,
+        }
+        namespace.update(constants)
+        return namespace
+
+
+class TranspiledProgram:
+    """Code object of a transpiled program and the constants it references,
+    which each run binds in a fresh namespace.
+    """
+
+    __slots__ = ("code", "constants")
+
+    def __init__(self, code: CodeType, constants: dict[str, object]) -> None:
+        object.__setattr__(self, "code", code)
+        object.__setattr__(self, "constants", MappingProxyType(constants))
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise AttributeError("TranspiledProgram is immutable")
+
+
+class Transpiler(ExprVisitor, StmtVisitor):
+    """Lowers a resolved statement list to Python source.
+
+    Block locals become Python locals named after their flat slot, and the
+    number fast paths are inlined with assignment expressions. Tokens and
+    non-literal constants are referenced by name and collected in
+    `constants`. The entry point is `_peu_main`.
+    """
+
+    def __init__(
+        self,
+        locals: dict[object, tuple[int, int]],
+        scope_sizes: dict[Block | For, int],
+    ) -> None:
+        super().__init__()
+
+        self._locals = locals
+        self._scope_sizes = scope_sizes
+        self._lines: list[str] = []
+        self._indent = 1
+        self._depth = 0
+        # (base, size) of each enclosing block, innermost last.
+        self._scopes: list[tuple[int, int]] = [(0, 0)]
+        self.constants: dict[str, object] = dict()
+
+    def transpile(self, statements: list[Stmt]) -> str:
+        # Top-level statements never share locals, so they are split across
+        # several functions: CPython compiles one huge function much more
+        # slowly than many small ones.
+        functions = []
+        start = None
+        for statement in statements:
+            if start is None or len(self._lines) - start >= FUNCTION_SIZE:
+                functions.append(f"_peu_{len(functions)}")
+                self._lines.append(f"def {functions[-1]}():")
+                start = len(self._lines)
+            self._emit_stmt(statement)
+            if len(self._lines) == start:
+                self._emit("pass")
+
+        self._lines.append("def _peu_main():")
+        for function in functions:
+            self._emit(f"{function}()")
+        if not functions:
+            self._emit("pass")
+
+        return "\n".join(self._lines) + "\n"
+
+    def _emit(self, line: str) -> None:
+        self._lines.append("    " * self._indent + line)
+
+    def _emit_stmt(self, stmt: Stmt) -> None:
+        stmt.accept(self)
+
+    def _emit_body(self, stmt: Stmt) -> None:
+        self._indent += 1
+        start = len(self._lines)
+        self._emit_stmt(stmt)
+        if len(self._lines) == start:
+            self._emit("pass")
+        self._indent -= 1
+
+    def _expr(self, expr: Expr) -> str:
+        self._depth += 1
+        try:
+            return expr.accept(self)
+        finally:
+            self._depth -= 1
+
+    def _temporary(self, prefix: str = "_v") -> str:
+        # Subexpressions are nested one level deeper, so a temporary only
+        # needs to be unique per depth to never clobber a live one.
+        return f"{prefix}{self._depth}"
+
+    def _constant(self, value: object) -> str:
+        name = f"_k{len(self.constants)}"
+        self.constants[name] = value
+        return name
+
+    def _local_name(self, node: object, name: PeuToken) -> str:
+        location = self._locals.get(node)
+        if location is None:
+            return None
+
+        depth, slot = location
+        base, _ = self._scopes[-1 - depth]
+        if name.lexeme.isidentifier():
+            return f"{name.lexeme}_{base + slot}"
+        return f"_l{base + slot}"
+
+    def _truthy(self, code: str) -> str:
+        value = self._temporary()
+        return (
+            f"(({value} := {code}) is True or ({value} is not False "
+            f"and {value} is not None and _truthy({value})))"
+        )
+
+    def visit_block(self, stmt: Block) -> None:
+        base, size = self._scopes[-1]
+        self._scopes.append((base + size, self._scope_sizes[stmt]))
+
+        for statement in stmt.statements:
+            self._emit_stmt(statement)
+
+        self._scopes.pop()
+
+    def visit_expression(self, stmt: Expression) -> None:
+        self._emit(self._expr(stmt.expression))
+
+    def visit_for(self, stmt: For) -> None:
+        base, size = self._scopes[-1]
+        self._scopes.append((base + size, self._scope_sizes[stmt]))
+
+        if stmt.initializer is not None:
+            self._emit_stmt(stmt.initializer)
+        self._emit_loop(stmt.condition, stmt.body, stmt.increment)
+
+        self._scopes.pop()
+
+    def visit_while(self, stmt: While) -> None:
+        self._emit_loop(stmt.condition, stmt.body, None)
+
+    def _emit_loop(self, condition: Expr, body: Stmt, increment: Expr | None) -> None:
+        self._emit(f"while {self._condition(condition)}:")
+        self._emit_body(body)
+        if increment is not None:
+            self._indent += 1
+            self._emit(self._expr(increment))
+            self._indent -= 1
+
+    def _condition(self, expr: Expr) -> str:
+        condition = self._expr(expr)
+        if isinstance(expr, Literal) and expr.value is True:
+            return "True"
+        if not self._is_bool(expr):
+            condition = self._truthy(condition)
+        return condition
+
+    def visit_if(self, stmt: If) -> None:
+        condition = self._condition(stmt.condition)
+
+        self._emit(f"if {condition}:")
+        self._emit_body(stmt.then_branch)
+
+        if stmt.else_branch is not None:
+            self._emit("else:")
+            self._emit_body(stmt.else_branch)
+
+    def visit_print(self, stmt: Print) -> None:
+        self._emit(f"_print(_stringify({self._expr(stmt.expression)}))")
+
+    def visit_var(self, stmt: Var) -> None:
+        value = "None"
+        if stmt.initializer is not None:
+            value = self._expr(stmt.initializer)
+
+        local = self._local_name(stmt, stmt.name)
+        if local is None:
+            self._emit(f"_define({stmt.name.lexeme!r}, {value})")
+        else:
+            self._emit(f"{local} = {value}")
+
+    def visit_array(self, expr: Array) -> str:
+        elements = ", ".join(self._expr(element) for element in expr.elements)
+        return f"_array({self._constant(expr.bracket)}, [{elements}])"
+
+    def visit_assign(self, expr: Assign) -> str:
+        value = self._expr(expr.value)
+
+        local = self._local_name(expr, expr.name)
+        if local is None:
+            return f"_assign({self._constant(expr.name)}, {value})"
+        return f"({local} := {value})"
+
+    def visit_binary(self, expr: Binary) -> str:
+        left = self._expr(expr.left)
+        right = self._expr(expr.right)
+        token = self._constant(expr.operator)
+
+        if expr.operator.type == TokenType.BANG_EQUAL:
+            return f"(not ({left}) == ({right}))"
+
+        operator = PYTHON_OPERATORS[expr.operator.type]
+        # A product of ints that should be -0.0 is computed again from its
+        # operands, so they must not be evaluated twice.
+        is_multiply = expr.operator.type == TokenType.STAR
+        b, b_check = self._number_operand(
+            expr.right,
+            right,
+            "_b",
+            not is_multiply or isinstance(expr.right, Literal),
+        )
+        # The left operand must still be evaluated first: it may only skip
+        # the checked temporary when it has no side effects or the right
+        # operand is not checked either.
+        a, a_check = self._number_operand(
+            expr.left,
+            left,
+            "_a",
+            (b_check is None and not is_multiply) or isinstance(expr.left, Literal),
+        )
+        result = f"({a} {operator} {b})"
+        if expr.operator.type in EXACT_OPERATORS:
+            result = self._exact(result, a, b, is_multiply)
+
+        checks = [check for check in (a_check, b_check) if check is not None]
+        if not checks:
+            return result
+
+        if expr.operator.type == TokenType.PLUS:
+            slow_path = f"_add({a}, {b}, {token})"
+        elif expr.operator.type == TokenType.EQUAL_EQUAL:
+            slow_path = f"_equal({token}, {a}, {b})"
+        else:
+            slow_path = f"_operate({token}, {a}, {b})"
+
+        # `&` rather than `and` so that the right operand is always evaluated.
+        return f"({result} if {' & '.join(checks)} else {slow_path})"
+
+    def _exact(self, code: str, a: str, b: str, is_multiply: bool) -> str:
+        """Range checks the result of `code` like number.add, subtract and
+        multiply do. Float results pass the check unless they are out of
+        range as well, and then come out of float() or _mul() unchanged.
+        """
+        value = self._temporary("_r")
+        if is_multiply:
+            return (
+                f"({value} if ({value} := {code}) and {MIN_EXACT} <= {value} <= {MAX_EXACT} "
+                f"else _mul({a}, {b}))"
+            )
+        return f"({value} if {MIN_EXACT} <= ({value} := {code}) <= {MAX_EXACT} else float({value}))"
+
+    def _number_operand(
+        self, expr: Expr, code: str, prefix: str, can_inline: bool = True
+    ) -> tuple[str, str]:
+        if can_inline and self._is_number(expr):
+            return code, None
+
+        value = self._temporary(prefix)
+        return value, f"(type({value} := {code}) in _numbers)"
+
+    def _is_number(self, expr: Expr) -> bool:
+        """Whether expr statically always evaluates to a number (or raises)."""
+        if isinstance(expr, Grouping):
+            return self._is_number(expr.expression)
+        if isinstance(expr, Literal):
+            return type(expr.value) in NUMBER_TYPES
+        if isinstance(expr, Unary):
+            return expr.operator.type == TokenType.MINUS and self._is_number(expr.right)
+        if isinstance(expr, Binary):
+            return (
+                expr.operator.type in NUMBER_RESULT_OPERATORS
+                and self._is_number(expr.left)
+                and self._is_number(expr.right)
+            )
+
+        return False
+
+    def _is_bool(self, expr: Expr) -> bool:
+        """Whether expr statically always evaluates to a boolean (or raises)."""
+        if isinstance(expr, Grouping):
+            return self._is_bool(expr.expression)
+        if isinstance(expr, Unary):
+            return expr.operator.type == TokenType.BANG
+        if isinstance(expr, Binary):
+            if expr.operator.type in COMPARISON_OPERATORS:
+                return self._is_number(expr.left) and self._is_number(expr.right)
+            return expr.operator.type in BOOL_RESULT_OPERATORS
+
+        return False
+
+    def visit_grouping(self, expr: Grouping) -> str:
+        return self._expr(expr.expression)
+
+    def visit_literal(self, expr: Literal) -> str:
+        value = expr.value
+        if isinstance(value, float) and not math.isfinite(value):
+            return self._constant(value)
+
+        return repr(value)
+
+    def visit_logical(self, expr: Logical) -> str:
+        left = self._expr(expr.left)
+        right = self._expr(expr.right)
+        value = self._temporary()
+
+        if expr.operator.type == TokenType.OR:
+            return f"({value} if _truthy({value} := {left}) else {right})"
+
+        return f"({right} if _truthy({value} := {left}) else {value})"
+
+    def visit_unary(self, expr: Unary) -> str:
+        right = self._expr(expr.right)
+
+        if expr.operator.type == TokenType.MINUS:
+            value = self._temporary()
+            token = self._constant(expr.operator)
+            return (
+                f"(-{value} if type({value} := {right}) is float "
+                f"else _negate({value}, {token}))"
+            )
+
+        return f"(not _truthy({right}))"
+
+    def visit_variable(self, expr: Variable) -> str:
+        local = self._local_name(expr, expr.name)
+        if local is None:
+            return f"_get({self._constant(expr.name)})"
+        return local
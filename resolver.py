@@ -0,0 +1,137 @@
+from expr import Array, Assign, Binary, Expr, Grouping, Literal, Logical, Unary, Variable, Visitor as ExprVisitor
+from stmt import Block, Expression, For, If, Print, Stmt, Var, While, Visitor as StmtVisitor
+
+
+class Resolution:
+    """Resolver output kept apart from any interpreter, so that it can be
+    cached and later loaded with Interpreter.load_resolution.
+    """
+
+    def __init__(self) -> None:
+        self.locals: dict[object, tuple[int, int]] = dict()
+        # Blocks, and for loops, whose clauses get a scope of their own.
+        self.scope_sizes: dict[Block | For, int] = dict()
+
+    def resolve(self, node: object, depth: int, slot: int) -> None:
+        self.locals[node] = (depth, slot)
+
+    def resolve_scope(self, block: Block | For, size: int) -> None:
+        self.scope_sizes[block] = size
+
+
+class Resolver(ExprVisitor, StmtVisitor):
+    """Static pass computing the (depth, slot) of every local variable access.
+
+    Each block scope maps a variable name to its slot in the block's frame.
+    Names that are not found in any enclosing block are left unresolved and
+    looked up by name in the global environment at runtime.
+    """
+
+    def __init__(self, interpreter) -> None:
+        super().__init__()
+
+        self._interpreter = interpreter
+        self._scopes: list[dict[str, int]] = []
+
+    def resolve(self, statements: list[Stmt]) -> None:
+        for statement in statements:
+            self._resolve_stmt(statement)
+
+    def _resolve_stmt(self, stmt: Stmt) -> None:
+        if stmt is not None:
+            stmt.accept(self)
+
+    def _resolve_expr(self, expr: Expr) -> None:
+        expr.accept(self)
+
+    def _begin_scope(self) -> None:
+        self._scopes.append(dict())
+
+    def _end_scope(self) -> dict[str, int]:
+        return self._scopes.pop()
+
+    def _declare(self, stmt: Var) -> None:
+        if not self._scopes:
+            return
+
+        scope = self._scopes[-1]
+        # Redeclaring a name in the same block reuses its slot.
+        slot = scope.setdefault(stmt.name.lexeme, len(scope))
+        self._interpreter.resolve(stmt, 0, slot)
+
+    def _resolve_local(self, expr: Expr, name: str) -> None:
+        for depth, scope in enumerate(reversed(self._scopes)):
+            slot = scope.get(name)
+            if slot is not None:
+                self._interpreter.resolve(expr, depth, slot)
+                return
+
+    def visit_block(self, stmt: Block) -> None:
+        self._begin_scope()
+        self.resolve(stmt.statements)
+        scope = self._end_scope()
+
+        self._interpreter.resolve_scope(stmt, len(scope))
+
+    def visit_expression(self, stmt: Expression) -> None:
+        self._resolve_expr(stmt.expression)
+
+    def visit_for(self, stmt: For) -> None:
+        self._begin_scope()
+        self._resolve_stmt(stmt.initializer)
+        self._resolve_expr(stmt.condition)
+        if stmt.increment is not None:
+            self._resolve_expr(stmt.increment)
+        self._resolve_stmt(stmt.body)
+        scope = self._end_scope()
+
+        self._interpreter.resolve_scope(stmt, len(scope))
+
+    def visit_if(self, stmt: If) -> None:
+        self._resolve_expr(stmt.condition)
+        self._resolve_stmt(stmt.then_branch)
+        if stmt.else_branch is not None:
+            self._resolve_stmt(stmt.else_branch)
+
+    def visit_print(self, stmt: Print) -> None:
+        self._resolve_expr(stmt.expression)
+
+    def visit_var(self, stmt: Var) -> None:
+        # The initializer is resolved before the declaration so that
+        # `var a = a;` reads the enclosing `a`, as it does at runtime.
+        if stmt.initializer is not None:
+            self._resolve_expr(stmt.initializer)
+
+        self._declare(stmt)
+
+    def visit_while(self, stmt: While) -> None:
+        self._resolve_expr(stmt.condition)
+        self._resolve_stmt(stmt.body)
+
+    def visit_array(self, expr: Array) -> None:
+        for element in expr.elements:
+            self._resolve_expr(element)
+
+    def visit_assign(self, expr: Assign) -> None:
+        self._resolve_expr(expr.value)
+        self._resolve_local(expr, expr.name.lexeme)
+
+    def visit_binary(self, expr: Binary) -> None:
+        self._resolve_expr(expr.left)
+        self._resolve_expr(expr.right)
+
+    def visit_grouping(self, expr: Grouping) -> None:
+        self._resolve_expr(expr.expression)
+
+    def visit_literal(self, expr: Literal) -> None:
+        pass
+
+    def visit_logical(self, expr: Logical) -> None:
+        self._resolve_expr(expr.left)
+        self._resolve_expr(expr.right)
+
+    def visit_unary(self, expr: Unary) -> None:
+        self._resolve_expr(expr.right)
+
+    def visit_variable(self, expr: Variable) -> None:
+        self._resolve_local(expr, expr.name.lexeme)
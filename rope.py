@@ -0,0 +1,106 @@
+"""Lazy string concatenation for the `+` operator.
+
+Environments hold a reference to every string, so `s = s + piece` always
+copies `s` and a string built by n appends costs O(n^2). Once a
+concatenation gets long, it returns a Rope instead, which keeps the parts
+and joins them only when the string is observed: printed, compared or
+converted with str().
+"""
+
+# Shorter results are built as plain str: copying them is cheaper than
+# keeping their parts.
+ROPE_MIN_LENGTH = 256
+
+
+class Rope:
+    """An immutable string made of the parts prepended and appended to it.
+
+    Appended parts are the first `right_count` items of a list and
+    prepended ones, in reverse order, the first `left_count` items of
+    another. The lists are shared with the ropes built from this one: the
+    newest rope of a chain adds its part in place, so a chain of n
+    concatenations costs O(n). A rope whose list already grew past its
+    count, because another rope was built from it, copies its parts first.
+    """
+
+    __slots__ = ("_left", "_left_count", "_right", "_right_count", "_length", "_flat")
+
+    def __init__(
+        self,
+        left: list[str],
+        left_count: int,
+        right: list[str],
+        right_count: int,
+        length: int,
+    ) -> None:
+        self._left = left
+        self._left_count = left_count
+        self._right = right
+        self._right_count = right_count
+        self._length = length
+        self._flat = None
+
+    def parts(self) -> list[str]:
+        parts = self._left[:self._left_count]
+        parts.reverse()
+        parts.extend(self._right[:self._right_count])
+        return parts
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __str__(self) -> str:
+        if self._flat is None:
+            self._flat = "".join(self.parts())
+
+        return self._flat
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (str, Rope)):
+            return len(self) == len(other) and str(self) == str(other)
+
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(str(self))
+
+    def __reduce__(self):
+        # Cached and pickled programs only ever see plain strings.
+        return (str, (str(self),))
+
+    def __repr__(self) -> str:
+        return f"Rope({str(self)!r})"
+
+
+STRING_TYPES = (str, Rope)
+
+
+def concat(left: str | Rope, right: str | Rope) -> str | Rope:
+    """Returns left + right; both must be a str or a Rope."""
+    length = len(left) + len(right)
+    if type(left) is str:
+        if type(right) is str:
+            if length < ROPE_MIN_LENGTH:
+                return left + right
+            return Rope([], 0, [left, right], 2, length)
+
+        parts, count = _extend(right._left, right._left_count, (left,))
+        return Rope(parts, count, right._right, right._right_count, length)
+
+    added = right.parts() if type(right) is Rope else (right,)
+    parts, count = _extend(left._right, left._right_count, added)
+    return Rope(left._left, left._left_count, parts, count, length)
+
+
+def _extend(parts: list[str], count: int, added) -> tuple[list[str], int]:
+    """Adds `added` after the first `count` items of `parts`, in place when
+    nothing was added after them yet.
+    """
+    if len(parts) == count:
+        parts.extend(added)
+        # Another thread may have extended the same list in between: the
+        # list then holds its parts too, and this rope copies instead.
+        if len(parts) == count + len(added):
+            return parts, count + len(added)
+
+    return [*parts[:count], *added], count + len(added)
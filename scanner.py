@@ -1,6 +1,9 @@
 #from peu import Peu
+import re
+
+from number import parse_number
 from token_type import TokenType
-from peu_token import PeuToken
+from peu_token import PeuToken, TokenColumns
 
 class Scanner:
     keywords = {
@@ -51,6 +54,10 @@ class Scanner:
             self._add_token(TokenType.LEFT_BRACE)
         elif ch == '}':
             self._add_token(TokenType.RIGHT_BRACE)
+        elif ch == '[':
+            self._add_token(TokenType.LEFT_BRACKET)
+        elif ch == ']':
+            self._add_token(TokenType.RIGHT_BRACKET)
         elif ch == ',':
             self._add_token(TokenType.COMMA)
         elif ch == '.':
@@ -85,7 +92,7 @@ class Scanner:
                 self._add_token(TokenType.GREATER)
         elif ch == '/':
             if self._match("/"):
-                while self.peek() != '\n' and not self._isAtEnd():
+                while self._peek() != '\n' and not self._isAtEnd():
                     self._next()
             else:
                 self._add_token(TokenType.SLASH)
@@ -168,7 +175,7 @@ class Scanner:
 
         self._add_token_literal(
             TokenType.NUMBER, 
-            float(self._source[self._start:self._current])
+            parse_number(self._source[self._start:self._current])
         )
     
     def identifier(self):
@@ -179,4 +186,210 @@ class Scanner:
         type = Scanner.keywords.get(text)
         if type is None:
             type = TokenType.IDENTIFIER
-        self._add_token(type)
\ No newline at end of file
+        self._add_token(type)
+
+
+class RegexScanner(Scanner):
+    """Scanner matching whole tokens with a single compiled regex.
+
+    It produces the same token stream as Scanner, line numbers included.
+    """
+
+    # Spaces are consumed in front of every match so that they rarely need
+    # an iteration of their own.
+    pattern = re.compile(
+        r"""
+        [ \t\r]*
+        (?:
+            (?P<identifier>[^\W\d_][^\W_]*)
+            |(?P<operator>[!=<>]=?|[(){}\[\],.\-+;*])
+            |(?P<number>\d+(?:\.\d+)?)
+            |(?P<newline>\n+)
+            |(?P<string>"[^"]*"?)
+            |//[^\n]*
+            |(?P<slash>/)
+            |.
+        )
+        """,
+        re.VERBOSE,
+    )
+
+    operators = {
+        "(": TokenType.LEFT_PAREN,
+        ")": TokenType.RIGHT_PAREN,
+        "{": TokenType.LEFT_BRACE,
+        "}": TokenType.RIGHT_BRACE,
+        "[": TokenType.LEFT_BRACKET,
+        "]": TokenType.RIGHT_BRACKET,
+        ",": TokenType.COMMA,
+        ".": TokenType.DOT,
+        "-": TokenType.MINUS,
+        "+": TokenType.PLUS,
+        ";": TokenType.SEMICOLON,
+        "*": TokenType.STAR,
+        "/": TokenType.SLASH,
+        "!": TokenType.BANG,
+        "!=": TokenType.BANG_EQUAL,
+        "=": TokenType.EQUAL,
+        "==": TokenType.EQUAL_EQUAL,
+        "<": TokenType.LESS,
+        "<=": TokenType.LESS_EQUAL,
+        ">": TokenType.GREATER,
+        ">=": TokenType.GREATER_EQUAL,
+    }
+
+    def scan_tokens(self):
+        self._current, self._line = self._scan_region(
+            self._source, len(self._source), self._line, True
+        )
+
+        self._tokens.append(PeuToken(TokenType.EOF, "", None, self._line))
+        return self._tokens
+
+    def scan_columns(self) -> TokenColumns:
+        """Scans the whole source into a TokenColumns instead of a list of
+        PeuTokens.
+        """
+        columns = TokenColumns(self._source)
+        add_type = columns.types.append
+        add_start = columns.starts.append
+        add_end = columns.ends.append
+        add_line = columns.lines.append
+
+        # The columns compute literals on demand.
+        for type, start, end, line, _ in RegexScanner._scan(
+            self._source, line=self._line, literals=False
+        ):
+            add_type(type._value_)
+            add_start(start)
+            add_end(end)
+            add_line(line)
+
+        self._current = len(self._source)
+        self._line = line
+        return columns
+
+    @staticmethod
+    def scan_from(source: str, position: int = 0, line: int = 1):
+        """Yields (offset, token) for every token of source[position:],
+        EOF included, where `position` is a token start or 0 and `line`
+        the line it is on.
+
+        The incremental front end uses it to re-scan from the start of a
+        declaration, and stops as soon as the tokens agree with the old ones.
+        """
+        for type, start, end, line, literal in RegexScanner._scan(
+            source, position, line=line
+        ):
+            yield start, PeuToken(type, source[start:end], literal, line)
+
+    @staticmethod
+    def stream_tokens(file, chunk_size: int = 1 << 16):
+        """Yields the tokens of a text file, reading it chunk by chunk.
+
+        Only text up to the last newline read so far is scanned, since no
+        token but a string can span lines. A string still open at the end
+        of that region is carried over to the next chunk.
+        """
+        scanner = RegexScanner("")
+        pending = ""
+        line = 1
+
+        while True:
+            chunk = file.read(chunk_size)
+            final = not chunk
+            text = pending + chunk
+
+            stop = len(text) if final else text.rfind("\n") + 1
+            position, line = scanner._scan_region(text, stop, line, final)
+            pending = text[position:]
+
+            yield from scanner._tokens
+            scanner._tokens.clear()
+
+            if final:
+                break
+
+        yield PeuToken(TokenType.EOF, "", None, line)
+
+    def _scan_region(
+        self, text: str, stop: int, line: int, final: bool
+    ) -> tuple[int, int]:
+        """Appends the tokens of text[:stop] and returns where scanning
+        stopped along with the current line.
+        """
+        append = self._tokens.append
+        eof = TokenType.EOF
+        for type, start, end, line, literal in RegexScanner._scan(
+            text, 0, stop, line, final
+        ):
+            if type is eof:
+                return start, line
+            append(PeuToken(type, text[start:end], literal, line))
+
+    @staticmethod
+    def _scan(
+        text: str,
+        position: int = 0,
+        stop: int | None = None,
+        line: int = 1,
+        final: bool = True,
+        literals: bool = True,
+    ):
+        """Yields (type, start, end, line, literal) for every token of
+        text[position:stop]; every scanning entry point goes through here.
+
+        The last item is an EOF at the offset where scanning stopped: `stop`
+        or, unless `final`, the start of a string still open at `stop`,
+        which the caller scans again once it has read more text. Literals
+        are left to None when `literals` is false.
+        """
+        if stop is None:
+            stop = len(text)
+        keywords = Scanner.keywords
+        operators = RegexScanner.operators
+        identifier = TokenType.IDENTIFIER
+        number = TokenType.NUMBER
+
+        restart = True
+        while restart:
+            restart = False
+            for m in RegexScanner.pattern.finditer(text, position, stop):
+                kind = m.lastgroup
+                if kind is None:
+                    continue
+                if kind == "newline":
+                    line += len(m[kind])
+                    continue
+
+                start, end = m.span(kind)
+                if kind == "identifier":
+                    lexeme = m[kind]
+                    if not lexeme[0].isalpha():
+                        # A numeric character that str.isalpha() rejects:
+                        # Scanner skips it, so resume right after it.
+                        position = start + 1
+                        restart = True
+                        break
+                    yield keywords.get(lexeme, identifier), start, end, line, None
+                elif kind == "operator":
+                    yield operators[m[kind]], start, end, line, None
+                elif kind == "number":
+                    literal = parse_number(m[kind]) if literals else None
+                    yield number, start, end, line, literal
+                elif kind == "string":
+                    lexeme = m[kind]
+                    if len(lexeme) == 1 or lexeme[-1] != '"':
+                        if not final:
+                            yield TokenType.EOF, start, start, line, None
+                            return
+                        # An unterminated string is dropped.
+                        line += lexeme.count("\n")
+                        continue
+                    line += lexeme.count("\n")
+                    literal = lexeme[1:-1] if literals else None
+                    yield TokenType.STRING, start, end, line, literal
+                else:
+                    yield TokenType.SLASH, start, end, line, None
+
+        yield TokenType.EOF, stop, stop, line, None
@@ -0,0 +1,391 @@
+"""`peu serve`: runs scripts for clients on a pool of warm interpreters.
+
+The server reads newline-delimited JSON requests from a Unix socket, or
+from stdin with --stdio, and answers each with one line of JSON:
+
+    {"id": 1, "source": "print amount * 2;", "globals": {"amount": 21}}
+    {"id": 2, "program": "5f0c...", "globals": {"amount": 4}, "timeout": 0.5}
+
+    {"id": 1, "program": "5f0c...", "status": "ok", "output": "42.0\\n", "errors": []}
+
+`program` names a source the server has already seen, so that clients can
+skip sending it again. `status` is one of ok, syntax_error, runtime_error,
+crashed (an uncaught Python error in an engine), timeout, busy or
+bad_request; `errors` holds the messages peu would print on stderr.
+
+Scripts run in worker processes that import the interpreter once and keep
+the programs they compiled in an LRU cache. A worker that exceeds the
+timeout is killed and replaced. Requests wait for a free worker, and are
+answered with `busy` once more than --max-pending of them are waiting.
+"""
+
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import os
+import signal
+import stat
+import sys
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.connection import Connection
+
+from engine import PeuEngine, make_environment
+from output import StringSink
+from peu import ENGINES, ArgumentParser
+from peu_client import DEFAULT_SOCKET
+
+
+# Longest request line accepted, i.e. roughly the largest script.
+MAX_REQUEST_SIZE = 1 << 24
+
+
+class LRUCache:
+    def __init__(self, size: int) -> None:
+        self._size = size
+        self._items: OrderedDict[str, object] = OrderedDict()
+
+    def get(self, key: str) -> object | None:
+        value = self._items.get(key)
+        if value is not None:
+            self._items.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: object) -> None:
+        self._items[key] = value
+        self._items.move_to_end(key)
+        if len(self._items) > self._size:
+            self._items.popitem(last=False)
+
+
+def program_id(source: str) -> str:
+    return hashlib.sha256(source.encode()).hexdigest()[:24]
+
+
+def worker_main(connection: Connection, engine: str, cache_size: int) -> None:
+    compiler = PeuEngine(engine)
+    programs = LRUCache(cache_size)
+
+    while True:
+        try:
+            key, source, globals = connection.recv()
+        except EOFError:
+            return
+
+        program = programs.get(key)
+        if program is None:
+            program = compiler.compile(source)
+            programs.put(key, program)
+
+        if program.errors:
+            connection.send(
+                {"status": "syntax_error", "output": "", "errors": [str(e) for e in program.errors]}
+            )
+            continue
+
+        try:
+            environment = make_environment(globals)
+        except TypeError as error:
+            # A global whose type Peu has no value for.
+            connection.send({"status": "bad_request", "output": "", "errors": [str(error)]})
+            continue
+
+        output = StringSink()
+        try:
+            result = program.run(environment, output)
+        except Exception as error:
+            connection.send(
+                {
+                    "status": "crashed",
+                    "output": output.getvalue(),
+                    "errors": [f"{type(error).__name__}: {error}"],
+                }
+            )
+            continue
+
+        response = {"status": "ok", "output": output.getvalue(), "errors": []}
+        if result.error is not None:
+            response["status"] = "runtime_error"
+            response["errors"] = [f"[line {result.error.token.line}] {result.error.message}"]
+        connection.send(response)
+
+
+class Worker:
+    """One worker process and the pipe to it. Its methods block, so the
+    server calls them from threads.
+    """
+
+    def __init__(self, context, engine: str, cache_size: int) -> None:
+        self._context = context
+        self._engine = engine
+        self._cache_size = cache_size
+        self._start()
+
+    def _start(self) -> None:
+        self.connection, child = self._context.Pipe()
+        self.process = self._context.Process(
+            target=worker_main,
+            args=(child, self._engine, self._cache_size),
+            daemon=True,
+        )
+        self.process.start()
+        child.close()
+
+    def run(self, key: str, source: str, globals: dict, timeout: float) -> dict | None:
+        """Returns the worker's response, or None after killing and
+        replacing a worker that did not answer within `timeout` seconds.
+        """
+        try:
+            self.connection.send((key, source, globals))
+            if self.connection.poll(timeout):
+                return self.connection.recv()
+        except (EOFError, OSError):
+            pass
+
+        self.restart()
+        return None
+
+    def restart(self) -> None:
+        self.close()
+        self._start()
+
+    def close(self) -> None:
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+
+class Server:
+    def __init__(
+        self,
+        engine: str = "tree",
+        workers: int = 4,
+        timeout: float = 5.0,
+        cache_size: int = 256,
+        max_pending: int = 64,
+    ) -> None:
+        self._timeout = timeout
+        self._max_pending = max_pending
+        self._pending = 0
+        self._sources = LRUCache(cache_size)
+
+        # The forkserver imports the interpreter once; workers forked from
+        # it, including replacements for killed ones, start warm.
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(["serve"])
+        self._workers = [Worker(context, engine, cache_size) for _ in range(workers)]
+        self._executor = ThreadPoolExecutor(workers)
+        self._idle: asyncio.Queue[Worker] = asyncio.Queue()
+        for worker in self._workers:
+            self._idle.put_nowait(worker)
+
+    def close(self) -> None:
+        for worker in self._workers:
+            worker.close()
+        self._executor.shutdown()
+
+    async def handle(self, request: dict[str, object]) -> dict[str, object]:
+        response = await self._handle(request)
+        if "id" in request:
+            response = {"id": request["id"], **response}
+        return response
+
+    async def _handle(self, request: dict[str, object]) -> dict[str, object]:
+        source = request.get("source")
+        if isinstance(source, str):
+            key = program_id(source)
+            self._sources.put(key, source)
+        else:
+            key = request.get("program")
+            source = self._sources.get(key) if isinstance(key, str) else None
+            if source is None:
+                return bad_request("Expected 'source', or the id of a known 'program'.")
+
+        globals = request.get("globals") or dict()
+        if not isinstance(globals, dict):
+            return bad_request("'globals' must be an object.")
+
+        timeout = self._timeout
+        requested = request.get("timeout")
+        if requested is not None:
+            # bool is an int subclass, and `not > 0` also rejects NaN.
+            if type(requested) not in (int, float) or not requested > 0:
+                return bad_request("'timeout' must be a positive number of seconds.")
+            timeout = min(timeout, requested)
+
+        if self._pending >= self._max_pending:
+            return {"program": key, "status": "busy", "output": "", "errors": ["Server busy."]}
+
+        self._pending += 1
+        try:
+            worker = await self._idle.get()
+        finally:
+            self._pending -= 1
+
+        try:
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(
+                self._executor, worker.run, key, source, globals, timeout
+            )
+        finally:
+            self._idle.put_nowait(worker)
+
+        if response is None:
+            response = {
+                "status": "timeout",
+                "output": "",
+                "errors": [f"Timed out after {timeout:g}s."],
+            }
+        return {"program": key, **response}
+
+    async def serve_stream(self, reader: asyncio.StreamReader, write) -> None:
+        """Answers every request read from `reader`, concurrently and in
+        completion order; `write` sends one encoded response line.
+        """
+        tasks = set()
+
+        async def respond(line: bytes) -> None:
+            try:
+                request = json.loads(line)
+            except ValueError:
+                response = bad_request("Invalid JSON.")
+            else:
+                if isinstance(request, dict):
+                    response = await self.handle(request)
+                else:
+                    response = bad_request("Expected a JSON object.")
+            await write(encode(response))
+
+        while True:
+            try:
+                line = await reader.readline()
+            except ValueError:
+                # Longer than MAX_REQUEST_SIZE: the rest of the stream
+                # cannot be split into requests any more.
+                await write(encode(bad_request("Request too large.")))
+                break
+            if not line:
+                break
+
+            if line.strip():
+                task = asyncio.create_task(respond(line))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+        if tasks:
+            await asyncio.wait(tasks)
+
+
+def bad_request(message: str) -> dict[str, object]:
+    return {"status": "bad_request", "output": "", "errors": [message]}
+
+
+def encode(response: dict[str, object]) -> bytes:
+    return json.dumps(response).encode() + b"\n"
+
+
+async def serve_socket(server: Server, path: str) -> None:
+    if os.path.exists(path) and stat.S_ISSOCK(os.stat(path).st_mode):
+        # Left behind by a server that did not shut down cleanly.
+        os.unlink(path)
+
+    async def on_connection(reader, writer) -> None:
+        async def write(data: bytes) -> None:
+            writer.write(data)
+            await writer.drain()
+
+        try:
+            await server.serve_stream(reader, write)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    unix_server = await asyncio.start_unix_server(
+        on_connection, path, limit=MAX_REQUEST_SIZE
+    )
+    sys.stderr.write(f"peu serve: listening on {path}\n")
+    try:
+        async with unix_server:
+            await unix_server.serve_forever()
+    finally:
+        os.unlink(path)
+
+
+async def serve_stdio(server: Server) -> None:
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader(limit=MAX_REQUEST_SIZE)
+    await loop.connect_read_pipe(
+        lambda: asyncio.StreamReaderProtocol(reader), sys.stdin
+    )
+
+    async def write(data: bytes) -> None:
+        sys.stdout.buffer.write(data)
+        sys.stdout.buffer.flush()
+
+    await server.serve_stream(reader, write)
+
+
+async def run(args) -> None:
+    # Stop like on Ctrl-C, so that the workers and the socket are cleaned up.
+    asyncio.get_running_loop().add_signal_handler(
+        signal.SIGTERM, asyncio.current_task().cancel
+    )
+    server = Server(
+        engine=args.engine,
+        workers=max(1, args.workers),
+        timeout=args.timeout,
+        cache_size=args.cache_size,
+        max_pending=args.max_pending,
+    )
+    try:
+        if args.stdio:
+            await serve_stdio(server)
+        else:
+            await serve_socket(server, args.socket)
+    finally:
+        server.close()
+
+
+def main(argv: list[str]) -> None:
+    parser = ArgumentParser(prog="peu serve")
+    where = parser.add_mutually_exclusive_group()
+    where.add_argument("--socket", default=DEFAULT_SOCKET, help="Unix socket to listen on")
+    where.add_argument(
+        "--stdio",
+        action="store_true",
+        help="read requests from stdin and write responses to stdout",
+    )
+    parser.add_argument("--engine", choices=ENGINES.keys(), default="tree")
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=os.cpu_count(),
+        help="number of worker processes, i.e. scripts running at once",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=5.0,
+        help="seconds a script may run; requests may only lower it",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=256,
+        help="number of compiled programs kept by each worker",
+    )
+    parser.add_argument(
+        "--max-pending",
+        type=int,
+        default=64,
+        help="requests allowed to wait for a worker before answering busy",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(run(args))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
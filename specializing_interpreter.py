@@ -0,0 +1,896 @@
+import gc
+import operator as op
+
+from closure_interpreter import FIRST_LOCAL_SLOT, GLOBALS_SLOT, PRINT_SLOT
+from error import PeuRuntimeError
+from expr import Array, Assign, Binary, Expr, Grouping, Literal, Logical, Unary, Variable, Visitor as ExprVisitor
+from number import MAX_EXACT, MIN_EXACT, NUMBER_TYPES, add, multiply, negate, subtract
+from peu_array import PeuArray, make_array
+from peu_interpreter import Interpreter
+from peu_token import PeuToken
+from rope import STRING_TYPES, concat
+from stmt import Block, Expression, For, If, Print, Stmt, Var, While, Visitor as StmtVisitor
+from token_type import TokenType
+
+
+class SpecializingInterpreter(Interpreter):
+    """Interpreter that runs a tree of executable nodes whose operations
+    rewrite themselves, on first evaluation, into versions specialized for
+    the operand types they see (IntAddNode for two ints, FloatAddNode for
+    two floats) and fall back for good to the generic Interpreter semantics
+    once those types change.
+    """
+
+    def interpret(self, statements: list[Stmt]) -> None:
+        if self.hooks_installed:
+            # Hooks are dispatched by the tree-walking interpreter.
+            self._walk(statements)
+            return
+
+        self.execute(self.lower(statements))
+
+    def lower(self, statements: list[Stmt]) -> tuple[tuple["Node", ...], int]:
+        """Returns the nodes of `statements` and the number of slots they use.
+
+        Runs sharing the nodes also share their specializations; a rewrite
+        only swaps the class of a node after checking the operand types, so
+        concurrent runs see either version and both are correct.
+        """
+        builder = NodeBuilder(self)
+
+        # Building allocates one object per AST node; see ClosureInterpreter.
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            nodes = tuple(builder.build_stmt(s) for s in statements)
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+        return nodes, builder.slot_count
+
+    def execute(self, program: tuple[tuple["Node", ...], int]) -> None:
+        nodes, slot_count = program
+        slots = [None] * slot_count
+        slots[GLOBALS_SLOT] = self.globals
+        slots[PRINT_SLOT] = self.output.print
+
+        try:
+            for node in nodes:
+                node.execute(slots)
+        except PeuRuntimeError as error:
+            self._runtime_error(error)
+
+
+class Node:
+    __slots__ = ()
+
+
+class ConstantNode(Node):
+    __slots__ = ("value",)
+
+    def __init__(self, value: object) -> None:
+        self.value = value
+
+    def evaluate(self, slots: list) -> object:
+        return self.value
+
+
+class LocalNode(Node):
+    __slots__ = ("slot",)
+
+    def __init__(self, slot: int) -> None:
+        self.slot = slot
+
+    def evaluate(self, slots: list) -> object:
+        return slots[self.slot]
+
+
+class GlobalNode(Node):
+    __slots__ = ("name",)
+
+    def __init__(self, name: PeuToken) -> None:
+        self.name = name
+
+    def evaluate(self, slots: list) -> object:
+        return slots[GLOBALS_SLOT].get(self.name)
+
+
+class ArrayNode(Node):
+    __slots__ = ("bracket", "elements")
+
+    def __init__(self, bracket: PeuToken, elements: tuple[Node, ...]) -> None:
+        self.bracket = bracket
+        self.elements = elements
+
+    def evaluate(self, slots: list) -> object:
+        return make_array(
+            self.bracket, [element.evaluate(slots) for element in self.elements]
+        )
+
+
+class AssignLocalNode(Node):
+    __slots__ = ("slot", "value")
+
+    def __init__(self, slot: int, value: Node) -> None:
+        self.slot = slot
+        self.value = value
+
+    def evaluate(self, slots: list) -> object:
+        value = slots[self.slot] = self.value.evaluate(slots)
+        return value
+
+
+class AssignGlobalNode(Node):
+    __slots__ = ("name", "value")
+
+    def __init__(self, name: PeuToken, value: Node) -> None:
+        self.name = name
+        self.value = value
+
+    def evaluate(self, slots: list) -> object:
+        value = self.value.evaluate(slots)
+        slots[GLOBALS_SLOT].assign(self.name, value)
+        return value
+
+
+class BinaryNode(Node):
+    """Uninitialized binary operation; see SpecializingInterpreter."""
+
+    __slots__ = ("left", "right", "operator", "function", "interpreter")
+
+    def __init__(
+        self,
+        left: Node,
+        right: Node,
+        operator: PeuToken,
+        function,
+        interpreter: Interpreter,
+    ) -> None:
+        self.left = left
+        self.right = right
+        self.operator = operator
+        # Applied to two numbers by the generic version.
+        self.function = function
+        self.interpreter = interpreter
+
+    def evaluate(self, slots: list) -> object:
+        left = self.left.evaluate(slots)
+        right = self.right.evaluate(slots)
+
+        specialized = GenericBinaryNode
+        if type(left) is float and type(right) is float:
+            specialized = FLOAT_NODES.get(self.operator.type, GenericBinaryNode)
+        elif type(left) is int and type(right) is int:
+            specialized = INT_NODES.get(self.operator.type, GenericBinaryNode)
+        elif (
+            isinstance(left, STRING_TYPES)
+            and isinstance(right, STRING_TYPES)
+            and self.operator.type == TokenType.PLUS
+        ):
+            specialized = StringAddNode
+        self.__class__ = specialized
+
+        return self.generic(left, right)
+
+    def despecialize(self, left: object, right: object) -> object:
+        self.__class__ = GenericBinaryNode
+        return self.generic(left, right)
+
+    def generic(self, left: object, right: object) -> object:
+        if self.operator.type == TokenType.PLUS:
+            if type(left) in NUMBER_TYPES and type(right) in NUMBER_TYPES:
+                return add(left, right)
+            elif isinstance(left, STRING_TYPES) and isinstance(right, STRING_TYPES):
+                return concat(left, right)
+            elif type(left) is PeuArray or type(right) is PeuArray:
+                self.interpreter._check_number_operands(self.operator, left, right)
+                return left + right
+
+            raise PeuRuntimeError(
+                self.operator, "Operands must be two numbers or two strings."
+            )
+
+        if self.operator.type == TokenType.EQUAL_EQUAL:
+            self.interpreter._check_equality_operands(self.operator, left, right)
+        else:
+            self.interpreter._check_number_operands(self.operator, left, right)
+        return self.function(left, right)
+
+
+class GenericBinaryNode(BinaryNode):
+    __slots__ = ()
+
+    def evaluate(self, slots: list) -> object:
+        left = self.left.evaluate(slots)
+        return self.generic(left, self.right.evaluate(slots))
+
+
+class FloatAddNode(BinaryNode):
+    __slots__ = ()
+
+    def evaluate(self, slots: list) -> object:
+        left = self.left.evaluate(slots)
+        right = self.right.evaluate(slots)
+        if type(left) is float and type(right) is float:
+            return left + right
+        return self.despecialize(left, right)
+
+
+class StringAddNode(BinaryNode):
+    __slots__ = ()
+
+    def evaluate(self, slots: list) -> object:
+        left = self.left.evaluate(slots)
+        right = self.right.evaluate(slots)
+        if isinstance(left, STRING_TYPES) and isinstance(right, STRING_TYPES):
+            return concat(left, right)
+        return self.despecialize(left, right)
+
+
+class FloatSubtractNode(BinaryNode):
+    __slots__ = ()
+
+    def evaluate(self, slots: list) -> object:
+        left = self.left.evaluate(slots)
+        right = self.right.evaluate(slots)
+        if type(left) is float and type(right) is float:
+            return left - right
+        return self.despecialize(left, right)
+
+
+class FloatMultiplyNode(BinaryNode):
+    __slots__ = ()
+
+    def evaluate(self, slots: list) -> object:
+        left = self.left.evaluate(slots)
+        right = self.right.evaluate(slots)
+        if type(left) is float and type(right) is float:
+            return left * right
+        return self.despecialize(left, right)
+
+
+class FloatDivideNode(BinaryNode):
+    __slots__ = ()
+
+    def evaluate(self, slots: list) -> object:
+        left = self.left.evaluate(slots)
+        right = self.right.evaluate(slots)
+        if type(left) is float and type(right) is float:
+            return left / right
+        return self.despecialize(left, right)
+
+
+class FloatGreaterNode(BinaryNode):
+    __slots__ = ()
+
+    def evaluate(self, slots: list) -> object:
+        left = self.left.evaluate(slots)
+        right = self.right.evaluate(slots)
+        if type(left) is float and type(right) is float:
+            return left > right
+        return self.despecialize(left, right)
+
+
+class FloatGreaterEqualNode(BinaryNode):
+    __slots__ = ()
+
+    def evaluate(self, slots: list) -> object:
+        left = self.left.evaluate(slots)
+        right = self.right.evaluate(slots)
+        if type(left) is float and type(right) is float:
+            return left >= right
+        return self.despecialize(left, right)
+
+
+class FloatLessNode(BinaryNode):
+    __slots__ = ()
+
+    def evaluate(self, slots: list) -> object:
+        left = self.left.evaluate(slots)
+        right = self.right.evaluate(slots)
+        if type(left) is float and type(right) is float:
+            return left < right
+        return self.despecialize(left, right)
+
+
+class FloatLessEqualNode(BinaryNode):
+    __slots__ = ()
+
+    def evaluate(self, slots: list) -> object:
+        left = self.left.evaluate(slots)
+        right = self.right.evaluate(slots)
+        if type(left) is float and type(right) is float:
+            return left <= right
+        return self.despecialize(left, right)
+
+
+class FloatEqualNode(BinaryNode):
+    __slots__ = ()
+
+    def evaluate(self, slots: list) -> object:
+        left = self.left.evaluate(slots)
+        right = self.right.evaluate(slots)
+        if type(left) is float and type(right) is float:
+            return left == right
+        return self.despecialize(left, right)
+
+
+FLOAT_NODES = {
+    TokenType.PLUS: FloatAddNode,
+    TokenType.MINUS: FloatSubtractNode,
+    TokenType.STAR: FloatMultiplyNode,
+    TokenType.SLASH: FloatDivideNode,
+    TokenType.GREATER: FloatGreaterNode,
+    TokenType.GREATER_EQUAL: FloatGreaterEqualNode,
+    TokenType.LESS: FloatLessNode,
+    TokenType.LESS_EQUAL: FloatLessEqualNode,
+    TokenType.EQUAL_EQUAL: FloatEqualNode,
+}
+
+
+# Int results of +, - and * are range checked like in number.add,
+# number.subtract and number.multiply.
+class IntAddNode(BinaryNode):
+    __slots__ = ()
+
+    def evaluate(self, slots: list) -> object:
+        left = self.left.evaluate(slots)
+        right = self.right.evaluate(slots)
+        if type(left) is int and type(right) is int:
+            result = left + right
+            if MIN_EXACT <= result <= MAX_EXACT:
+                return result
+            return float(result)
+        return self.despecialize(left, right)
+
+
+class IntSubtractNode(BinaryNode):
+    __slots__ = ()
+
+    def evaluate(self, slots: list) -> object:
+        left = self.left.evaluate(slots)
+        right = self.right.evaluate(slots)
+        if type(left) is int and type(right) is int:
+            result = left - right
+            if MIN_EXACT <= result <= MAX_EXACT:
+                return result
+            return float(result)
+        return self.despecialize(left, right)
+
+
+class IntMultiplyNode(BinaryNode):
+    __slots__ = ()
+
+    def evaluate(self, slots: list) -> object:
+        left = self.left.evaluate(slots)
+        right = self.right.evaluate(slots)
+        if type(left) is int and type(right) is int:
+            result = left * right
+            if result and MIN_EXACT <= result <= MAX_EXACT:
+                return result
+            return float(left) * float(right)
+        return self.despecialize(left, right)
+
+
+class IntDivideNode(BinaryNode):
+    __slots__ = ()
+
+    def evaluate(self, slots: list) -> object:
+        left = self.left.evaluate(slots)
+        right = self.right.evaluate(slots)
+        if type(left) is int and type(right) is int:
+            return left / right
+        return self.despecialize(left, right)
+
+
+class IntGreaterNode(BinaryNode):
+    __slots__ = ()
+
+    def evaluate(self, slots: list) -> object:
+        left = self.left.evaluate(slots)
+        right = self.right.evaluate(slots)
+        if type(left) is int and type(right) is int:
+            return left > right
+        return self.despecialize(left, right)
+
+
+class IntGreaterEqualNode(BinaryNode):
+    __slots__ = ()
+
+    def evaluate(self, slots: list) -> object:
+        left = self.left.evaluate(slots)
+        right = self.right.evaluate(slots)
+        if type(left) is int and type(right) is int:
+            return left >= right
+        return self.despecialize(left, right)
+
+
+class IntLessNode(BinaryNode):
+    __slots__ = ()
+
+    def evaluate(self, slots: list) -> object:
+        left = self.left.evaluate(slots)
+        right = self.right.evaluate(slots)
+        if type(left) is int and type(right) is int:
+            return left < right
+        return self.despecialize(left, right)
+
+
+class IntLessEqualNode(BinaryNode):
+    __slots__ = ()
+
+    def evaluate(self, slots: list) -> object:
+        left = self.left.evaluate(slots)
+        right = self.right.evaluate(slots)
+        if type(left) is int and type(right) is int:
+            return left <= right
+        return self.despecialize(left, right)
+
+
+class IntEqualNode(BinaryNode):
+    __slots__ = ()
+
+    def evaluate(self, slots: list) -> object:
+        left = self.left.evaluate(slots)
+        right = self.right.evaluate(slots)
+        if type(left) is int and type(right) is int:
+            return left == right
+        return self.despecialize(left, right)
+
+
+INT_NODES = {
+    TokenType.PLUS: IntAddNode,
+    TokenType.MINUS: IntSubtractNode,
+    TokenType.STAR: IntMultiplyNode,
+    TokenType.SLASH: IntDivideNode,
+    TokenType.GREATER: IntGreaterNode,
+    TokenType.GREATER_EQUAL: IntGreaterEqualNode,
+    TokenType.LESS: IntLessNode,
+    TokenType.LESS_EQUAL: IntLessEqualNode,
+    TokenType.EQUAL_EQUAL: IntEqualNode,
+}
+
+NUMBER_FUNCTIONS = {
+    TokenType.MINUS: subtract,
+    TokenType.STAR: multiply,
+    TokenType.SLASH: op.truediv,
+    TokenType.GREATER: op.gt,
+    TokenType.GREATER_EQUAL: op.ge,
+    TokenType.LESS: op.lt,
+    TokenType.LESS_EQUAL: op.le,
+}
+
+
+class NotEqualNode(Node):
+    __slots__ = ("left", "right", "is_equal")
+
+    def __init__(self, left: Node, right: Node, interpreter: Interpreter) -> None:
+        self.left = left
+        self.right = right
+        self.is_equal = interpreter._is_equal
+
+    def evaluate(self, slots: list) -> object:
+        left = self.left.evaluate(slots)
+        return not self.is_equal(left, self.right.evaluate(slots))
+
+
+class NegateNode(Node):
+    """Uninitialized unary minus."""
+
+    __slots__ = ("right", "operator", "interpreter")
+
+    def __init__(self, right: Node, operator: PeuToken, interpreter: Interpreter) -> None:
+        self.right = right
+        self.operator = operator
+        self.interpreter = interpreter
+
+    def evaluate(self, slots: list) -> object:
+        value = self.right.evaluate(slots)
+        if type(value) is float:
+            self.__class__ = FloatNegateNode
+        elif type(value) is int:
+            self.__class__ = IntNegateNode
+        else:
+            self.__class__ = GenericNegateNode
+        return self.generic(value)
+
+    def generic(self, value: object) -> object:
+        self.interpreter._check_number_operand(self.operator, value)
+        return negate(value)
+
+
+class FloatNegateNode(NegateNode):
+    __slots__ = ()
+
+    def evaluate(self, slots: list) -> object:
+        value = self.right.evaluate(slots)
+        if type(value) is float:
+            return -value
+
+        self.__class__ = GenericNegateNode
+        return self.generic(value)
+
+
+class IntNegateNode(NegateNode):
+    __slots__ = ()
+
+    def evaluate(self, slots: list) -> object:
+        value = self.right.evaluate(slots)
+        if type(value) is int and value:
+            return -value
+
+        # -0 is the float -0.0.
+        if type(value) is not int:
+            self.__class__ = GenericNegateNode
+        return self.generic(value)
+
+
+class GenericNegateNode(NegateNode):
+    __slots__ = ()
+
+    def evaluate(self, slots: list) -> object:
+        return self.generic(self.right.evaluate(slots))
+
+
+class ConditionNode(Node):
+    """Uninitialized truthiness test of an expression, as used by `if`,
+    loops and `!`. `test` returns a Python bool.
+    """
+
+    __slots__ = ("expression", "is_truthy")
+
+    def __init__(self, expression: Node, interpreter: Interpreter) -> None:
+        self.expression = expression
+        self.is_truthy = interpreter._is_truthy
+
+    def test(self, slots: list) -> bool:
+        value = self.expression.evaluate(slots)
+        if type(value) is bool:
+            self.__class__ = BoolConditionNode
+        elif type(value) is float:
+            self.__class__ = FloatConditionNode
+        elif type(value) is int:
+            self.__class__ = IntConditionNode
+        else:
+            self.__class__ = GenericConditionNode
+        return self.is_truthy(value)
+
+
+class BoolConditionNode(ConditionNode):
+    __slots__ = ()
+
+    def test(self, slots: list) -> bool:
+        value = self.expression.evaluate(slots)
+        if value is True:
+            return True
+        if value is False:
+            return False
+
+        self.__class__ = GenericConditionNode
+        return self.is_truthy(value)
+
+
+class FloatConditionNode(ConditionNode):
+    __slots__ = ()
+
+    def test(self, slots: list) -> bool:
+        value = self.expression.evaluate(slots)
+        if type(value) is float:
+            # Peulang numbers are truthy when zero.
+            return value == 0
+
+        self.__class__ = GenericConditionNode
+        return self.is_truthy(value)
+
+
+class IntConditionNode(ConditionNode):
+    __slots__ = ()
+
+    def test(self, slots: list) -> bool:
+        value = self.expression.evaluate(slots)
+        if type(value) is int:
+            return value == 0
+
+        self.__class__ = GenericConditionNode
+        return self.is_truthy(value)
+
+
+class GenericConditionNode(ConditionNode):
+    __slots__ = ()
+
+    def test(self, slots: list) -> bool:
+        return self.is_truthy(self.expression.evaluate(slots))
+
+
+class NotNode(Node):
+    __slots__ = ("condition",)
+
+    def __init__(self, condition: ConditionNode) -> None:
+        self.condition = condition
+
+    def evaluate(self, slots: list) -> object:
+        return not self.condition.test(slots)
+
+
+class AndNode(Node):
+    __slots__ = ("left", "right", "is_truthy")
+
+    def __init__(self, left: Node, right: Node, interpreter: Interpreter) -> None:
+        self.left = left
+        self.right = right
+        self.is_truthy = interpreter._is_truthy
+
+    def evaluate(self, slots: list) -> object:
+        value = self.left.evaluate(slots)
+        if not self.is_truthy(value):
+            return value
+        return self.right.evaluate(slots)
+
+
+class OrNode(AndNode):
+    __slots__ = ()
+
+    def evaluate(self, slots: list) -> object:
+        value = self.left.evaluate(slots)
+        if self.is_truthy(value):
+            return value
+        return self.right.evaluate(slots)
+
+
+class BlockNode(Node):
+    __slots__ = ("statements",)
+
+    def __init__(self, statements: tuple[Node, ...]) -> None:
+        self.statements = statements
+
+    def execute(self, slots: list) -> None:
+        for statement in self.statements:
+            statement.execute(slots)
+
+
+class ExpressionNode(Node):
+    __slots__ = ("expression",)
+
+    def __init__(self, expression: Node) -> None:
+        self.expression = expression
+
+    def execute(self, slots: list) -> None:
+        self.expression.evaluate(slots)
+
+
+class IfNode(Node):
+    __slots__ = ("condition", "then_branch", "else_branch")
+
+    def __init__(
+        self, condition: ConditionNode, then_branch: Node, else_branch: Node
+    ) -> None:
+        self.condition = condition
+        self.then_branch = then_branch
+        self.else_branch = else_branch
+
+    def execute(self, slots: list) -> None:
+        if self.condition.test(slots):
+            self.then_branch.execute(slots)
+        elif self.else_branch is not None:
+            self.else_branch.execute(slots)
+
+
+class WhileNode(Node):
+    __slots__ = ("condition", "body")
+
+    def __init__(self, condition: ConditionNode, body: Node) -> None:
+        self.condition = condition
+        self.body = body
+
+    def execute(self, slots: list) -> None:
+        condition = self.condition
+        body = self.body
+        # The condition may specialize, i.e. change class, on any test, so
+        # `test` is not bound once for the whole loop.
+        while condition.test(slots):
+            body.execute(slots)
+
+
+class ForNode(Node):
+    __slots__ = ("initializer", "condition", "increment", "body")
+
+    def __init__(
+        self,
+        initializer: Node,
+        condition: ConditionNode,
+        increment: Node,
+        body: Node,
+    ) -> None:
+        self.initializer = initializer
+        self.condition = condition
+        self.increment = increment
+        self.body = body
+
+    def execute(self, slots: list) -> None:
+        if self.initializer is not None:
+            self.initializer.execute(slots)
+
+        condition = self.condition
+        body = self.body
+        increment = self.increment
+        if increment is None:
+            while condition.test(slots):
+                body.execute(slots)
+        else:
+            while condition.test(slots):
+                body.execute(slots)
+                increment.evaluate(slots)
+
+
+class PrintNode(Node):
+    __slots__ = ("expression", "stringify")
+
+    def __init__(self, expression: Node, interpreter: Interpreter) -> None:
+        self.expression = expression
+        self.stringify = interpreter._stringify
+
+    def execute(self, slots: list) -> None:
+        slots[PRINT_SLOT](self.stringify(self.expression.evaluate(slots)))
+
+
+class DefineLocalNode(Node):
+    __slots__ = ("slot", "initializer")
+
+    def __init__(self, slot: int, initializer: Node) -> None:
+        self.slot = slot
+        self.initializer = initializer
+
+    def execute(self, slots: list) -> None:
+        slots[self.slot] = self.initializer.evaluate(slots)
+
+
+class DefineGlobalNode(Node):
+    __slots__ = ("name", "initializer")
+
+    def __init__(self, name: str, initializer: Node) -> None:
+        self.name = name
+        self.initializer = initializer
+
+    def execute(self, slots: list) -> None:
+        slots[GLOBALS_SLOT].define(self.name, self.initializer.evaluate(slots))
+
+
+class NodeBuilder(ExprVisitor, StmtVisitor):
+    """Turns a resolved AST into uninitialized executable nodes, with locals
+    in one flat array as in the ClosureCompiler.
+    """
+
+    def __init__(self, interpreter: Interpreter) -> None:
+        super().__init__()
+
+        self._interpreter = interpreter
+        # (base, size) of each enclosing block, innermost last.
+        self._scopes: list[tuple[int, int]] = [(FIRST_LOCAL_SLOT, 0)]
+        self.slot_count = FIRST_LOCAL_SLOT
+
+    def build_stmt(self, stmt: Stmt) -> Node:
+        return stmt.accept(self)
+
+    def build_expr(self, expr: Expr) -> Node:
+        return expr.accept(self)
+
+    def _slot(self, node: object) -> int:
+        location = self._interpreter._locals.get(node)
+        if location is None:
+            return -1
+
+        depth, slot = location
+        base, _ = self._scopes[-1 - depth]
+        return base + slot
+
+    def _begin_scope(self, stmt: Block | For) -> None:
+        base, size = self._scopes[-1]
+        block_base = base + size
+        block_size = self._interpreter._scope_sizes[stmt]
+
+        self._scopes.append((block_base, block_size))
+        self.slot_count = max(self.slot_count, block_base + block_size)
+
+    def visit_block(self, stmt: Block) -> Node:
+        self._begin_scope(stmt)
+        statements = tuple(self.build_stmt(s) for s in stmt.statements)
+        self._scopes.pop()
+
+        return BlockNode(statements)
+
+    def visit_expression(self, stmt: Expression) -> Node:
+        return ExpressionNode(self.build_expr(stmt.expression))
+
+    def visit_for(self, stmt: For) -> Node:
+        self._begin_scope(stmt)
+        initializer = None
+        if stmt.initializer is not None:
+            initializer = self.build_stmt(stmt.initializer)
+        condition = ConditionNode(self.build_expr(stmt.condition), self._interpreter)
+        increment = None
+        if stmt.increment is not None:
+            increment = self.build_expr(stmt.increment)
+        body = self.build_stmt(stmt.body)
+        self._scopes.pop()
+
+        return ForNode(initializer, condition, increment, body)
+
+    def visit_while(self, stmt: While) -> Node:
+        condition = ConditionNode(self.build_expr(stmt.condition), self._interpreter)
+        return WhileNode(condition, self.build_stmt(stmt.body))
+
+    def visit_if(self, stmt: If) -> Node:
+        condition = ConditionNode(self.build_expr(stmt.condition), self._interpreter)
+        then_branch = self.build_stmt(stmt.then_branch)
+        else_branch = None
+        if stmt.else_branch is not None:
+            else_branch = self.build_stmt(stmt.else_branch)
+
+        return IfNode(condition, then_branch, else_branch)
+
+    def visit_print(self, stmt: Print) -> Node:
+        return PrintNode(self.build_expr(stmt.expression), self._interpreter)
+
+    def visit_var(self, stmt: Var) -> Node:
+        initializer = ConstantNode(None)
+        if stmt.initializer is not None:
+            initializer = self.build_expr(stmt.initializer)
+
+        slot = self._slot(stmt)
+        if slot < 0:
+            return DefineGlobalNode(stmt.name.lexeme, initializer)
+        return DefineLocalNode(slot, initializer)
+
+    def visit_array(self, expr: Array) -> Node:
+        elements = tuple(self.build_expr(element) for element in expr.elements)
+        return ArrayNode(expr.bracket, elements)
+
+    def visit_assign(self, expr: Assign) -> Node:
+        value = self.build_expr(expr.value)
+
+        slot = self._slot(expr)
+        if slot < 0:
+            return AssignGlobalNode(expr.name, value)
+        return AssignLocalNode(slot, value)
+
+    def visit_binary(self, expr: Binary) -> Node:
+        left = self.build_expr(expr.left)
+        right = self.build_expr(expr.right)
+        operator = expr.operator
+
+        if operator.type == TokenType.BANG_EQUAL:
+            return NotEqualNode(left, right, self._interpreter)
+
+        if operator.type == TokenType.EQUAL_EQUAL:
+            function = self._interpreter._is_equal
+        else:
+            function = NUMBER_FUNCTIONS.get(operator.type)
+        return BinaryNode(left, right, operator, function, self._interpreter)
+
+    def visit_grouping(self, expr: Grouping) -> Node:
+        return self.build_expr(expr.expression)
+
+    def visit_literal(self, expr: Literal) -> Node:
+        return ConstantNode(expr.value)
+
+    def visit_logical(self, expr: Logical) -> Node:
+        left = self.build_expr(expr.left)
+        right = self.build_expr(expr.right)
+
+        if expr.operator.type == TokenType.OR:
+            return OrNode(left, right, self._interpreter)
+        return AndNode(left, right, self._interpreter)
+
+    def visit_unary(self, expr: Unary) -> Node:
+        right = self.build_expr(expr.right)
+
+        if expr.operator.type == TokenType.MINUS:
+            return NegateNode(right, expr.operator, self._interpreter)
+        return NotNode(ConditionNode(right, self._interpreter))
+
+    def visit_variable(self, expr: Variable) -> Node:
+        slot = self._slot(expr)
+        if slot < 0:
+            return GlobalNode(expr.name)
+        return LocalNode(slot)
@@ -2,36 +2,63 @@ from expr import Expr
 from peu_token import PeuToken
 
 class Stmt:
+    __slots__ = ()
+
     def accept(self, visitor): pass
 
 class Block(Stmt):
-    def __init__(self, statements: list[Stmt]) -> None:
-        super().__init__()
+    __slots__ = ("brace", "statements")
 
+    def __init__(self, brace: PeuToken, statements: list[Stmt]) -> None:
+        self.brace = brace
         self.statements = statements
 
     def accept(self, visitor):
         return visitor.visit_block(self)
 
+    def __reduce__(self):
+        return (Block, (self.brace, self.statements))
+
     def __repr__(self) -> str:
-        return f"Block({self.statements})"
+        return f"Block({self.brace}, {self.statements})"
 
 class Expression(Stmt):
-    def __init__(self, expression: Expr) -> None:
-        super().__init__()
+    __slots__ = ("expression",)
 
+    def __init__(self, expression: Expr) -> None:
         self.expression = expression
 
     def accept(self, visitor):
         return visitor.visit_expression(self)
 
+    def __reduce__(self):
+        return (Expression, (self.expression,))
+
     def __repr__(self) -> str:
         return f"Expression({self.expression})"
 
+class For(Stmt):
+    __slots__ = ("initializer", "condition", "increment", "body")
+
+    def __init__(self, initializer: Stmt, condition: Expr, increment: Expr, body: Stmt) -> None:
+        self.initializer = initializer
+        self.condition = condition
+        self.increment = increment
+        self.body = body
+
+    def accept(self, visitor):
+        return visitor.visit_for(self)
+
+    def __reduce__(self):
+        return (For, (self.initializer, self.condition, self.increment, self.body))
+
+    def __repr__(self) -> str:
+        return f"For({self.initializer}, {self.condition}, {self.increment}, {self.body})"
+
 class If(Stmt):
-    def __init__(self, condition: Expr, then_branch: Stmt, else_branch: Stmt) -> None:
-        super().__init__()
+    __slots__ = ("condition", "then_branch", "else_branch")
 
+    def __init__(self, condition: Expr, then_branch: Stmt, else_branch: Stmt) -> None:
         self.condition = condition
         self.then_branch = then_branch
         self.else_branch = else_branch
@@ -39,42 +66,71 @@ class If(Stmt):
     def accept(self, visitor):
         return visitor.visit_if(self)
 
+    def __reduce__(self):
+        return (If, (self.condition, self.then_branch, self.else_branch))
+
     def __repr__(self) -> str:
         return f"If({self.condition}, {self.then_branch}, {self.else_branch})"
 
 class Print(Stmt):
-    def __init__(self, expression: Expr) -> None:
-        super().__init__()
+    __slots__ = ("expression",)
 
+    def __init__(self, expression: Expr) -> None:
         self.expression = expression
 
     def accept(self, visitor):
         return visitor.visit_print(self)
 
+    def __reduce__(self):
+        return (Print, (self.expression,))
+
     def __repr__(self) -> str:
         return f"Print({self.expression})"
 
 class Var(Stmt):
-    def __init__(self, name: PeuToken, initializer: Expr) -> None:
-        super().__init__()
+    __slots__ = ("name", "initializer")
 
+    def __init__(self, name: PeuToken, initializer: Expr) -> None:
         self.name = name
         self.initializer = initializer
 
     def accept(self, visitor):
         return visitor.visit_var(self)
 
+    def __reduce__(self):
+        return (Var, (self.name, self.initializer))
+
     def __repr__(self) -> str:
         return f"Var({self.name}, {self.initializer})"
 
+class While(Stmt):
+    __slots__ = ("condition", "body")
+
+    def __init__(self, condition: Expr, body: Stmt) -> None:
+        self.condition = condition
+        self.body = body
+
+    def accept(self, visitor):
+        return visitor.visit_while(self)
+
+    def __reduce__(self):
+        return (While, (self.condition, self.body))
+
+    def __repr__(self) -> str:
+        return f"While({self.condition}, {self.body})"
+
 class Visitor:
     def visit_block(self, stmt: Block): raise NotImplementedError
 
     def visit_expression(self, stmt: Expression): raise NotImplementedError
 
+    def visit_for(self, stmt: For): raise NotImplementedError
+
     def visit_if(self, stmt: If): raise NotImplementedError
 
     def visit_print(self, stmt: Print): raise NotImplementedError
 
     def visit_var(self, stmt: Var): raise NotImplementedError
 
+    def visit_while(self, stmt: While): raise NotImplementedError
+
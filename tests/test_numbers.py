@@ -0,0 +1,125 @@
+"""Conformance of the exact-int number representation: every engine, with
+and without the optimizer, prints what float arithmetic would print.
+
+Values come both from literals, which the optimizer may fold, and from
+injected globals and loops, which it cannot.
+"""
+
+import pytest
+
+from engine import ENGINES, PeuEngine
+
+
+CASES = {
+    "exact boundary": (
+        """
+        print big;
+        print big - 1;
+        print big + 1;
+        print big + 1 + 1;
+        print big + 1 == big;
+        print -big - 1;
+        print 9007199254740993;
+        print 9007199254740992 + 1;
+        """,
+        [
+            "9007199254740992.0",
+            "9007199254740991.0",
+            "9007199254740992.0",
+            "9007199254740992.0",
+            "true",
+            "-9007199254740992.0",
+            "9007199254740992.0",
+            "9007199254740992.0",
+        ],
+    ),
+    "int product overflow": (
+        """
+        var m = 3037000500;
+        print m * m;
+        print big * 2;
+        print big * 2 - big * 2;
+        var p = 1;
+        for (var i = 0; i < 64; i = i + 1) { p = p * 2; }
+        print p;
+        print 4294967296 * 4294967296;
+        """,
+        [
+            "9.22337203700025e+18",
+            "1.8014398509481984e+16",
+            "0.0",
+            "1.8446744073709552e+19",
+            "1.8446744073709552e+19",
+        ],
+    ),
+    "negative zero": (
+        """
+        print -0;
+        print -zero;
+        print zero * -1;
+        print -1 * zero;
+        print zero - zero;
+        print -zero == 0;
+        var n = -1;
+        print n * 0;
+        print 0 * n + 0;
+        """,
+        ["-0.0", "-0.0", "-0.0", "-0.0", "0.0", "true", "-0.0", "0.0"],
+    ),
+    "division": (
+        """
+        print 7 / 2;
+        print one / three;
+        print 6 / 3;
+        print ten / 4;
+        print 7 / 2 * 2;
+        print one / three * three == one;
+        print -one / 4;
+        """,
+        ["3.5", "0.3333333333333333", "2.0", "2.5", "7.0", "true", "-0.25"],
+    ),
+    "printing": (
+        """
+        print 1;
+        print 1.5;
+        print 1.0;
+        print 100;
+        print 1 + 0.5;
+        print 2 * 0.5;
+        print 0.1 + 0.2;
+        print 1 == 1.0;
+        var count = 0;
+        for (var i = 0; i < 3; i = i + 1) { count = count + 1; }
+        print count;
+        print count + 0.5;
+        """,
+        [
+            "1.0",
+            "1.5",
+            "1.0",
+            "100.0",
+            "1.5",
+            "1.0",
+            "0.30000000000000004",
+            "true",
+            "3.0",
+            "3.5",
+        ],
+    ),
+}
+
+GLOBALS = {"big": 2 ** 53, "zero": 0, "one": 1, "three": 3, "ten": 10}
+
+
+@pytest.mark.parametrize("optimize", [True, False], ids=["optimized", "unoptimized"])
+@pytest.mark.parametrize("engine", list(ENGINES))
+@pytest.mark.parametrize("case", list(CASES))
+def test_numbers(case: str, engine: str, optimize: bool) -> None:
+    source, expected = CASES[case]
+    program = PeuEngine(engine, optimize=optimize).compile(source)
+    assert not program.errors
+
+    result = program.run(GLOBALS)
+
+    assert result.error is None
+    assert result.output.lines == expected
@@ -0,0 +1,108 @@
+"""Differential test of the VM against the tree-walking Interpreter: both
+must print the same output and stop on the same runtime error.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from bench.generate import GENERATORS
+from bench.workloads import WORKLOADS
+from engine import PeuEngine
+
+
+EXEMPLES = Path(__file__).resolve().parent.parent / "exemples"
+
+PROGRAMS = {
+    "arithmetic": """
+        var a = 3;
+        print a / 2; print a * 2; print -0; print 0 * -1; print 1.5 + a;
+        print a == 3.0; print 10 - 20; print 9007199254740992 + 1;
+        if (0) print "t"; else print "f";
+    """,
+    "locals and globals": """
+        var g = 1;
+        { var l = 2; g = g + l; print g; g = l * g; print g; }
+        print g == 6;
+        for (var i = 0; i < 3; i = i + 1) g = g - i;
+        print g;
+    """,
+    "values": """
+        var s = "a";
+        {
+            var t = "b"; print s + t; print t + s;
+            var n = 3; print n - 1; print 1 - n; print -n; print !n;
+            print n == 3 and s; print null or n;
+            var y; print y; y = n * 2.5; print y; print n <= 2; print n >= 3;
+        }
+    """,
+    "loops": """
+        var total = 0;
+        for (var i = 0; i < 5; i = i + 1) { var sq = i * i; total = total + sq; }
+        print total;
+        var n = 3;
+        while (n > 0) { print n; n = n - 1; }
+        for (; n < 2;) n = n + 1;
+        print n;
+        var j = 10;
+        for (j = 0; j < 3; j = j + 1) print j;
+        print j;
+        {
+            var k = 0;
+            var acc = "";
+            while (k < 3) { var s = "x"; { var t = k; acc = acc + s; } k = k + 1; }
+            print acc;
+            for (var m = 0; m < 2; m = m + 1)
+                for (var q = 0; q < 2; q = q + 1) print m * 10 + q;
+        }
+        while (false) print "never";
+    """,
+    "arrays": """
+        var a = [1, 2, 3];
+        { var x = 2; print (a - x) * 2 + 1; print -(a * x) / 4; print [x, x + 1, 0.5] + a; }
+        print a > 1; print a == a; print a == [1, 2]; print a != [1, 2];
+        var b = a > 1; print b == b;
+    """,
+    "undefined variable": "print 1; print y; print 2;",
+    "undefined assignment": "{ var a = 1; b = a; }",
+    "string plus number": "var a = 1; print a + \"x\";",
+    "plus null": "{ var a = 1; print a + null; }",
+    "negate string": "var a = \"s\"; print -a;",
+    "compare string": "{ var x = 2; print x < \"a\"; }",
+    "equal string": "{ var x = 2; print x == \"a\"; }",
+    "error in loop": "for (var i = 0; i < 5; i = i + 1) { print i; if (i == 3) print -\"x\"; }",
+    "array lengths": "{ var a = [1]; print a + [1, 2]; }",
+    "array element": "print [1, \"x\"];",
+    "boolean array arithmetic": "var a = [1, 2]; print (a > 1) + 1;",
+    "array plus string": "print [1] + \"x\";",
+}
+
+
+def cases() -> dict[str, str]:
+    programs = dict(PROGRAMS)
+    for path in sorted(EXEMPLES.glob("*.peu")):
+        programs[f"exemples/{path.name}"] = path.read_text()
+    for name, generate in {**GENERATORS, **WORKLOADS}.items():
+        programs[f"bench/{name}"] = generate(20)
+    return programs
+
+
+CASES = cases()
+
+
+def outcome(engine: str, optimize: bool, source: str) -> tuple:
+    program = PeuEngine(engine, optimize=optimize).compile(source)
+    assert not program.errors
+
+    result = program.run()
+    error = result.error
+    if error is not None:
+        error = (error.token.line, error.message)
+    return result.output.lines, error
+
+
+@pytest.mark.parametrize("optimize", [True, False], ids=["optimized", "unoptimized"])
+@pytest.mark.parametrize("name", list(CASES))
+def test_vm_matches_tree(name: str, optimize: bool) -> None:
+    source = CASES[name]
+    assert outcome("vm", optimize, source) == outcome("tree", optimize, source)
@@ -13,6 +13,8 @@ class TokenType(Enum):
     SEMICOLON = 9
     SLASH = 10
     STAR = 11
+    LEFT_BRACKET = 40
+    RIGHT_BRACKET = 41
     
     # One or two character tokens.
     BANG = 12
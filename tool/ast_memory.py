@@ -0,0 +1,68 @@
+import sys
+import tracemalloc
+from pathlib import Path
+from typing import Iterator
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from expr import Expr
+from peu_parser import PeuParser
+from scanner import RegexScanner
+from stmt import Stmt
+
+
+def count_nodes(statements: list[Stmt]) -> int:
+    return sum(1 for _ in walk_nodes(statements))
+
+
+def walk_nodes(statements: list[Stmt]) -> Iterator[Expr | Stmt]:
+    pending = list(statements)
+    while pending:
+        node = pending.pop()
+        yield node
+        for name in _fields(node):
+            value = getattr(node, name)
+            if isinstance(value, (Expr, Stmt)):
+                pending.append(value)
+            elif isinstance(value, list):
+                pending.extend(value)
+
+
+def _fields(node: object) -> list[str]:
+    if hasattr(node, "__dict__"):
+        return list(vars(node))
+
+    return [
+        name
+        for cls in type(node).__mro__
+        for name in getattr(cls, "__slots__", ())
+    ]
+
+
+def main():
+    if len(sys.argv) != 2:
+        sys.stderr.write("Usage: python ast_memory.py <script>")
+        sys.exit(64)
+
+    with open(sys.argv[1]) as file:
+        source = file.read()
+
+    tracemalloc.start()
+
+    before = tracemalloc.get_traced_memory()[0]
+    tokens = RegexScanner(source).scan_tokens()
+    after_scan = tracemalloc.get_traced_memory()[0]
+    statements = PeuParser(tokens).parse()
+    after_parse = tracemalloc.get_traced_memory()[0]
+
+    tracemalloc.stop()
+
+    nodes = count_nodes(statements)
+    token_bytes = after_scan - before
+    node_bytes = after_parse - after_scan
+    print(f"tokens: {len(tokens)}, {token_bytes / len(tokens):.1f} bytes/token")
+    print(f"nodes:  {nodes}, {node_bytes / nodes:.1f} bytes/node")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,94 +2,187 @@ import sys
 from pathlib import Path
 
 
-def define_ast(output_dir: str, base_name: str, types: list[str]) -> None:
+def define_ast(
+    output_dir: str,
+    base_name: str,
+    types: list[str],
+    imports: list[str],
+    frozen: bool = False,
+    subtypes: list[str] = (),
+) -> None:
     path = Path(output_dir)
     path = path.joinpath(f"{base_name.lower()}.py")
 
     with open(path, "w") as f:
-        f.write("from peu_token import PeuToken\n\n")
+        for line in imports:
+            f.write(f"{line}\n")
+        f.write("\n")
         f.write(f"class {base_name}:\n")
+        f.write("    __slots__ = ()\n\n")
         f.write("    def accept(self, visitor): pass\n")
 
         for type in types:
             class_name = type.split(":")[0].strip()
             fields = type.split(":")[1].strip()
 
-            class_type = define_type(base_name, class_name, fields)
+            class_type = define_type(base_name, class_name, fields, frozen)
             f.write(class_type)
 
+        fields_by_class = {
+            type.split(":")[0].strip(): type.split(":")[1].strip()
+            for type in types
+        }
+        for subtype in subtypes:
+            class_name = subtype.split(":")[0].strip()
+            parent_name = subtype.split(":")[1].strip()
+
+            f.write(define_subtype(class_name, parent_name, fields_by_class[parent_name]))
+
         f.write("\n")
-        visitor_type = define_visitor(base_name, types)
+        visitor_type = define_visitor(base_name, types, subtypes)
         f.write(visitor_type)
 
 
-def define_visitor(base_name, types):
+def define_visitor(base_name, types, subtypes):
     buffer = "class Visitor:\n"
     for type in types:
         class_name = type.split(":")[0].strip()
         fields = type.split(":")[1].strip()
         buffer = f"{buffer}    def visit_{class_name.lower()}(self, {base_name.lower()}: {class_name}): raise NotImplementedError\n\n"
 
+    # Visitors that do not care about a subtype handle it as its parent.
+    for subtype in subtypes:
+        class_name = subtype.split(":")[0].strip()
+        parent_name = subtype.split(":")[1].strip()
+        buffer = f"{buffer}    def visit_{class_name.lower()}(self, {base_name.lower()}: {class_name}): return self.visit_{parent_name.lower()}({base_name.lower()})\n\n"
+
     return buffer
 
 
-def define_type(base_name, class_name, field_list):
+def define_tuple(items):
+    if len(items) == 1:
+        return f"({items[0]},)"
+
+    return f"({', '.join(items)})"
+
+
+def define_type(base_name, class_name, field_list, frozen):
     fields_values = []
     for field in field_list.split(","):
         splited_field = field.strip().split(" ")
         fields_values.append((splited_field[0], splited_field[1]))
 
-    fields = "\n        ".join(
-        [
-            f"self.{field_name} = {field_name}"
-            for (_, field_name) in fields_values
-        ]
-    )
+    if frozen:
+        fields = "\n        ".join(
+            [
+                f"object.__setattr__(self, \"{field_name}\", {field_name})"
+                for (_, field_name) in fields_values
+            ]
+        )
+        setattr_method = f"""
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{class_name} is frozen")
+"""
+    else:
+        fields = "\n        ".join(
+            [
+                f"self.{field_name} = {field_name}"
+                for (_, field_name) in fields_values
+            ]
+        )
+        setattr_method = ""
+
     return f"""
 class {class_name}({base_name}):
-    def __init__(self, {", ".join([f"{field_name}: {field_class}" for (field_class, field_name) in fields_values])}) -> None:
-        super().__init__()
+    __slots__ = {define_tuple([f'"{field_name}"' for (_, field_name) in fields_values])}
 
+    def __init__(self, {", ".join([f"{field_name}: {field_class}" for (field_class, field_name) in fields_values])}) -> None:
         {fields}
-
+{setattr_method}
     def accept(self, visitor):
         return visitor.visit_{class_name.lower()}(self)
 
+    def __reduce__(self):
+        return ({class_name}, {define_tuple([f"self.{field_name}" for (_, field_name) in fields_values])})
+
     def __repr__(self) -> str:
         return f"{class_name}({", ".join([f"{{self.{field_name}}}" for (_, field_name) in fields_values])})"
 """
 
 
+def define_subtype(class_name, parent_name, field_list):
+    field_names = [field.strip().split(" ")[1] for field in field_list.split(",")]
+
+    return f"""
+class {class_name}({parent_name}):
+    __slots__ = ()
+
+    def accept(self, visitor):
+        return visitor.visit_{class_name.lower()}(self)
+
+    def __reduce__(self):
+        return ({class_name}, {define_tuple([f"self.{field_name}" for field_name in field_names])})
+
+    def __repr__(self) -> str:
+        return f"{class_name}({", ".join([f"{{self.{field_name}}}" for field_name in field_names])})"
+"""
+
+
 def main():
-    if len(sys.argv) != 2:
-        sys.stderr.write("Usage: python generate_ast.py <output directory>")
+    args = [arg for arg in sys.argv[1:] if arg != "--frozen"]
+    if len(args) != 1:
+        sys.stderr.write("Usage: python generate_ast.py <output directory> [--frozen]")
         sys.exit(64)
 
-    output_dir = sys.argv[1]
+    output_dir = args[0]
+    frozen = "--frozen" in sys.argv
     define_ast(
         output_dir,
         "Expr",
         [
+            "Array    : PeuToken bracket, list[Expr] elements",
             "Assign   : PeuToken name, Expr value",
             "Binary   : Expr left, PeuToken operator, Expr right",
             "Grouping : Expr expression",
-            "Literal  : object value",
+            "Literal  : PeuToken token, object value",
             "Logical  : Expr left, PeuToken operator, Expr right",
             "Unary    : PeuToken operator, Expr right",
             "Variable : PeuToken name",
         ],
+        ["from peu_token import PeuToken"],
+        frozen,
+        [
+            "Add          : Binary",
+            "Subtract     : Binary",
+            "Multiply     : Binary",
+            "Divide       : Binary",
+            "Greater      : Binary",
+            "GreaterEqual : Binary",
+            "Less         : Binary",
+            "LessEqual    : Binary",
+            "EqualEqual   : Binary",
+            "BangEqual    : Binary",
+            "And          : Logical",
+            "Or           : Logical",
+            "Negate       : Unary",
+            "Not          : Unary",
+        ],
     )
 
     define_ast(
         output_dir,
         "Stmt",
         [
-            "Block      : list[Stmt] statements",
+            "Block      : PeuToken brace, list[Stmt] statements",
             "Expression : Expr expression",
+            "For        : Stmt initializer, Expr condition, Expr increment, Stmt body",
             "If         : Expr condition, Stmt then_branch, Stmt else_branch",
             "Print      : Expr expression",
             "Var        : PeuToken name, Expr initializer",
+            "While      : Expr condition, Stmt body",
         ],
+        ["from expr import Expr", "from peu_token import PeuToken"],
+        frozen,
     )
 
 
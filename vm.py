@@ -0,0 +1,266 @@
+from compiler import Chunk, Compiler, OpCode
+from error import PeuRuntimeError
+from number import MAX_EXACT, MIN_EXACT, NUMBER_TYPES, negate
+from peu_array import (
+    PeuArray,
+    check_equality_operands as check_array_equality_operands,
+    check_operand as check_array_operand,
+    check_operands as check_array_operands,
+    make_array,
+)
+from peu_interpreter import Interpreter
+from peu_token import PeuToken
+from rope import STRING_TYPES, concat
+from stmt import Stmt
+
+
+class VM(Interpreter):
+    """Stack-based virtual machine executing compiled Chunks.
+
+    It shares the global environment, the resolver tables and the value
+    semantics of the tree-walking Interpreter, so both engines produce the
+    same output and runtime errors.
+    """
+
+    def interpret(self, statements: list[Stmt]) -> None:
+        if self.hooks_installed:
+            # Hooks are dispatched by the tree-walking interpreter.
+            self._walk(statements)
+            return
+
+        self.execute(self.lower(statements))
+
+    def lower(self, statements: list[Stmt]) -> Chunk:
+        return Compiler(self._locals, self._scope_sizes).compile(statements)
+
+    def execute(self, chunk: Chunk) -> None:
+        try:
+            self._run(chunk)
+        except PeuRuntimeError as error:
+            self._runtime_error(error)
+
+    def _run(self, chunk: Chunk) -> None:
+        code = chunk.code
+        constants = chunk.constants
+        tokens = chunk.tokens
+        slots = [None] * chunk.local_count
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        binary = BINARY_OPERATIONS
+
+        get_global = self.globals.get
+        set_global = self.globals.assign
+        define_global = self.globals.define
+        is_truthy = self._is_truthy
+        stringify = self._stringify
+        output = self.output.print
+
+        # Comparing with locals is much cheaper than with class attributes,
+        # which the loop below would otherwise look up for every test.
+        GET_LOCAL = OpCode.GET_LOCAL
+        CONSTANT = OpCode.CONSTANT
+        GET_GLOBAL = OpCode.GET_GLOBAL
+        STORE_LOCAL = OpCode.STORE_LOCAL
+        POP_JUMP_IF_FALSE = OpCode.POP_JUMP_IF_FALSE
+        JUMP = OpCode.JUMP
+        BINARY_CONSTANT = OpCode.BINARY_CONSTANT
+        LOCAL_BINARY_CONSTANT = OpCode.LOCAL_BINARY_CONSTANT
+        BINARY_LOCAL = OpCode.BINARY_LOCAL
+        STORE_GLOBAL = OpCode.STORE_GLOBAL
+        NOT_EQUAL = OpCode.NOT_EQUAL
+        SET_LOCAL = OpCode.SET_LOCAL
+        SET_GLOBAL = OpCode.SET_GLOBAL
+        POP = OpCode.POP
+        JUMP_IF_FALSE = OpCode.JUMP_IF_FALSE
+        JUMP_IF_TRUE = OpCode.JUMP_IF_TRUE
+        NOT = OpCode.NOT
+        NEGATE = OpCode.NEGATE
+        DEFINE_GLOBAL = OpCode.DEFINE_GLOBAL
+        PRINT = OpCode.PRINT
+        ARRAY = OpCode.ARRAY
+
+        ip = 0
+        while True:
+            op = code[ip]
+            arg = code[ip + 1]
+            ip += 2
+
+            if op == GET_LOCAL:
+                push(slots[arg])
+            elif op == CONSTANT:
+                push(constants[arg])
+            elif op == GET_GLOBAL:
+                push(get_global(tokens[arg]))
+            elif op == STORE_LOCAL:
+                slots[arg] = pop()
+            elif op == POP_JUMP_IF_FALSE:
+                value = pop()
+                if value is not True and (
+                    value is False or value is None or not is_truthy(value)
+                ):
+                    ip = arg
+            elif op == JUMP:
+                ip = arg
+            elif op == BINARY_CONSTANT:
+                operation, right, operator = constants[arg]
+                stack[-1] = binary[operation](stack[-1], right, operator)
+            elif op == LOCAL_BINARY_CONSTANT:
+                operation, slot, right, operator = constants[arg]
+                push(binary[operation](slots[slot], right, operator))
+            elif op == BINARY_LOCAL:
+                operation, slot, operator = constants[arg]
+                stack[-1] = binary[operation](stack[-1], slots[slot], operator)
+            elif op == STORE_GLOBAL:
+                set_global(tokens[arg], pop())
+            elif op <= NOT_EQUAL:
+                right = pop()
+                stack[-1] = binary[op](stack[-1], right, tokens[arg])
+            elif op == SET_LOCAL:
+                slots[arg] = stack[-1]
+            elif op == SET_GLOBAL:
+                set_global(tokens[arg], stack[-1])
+            elif op == POP:
+                pop()
+            elif op == JUMP_IF_FALSE:
+                value = stack[-1]
+                if value is False or value is None or (
+                    value is not True and not is_truthy(value)
+                ):
+                    ip = arg
+            elif op == JUMP_IF_TRUE:
+                value = stack[-1]
+                if value is True or (
+                    value is not False and value is not None and is_truthy(value)
+                ):
+                    ip = arg
+            elif op == NOT:
+                stack[-1] = not is_truthy(stack[-1])
+            elif op == NEGATE:
+                value = stack[-1]
+                if type(value) not in NUMBER_TYPES:
+                    if type(value) is not PeuArray:
+                        raise PeuRuntimeError(tokens[arg], "Operand must be a number.")
+                    check_array_operand(tokens[arg], value)
+                stack[-1] = negate(value)
+            elif op == DEFINE_GLOBAL:
+                define_global(tokens[arg].lexeme, pop())
+            elif op == PRINT:
+                output(stringify(pop()))
+            elif op == ARRAY:
+                count = pop()
+                start = len(stack) - count
+                values = stack[start:]
+                del stack[start:]
+                push(make_array(tokens[arg], values))
+            else:
+                return
+
+
+# The binary operations, called with both operands and the operator token
+# for errors. They follow Interpreter.visit_add and its siblings; the int
+# cases of +, - and * are number.add, subtract and multiply inlined.
+
+def _check_numbers(operator: PeuToken, left: object, right: object) -> None:
+    if type(left) in NUMBER_TYPES and type(right) in NUMBER_TYPES:
+        return
+    if type(left) is PeuArray or type(right) is PeuArray:
+        # Applied elementwise by the Python operators.
+        check_array_operands(operator, left, right)
+        return
+    raise PeuRuntimeError(operator, "Operands must be a number.")
+
+
+def _add(left: object, right: object, operator: PeuToken) -> object:
+    if type(left) is int and type(right) is int:
+        result = left + right
+        if MIN_EXACT <= result <= MAX_EXACT:
+            return result
+        return float(result)
+    elif type(left) in NUMBER_TYPES and type(right) in NUMBER_TYPES:
+        return left + right
+    elif isinstance(left, STRING_TYPES) and isinstance(right, STRING_TYPES):
+        return concat(left, right)
+    elif type(left) is PeuArray or type(right) is PeuArray:
+        check_array_operands(operator, left, right)
+        return left + right
+
+    raise PeuRuntimeError(operator, "Operands must be two numbers or two strings.")
+
+
+def _subtract(left: object, right: object, operator: PeuToken) -> object:
+    if type(left) is int and type(right) is int:
+        result = left - right
+        if MIN_EXACT <= result <= MAX_EXACT:
+            return result
+        return float(result)
+
+    _check_numbers(operator, left, right)
+    return left - right
+
+
+def _multiply(left: object, right: object, operator: PeuToken) -> object:
+    if type(left) is int and type(right) is int:
+        result = left * right
+        if result and MIN_EXACT <= result <= MAX_EXACT:
+            return result
+        return float(left) * float(right)
+
+    _check_numbers(operator, left, right)
+    return left * right
+
+
+def _divide(left: object, right: object, operator: PeuToken) -> object:
+    _check_numbers(operator, left, right)
+    return left / right
+
+
+def _less(left: object, right: object, operator: PeuToken) -> bool:
+    if type(left) not in NUMBER_TYPES or type(right) not in NUMBER_TYPES:
+        _check_numbers(operator, left, right)
+    return left < right
+
+
+def _less_equal(left: object, right: object, operator: PeuToken) -> bool:
+    if type(left) not in NUMBER_TYPES or type(right) not in NUMBER_TYPES:
+        _check_numbers(operator, left, right)
+    return left <= right
+
+
+def _greater(left: object, right: object, operator: PeuToken) -> bool:
+    if type(left) not in NUMBER_TYPES or type(right) not in NUMBER_TYPES:
+        _check_numbers(operator, left, right)
+    return left > right
+
+
+def _greater_equal(left: object, right: object, operator: PeuToken) -> bool:
+    if type(left) not in NUMBER_TYPES or type(right) not in NUMBER_TYPES:
+        _check_numbers(operator, left, right)
+    return left >= right
+
+
+def _equal(left: object, right: object, operator: PeuToken) -> bool:
+    if type(left) not in NUMBER_TYPES or type(right) not in NUMBER_TYPES:
+        if type(left) is not PeuArray and type(right) is not PeuArray:
+            raise PeuRuntimeError(operator, "Operands must be a number.")
+        # Arrays compare as a whole, like in Interpreter._is_equal.
+        check_array_equality_operands(operator, left, right)
+    return left == right
+
+
+def _not_equal(left: object, right: object, operator: PeuToken) -> bool:
+    return not left == right
+
+
+# Indexed by opcode.
+BINARY_OPERATIONS = [None] * (OpCode.NOT_EQUAL + 1)
+BINARY_OPERATIONS[OpCode.ADD] = _add
+BINARY_OPERATIONS[OpCode.SUBTRACT] = _subtract
+BINARY_OPERATIONS[OpCode.MULTIPLY] = _multiply
+BINARY_OPERATIONS[OpCode.DIVIDE] = _divide
+BINARY_OPERATIONS[OpCode.LESS] = _less
+BINARY_OPERATIONS[OpCode.LESS_EQUAL] = _less_equal
+BINARY_OPERATIONS[OpCode.GREATER] = _greater
+BINARY_OPERATIONS[OpCode.GREATER_EQUAL] = _greater_equal
+BINARY_OPERATIONS[OpCode.EQUAL] = _equal
+BINARY_OPERATIONS[OpCode.NOT_EQUAL] = _not_equal